@@ -1,15 +1,132 @@
+import argparse
 import tkinter as tk
-import customtkinter as ctk
-from src.pipeline import Pipeline
-from src.gui.main_window import MainWindow
+
+# Only argparse and tkinter are imported up front so the splash window shows
+# before OpenCV, mediapipe, customtkinter and the speech engine load.
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Hands-Free Computer Interaction")
+    parser.add_argument("--source", default=None,
+                        help="Frame source: webcam:<index>, video:<path>, images:<dir>, session:<dir> "
+                             "or synthetic[:<frames>] (default: the webcam configured in the profile)")
+    parser.add_argument("--replay-mode", default="recorded",
+                        help="Pacing of recorded sources: recorded, fast or fixed")
+    parser.add_argument("--fps", type=float, default=None,
+                        help="Frame rate for fixed-rate replay")
+    parser.add_argument("--loop", action="store_true",
+                        help="Restart recorded sources when they end")
+    parser.add_argument("--record", default=None, metavar="DIR",
+                        help="Record the captured frames and timestamps to a session directory")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run without a window, controlled over a local socket")
+    parser.add_argument("--control-port", type=int, default=8765,
+                        help="Port of the headless control interface on 127.0.0.1")
+    parser.add_argument("--control-token", default=None,
+                        help="Token clients send as 'auth <token>' (default: read from --control-token-file)")
+    parser.add_argument("--control-token-file", default=None,
+                        help="File holding the control token, created if missing "
+                             "(default: ~/.no-hands-control-token)")
+    parser.add_argument("--profile", default=None,
+                        help="Profile to load in headless mode (default: the current one)")
+    parser.add_argument("--mouse", action="store_true",
+                        help="Start cursor control immediately in headless mode")
+    parser.add_argument("--blendshapes", action="store_true",
+                        help="Start blendshape bindings immediately in headless mode")
+    parser.add_argument("--voice", action="store_true",
+                        help="Start voice commands immediately in headless mode")
+    return parser, parser.parse_args()
+
+class Splash(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.overrideredirect(True)
+        self.configure(bg="#2b2b2b")
+        width, height = 320, 90
+        x = (self.winfo_screenwidth() - width) // 2
+        y = (self.winfo_screenheight() - height) // 2
+        self.geometry(f"{width}x{height}+{x}+{y}")
+        tk.Label(self, text="Hands-Free Computer Interaction", fg="white", bg="#2b2b2b",
+                 font=("Segoe UI", 12, "bold")).pack(pady=(18, 4))
+        self.status = tk.Label(self, text="Starting...", fg="#b0b0b0", bg="#2b2b2b")
+        self.status.pack()
+        self.update()
+
+    def set_status(self, text):
+        self.status.configure(text=text)
+        self.update()
+
+def run_headless(parser, args):
+    from src.frame_source import create_frame_source
+    from src.pipeline import Pipeline
+    from src.control_server import ControlServer, DEFAULT_TOKEN_FILE, load_token
+
+    frame_source = None
+    if args.source:
+        try:
+            frame_source = create_frame_source(args.source, args.replay_mode, args.fps, args.loop)
+        except ValueError as e:
+            parser.error(str(e))
+
+    pipeline = Pipeline()
+    pipeline.start(frame_source=frame_source, headless=True)
+    server = None
+    try:
+        if args.record:
+            pipeline.get_camera_thread().start_recording(args.record)
+        if args.profile:
+            pipeline.load_profile(args.profile)
+
+        token_file = args.control_token_file or DEFAULT_TOKEN_FILE
+        token = args.control_token or load_token(token_file)
+        if not args.control_token:
+            print(f"Control token: {token_file}")
+        server = ControlServer(pipeline, token, port=args.control_port)
+        server.start()
+        for name in ("mouse", "blendshapes", "voice"):
+            if getattr(args, name):
+                print(f"{name}: {server.handle_command(name + ' on')}")
+
+        server.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.stop()
+            if server.state["voice"]:
+                pipeline.get_voice_processor().stop()
+        pipeline.stop()
 
 def main():
+    parser, args = parse_args()
+    if args.headless:
+        run_headless(parser, args)
+        return
+    splash = Splash()
+
+    splash.set_status("Loading modules...")
+    from src.frame_source import create_frame_source
+    from src.pipeline import Pipeline
+
+    frame_source = None
+    if args.source:
+        try:
+            frame_source = create_frame_source(args.source, args.replay_mode, args.fps, args.loop)
+        except ValueError as e:
+            splash.destroy()
+            parser.error(str(e))
+
+    splash.set_status("Starting camera and face tracking...")
     pipeline = Pipeline()
-    pipeline.start()
+    pipeline.start(frame_source=frame_source)
+    if args.record:
+        pipeline.get_camera_thread().start_recording(args.record)
+
+    splash.set_status("Opening window...")
+    from src.gui.main_window import MainWindow
+    splash.destroy()
 
     app = MainWindow()
     app.mainloop()
 
 if __name__ == "__main__":
     main()
-    
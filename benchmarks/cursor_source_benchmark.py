@@ -0,0 +1,71 @@
+"""Compares cursor sources on recorded sessions: how much jitter is left and
+how much lag the cursor filter adds at each min cutoff.
+
+    python -m benchmarks.cursor_source_benchmark recordings/run1 recordings/run2
+
+Record sessions with `python app.py --record DIR` while moving the head slowly,
+holding still and making quick movements. Streams are extracted with
+src.landmark_stream on first use.
+
+The streams go through the same filter and velocity smoothing as
+MouseController. Jitter is the RMS cursor velocity while the head is still,
+relative to the RMS velocity while it moves. Lag is the delay between the
+filtered velocity and a zero-phase smoothed reference.
+"""
+import argparse
+import numpy as np
+from src.cursor_simulation import cursor_points, reference_velocity, smoothed_steps
+from src.landmark_stream import load_streams
+
+
+def cursor_velocity(points, timestamps, mincutoff, beta):
+    velocity = np.zeros_like(points)
+    for i, step in smoothed_steps(points, timestamps, mincutoff, beta):
+        velocity[i] = step
+    return velocity
+
+
+def score(points, timestamps, mincutoff, beta, max_lag=15):
+    valid = ~np.isnan(points[:, 0])
+    output = cursor_velocity(points, timestamps, mincutoff, beta)[valid]
+    reference = reference_velocity(points)[valid]
+
+    speed = np.linalg.norm(reference, axis=1)
+    still = speed < np.percentile(speed, 25)
+    moving = speed > np.percentile(speed, 50)
+    output_speed = np.linalg.norm(output, axis=1)
+    jitter = np.sqrt(np.mean(output_speed[still] ** 2)) / max(np.sqrt(np.mean(output_speed[moving] ** 2)), 1e-9)
+
+    signal = output[:, 0] - output[:, 0].mean()
+    target = reference[:, 0] - reference[:, 0].mean()
+    correlations = [np.dot(signal[lag:], target[:len(target) - lag]) for lag in range(max_lag)]
+    frame_time = np.median(np.diff(timestamps[valid]))
+    lag = int(np.argmax(correlations)) * frame_time
+    return jitter, lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jitter vs lag of the landmark and head-pose cursor sources")
+    parser.add_argument("sessions", nargs="+")
+    parser.add_argument("--mincutoffs", type=float, nargs="+", default=[0.1, 0.3, 0.5, 1.0, 1.5, 3.0])
+    parser.add_argument("--beta", type=float, default=0.07)
+    parser.add_argument("--head-pose-gain", type=float, nargs=2, default=[80.0, 80.0])
+    args = parser.parse_args()
+
+    print(f"{'session':<24} {'source':<10} {'mincutoff':>9} {'jitter':>8} {'lag ms':>8}")
+    for session_path in args.sessions:
+        streams = load_streams(session_path)
+        timestamps = streams["timestamps"]
+
+        for name in ("landmarks", "head_pose"):
+            points = cursor_points(streams, name, args.head_pose_gain)
+            if np.all(np.isnan(points[:, 0])):
+                print(f"{session_path:<24} {name:<10} no data")
+                continue
+            for mincutoff in args.mincutoffs:
+                jitter, lag = score(points, timestamps, mincutoff, args.beta)
+                print(f"{session_path:<24} {name:<10} {mincutoff:9.2f} {jitter * 100:7.1f}% {lag * 1000:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Measures the cost of injecting one cursor move with each input backend.
+
+    python -m benchmarks.input_backend_benchmark --events 2000
+
+Each backend moves the cursor back and forth by one pixel, so it ends where
+it started; keys and buttons are not sent. The coalesced row queues
+`--coalesce` sub-pixel moves per flush, the way the cursor output thread
+does when it falls behind, and reports the cost per queued move.
+"""
+import argparse
+import time
+import numpy as np
+from src.input_backend import create_input_backend, BACKEND_NULL, BACKEND_PYAUTOGUI, BACKEND_XTEST
+
+
+def time_moves(backend, events):
+    durations = np.empty(events)
+    for i in range(events):
+        step = 1 if i % 2 == 0 else -1
+        start = time.perf_counter()
+        backend.move(step, step)
+        backend.flush()
+        durations[i] = time.perf_counter() - start
+    return durations
+
+
+def time_coalesced(backend, events, coalesce):
+    # coalesce moves of 1/coalesce px add up to one pixel per flush.
+    flushes = max(events // coalesce, 1)
+    step = 1.0 / coalesce
+    start = time.perf_counter()
+    for i in range(flushes):
+        sign = 1 if i % 2 == 0 else -1
+        for _ in range(coalesce):
+            backend.move(sign * step, sign * step)
+        backend.flush()
+    return (time.perf_counter() - start) / (flushes * coalesce)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-event cost of the input backends")
+    parser.add_argument("--backends", nargs="+", default=[BACKEND_NULL, BACKEND_PYAUTOGUI, BACKEND_XTEST])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--coalesce", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'backend':<12} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'coalesced us':>13}")
+    for name in args.backends:
+        try:
+            backend = create_input_backend(name)
+        except Exception as e:
+            print(f"{name:<12} unavailable: {e}")
+            continue
+        if backend.name != name:
+            print(f"{name:<12} unavailable")
+            backend.close()
+            continue
+        if name == BACKEND_NULL:
+            backend.record = False
+        try:
+            durations = time_moves(backend, args.events) * 1e6
+            coalesced = time_coalesced(backend, args.events, args.coalesce) * 1e6
+            print(f"{name:<12} {durations.mean():9.1f} {np.percentile(durations, 50):9.1f} "
+                  f"{np.percentile(durations, 99):9.1f} {coalesced:13.1f}")
+        finally:
+            backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Evaluates cursor prediction on recorded sessions: how much perceived lag
+each predictor removes and how far it overshoots when the head stops.
+
+    python -m benchmarks.prediction_benchmark recordings/run1 --latency-ms 60
+
+Streams are extracted with src.landmark_stream on first use. The landmark
+cursor goes through the same filter, velocity smoothing and prediction as
+MouseController (without the acceleration curve) and each result is assumed
+to reach the screen `--latency-ms` after capture. Positions are in camera
+pixels.
+
+Lag is the time shift that best aligns the displayed position with a
+lightly smoothed reference of the real one. Overshoot is how far the
+displayed position runs past the resting point, along the direction of
+motion, in the 300 ms after a movement ends.
+"""
+import argparse
+import numpy as np
+from src.cursor_predictor import create_predictor, PREDICTOR_CONSTANT_VELOCITY, PREDICTOR_KALMAN
+from src.landmark_stream import load_streams
+from src.cursor_simulation import smoothed_steps, predicted_step
+
+
+def simulate(points, timestamps, predictor, horizon, mincutoff, beta):
+    # MouseController.move() and predict_step() on one stretch of frames with
+    # a face; returns the integrated cursor position.
+    displayed = np.zeros_like(points)
+    filtered = np.zeros(2)
+    prev_predicted = None
+    for i, step in smoothed_steps(points, timestamps, mincutoff, beta):
+        if predictor is not None:
+            step, filtered, prev_predicted = predicted_step(
+                predictor, step, timestamps[i], horizon, filtered, prev_predicted)
+        displayed[i] = displayed[i - 1] + step
+    return displayed
+
+
+def segments(points):
+    valid = ~np.isnan(points[:, 0])
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], valid.astype(int), [0]])))
+    return [(start, end) for start, end in zip(edges[::2], edges[1::2]) if end - start > 30]
+
+
+def smooth(points, window=5):
+    kernel = np.ones(window) / window
+    padded = np.pad(points, ((window // 2, window // 2), (0, 0)), mode="edge")
+    return np.stack([np.convolve(padded[:, axis], kernel, mode="valid") for axis in (0, 1)], axis=1)
+
+
+def perceived_lag(displayed, display_times, reference, timestamps, shifts):
+    errors = []
+    for shift in shifts:
+        at = display_times - shift
+        target = np.stack([np.interp(at, timestamps, reference[:, axis]) for axis in (0, 1)], axis=1)
+        inside = (at >= timestamps[0]) & (at <= timestamps[-1])
+        errors.append(np.mean(np.sum((displayed[inside] - target[inside]) ** 2, axis=1)))
+    return shifts[int(np.argmin(errors))]
+
+
+def overshoots(displayed, reference, timestamps, moving_speed, still_speed, window=0.3):
+    speed = np.linalg.norm(np.gradient(reference, timestamps, axis=0), axis=1)
+    results = []
+    i = 1
+    while i < len(speed):
+        if speed[i - 1] > moving_speed and speed[i] <= moving_speed:
+            # Follow the deceleration to the first still frame.
+            stop = i
+            while stop < len(speed) and speed[stop] > still_speed:
+                stop += 1
+            if stop >= len(speed):
+                break
+            start = i
+            while start > 0 and speed[start - 1] > still_speed:
+                start -= 1
+            direction = reference[stop] - reference[start]
+            distance = np.linalg.norm(direction)
+            if distance > 1:
+                after = (timestamps >= timestamps[stop]) & (timestamps <= timestamps[stop] + window)
+                past = (displayed[after] - reference[stop]) @ (direction / distance)
+                results.append(max(float(np.max(past, initial=0.0)), 0.0))
+            i = stop
+        i += 1
+    return results
+
+
+def evaluate(streams, predictor_settings, latency, mincutoff, beta):
+    timestamps = streams["timestamps"]
+    points = streams["landmark_cursor"].astype(np.float64)
+    frame_time = float(np.median(np.diff(timestamps)))
+    horizon = 0.0
+    if predictor_settings is not None:
+        horizon = min(predictor_settings["horizon_scale"] * (latency + frame_time / 2),
+                      predictor_settings["max_horizon_ms"] / 1000)
+
+    lags, stops = [], []
+    for start, end in segments(points):
+        segment_points = points[start:end]
+        segment_times = timestamps[start:end]
+        predictor = None if predictor_settings is None else create_predictor(predictor_settings)
+        displayed = simulate(segment_points, segment_times, predictor, horizon, mincutoff, beta)
+        reference = smooth(segment_points) - segment_points[0]
+        # The step of each result is spread over the next frame interval.
+        display_times = segment_times + latency + frame_time / 2
+        shifts = np.arange(-0.1, 0.3, 0.005)
+        lags.append(perceived_lag(displayed, display_times, reference, segment_times, shifts))
+        speed = np.linalg.norm(np.gradient(reference, segment_times, axis=0), axis=1)
+        stops += overshoots(displayed, reference, segment_times,
+                            np.percentile(speed, 75), np.percentile(speed, 30))
+    return lags, stops, horizon
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overshoot vs perceived lag of cursor prediction")
+    parser.add_argument("sessions", nargs="+")
+    parser.add_argument("--latency-ms", type=float, default=60.0,
+                        help="Capture-to-result latency to assume (see latency_ms in the pipeline stats)")
+    parser.add_argument("--mincutoff", type=float, default=0.5)
+    parser.add_argument("--beta", type=float, default=0.07)
+    parser.add_argument("--dampings", type=float, nargs="+", default=[0.0, 5.0, 10.0, 20.0])
+    parser.add_argument("--horizon-scales", type=float, nargs="+", default=[0.5, 1.0])
+    parser.add_argument("--max-horizon-ms", type=float, default=80.0)
+    args = parser.parse_args()
+
+    candidates = [("off", None)]
+    for method in (PREDICTOR_CONSTANT_VELOCITY, PREDICTOR_KALMAN):
+        for scale in args.horizon_scales:
+            for damping in args.dampings:
+                candidates.append((f"{method} x{scale:g} d{damping:g}", {
+                    "enabled": True, "method": method, "horizon_scale": scale,
+                    "max_horizon_ms": args.max_horizon_ms, "damping": damping,
+                }))
+
+    latency = args.latency_ms / 1000
+    print(f"{'session':<24} {'predictor':<32} {'horizon ms':>10} {'lag ms':>8} {'overshoot px':>12} {'stops':>6}")
+    for session_path in args.sessions:
+        streams = load_streams(session_path)
+        if np.all(np.isnan(streams["landmark_cursor"][:, 0])):
+            print(f"{session_path:<24} no face found")
+            continue
+        for name, settings in candidates:
+            lags, stops, horizon = evaluate(streams, settings, latency, args.mincutoff, args.beta)
+            lag = np.mean(lags) * 1000 if lags else float("nan")
+            overshoot = np.mean(stops) if stops else float("nan")
+            print(f"{session_path:<24} {name:<32} {horizon * 1000:10.1f} {lag:8.1f} {overshoot:12.2f} {len(stops):6d}")
+
+
+if __name__ == "__main__":
+    main()
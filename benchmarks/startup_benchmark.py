@@ -0,0 +1,121 @@
+"""Measures import cost with `python -X importtime` and checks it against a
+budget, so a new top-level import of a heavy package is caught.
+
+    python -m benchmarks.startup_benchmark            # check against the budget
+    python -m benchmarks.startup_benchmark --update   # record the current costs
+
+Each target module is imported in a fresh interpreter. The cumulative import
+time of the target is compared with its entry in startup_budget.json and the
+run fails when it exceeds budget * tolerance + slack_ms. The slowest modules
+by self time are listed to show where a regression comes from. Importing a
+target must also leave the heavy packages listed under "heavy_modules"
+unloaded; those are imported on first use.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module, runs=3):
+    """Returns {module: (self_us, cumulative_us)} from the fastest of `runs`
+    fresh imports, so disk cache effects on the first run are discarded."""
+    best = None
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+        times = {}
+        for line in completed.stderr.splitlines():
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            times[name.strip()] = (int(self_us), int(cumulative_us))
+
+        if best is None or times.get(module, (0, 0))[1] < best.get(module, (0, 0))[1]:
+            best = times
+    return best
+
+
+def loaded_heavy_modules(module, heavy_modules):
+    # Heavy packages that importing `module` pulled into sys.modules.
+    completed = subprocess.run(
+        [sys.executable, "-c",
+         f"import sys, {module}; print(' '.join(name for name in {list(heavy_modules)!r} if name in sys.modules))"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+    return completed.stdout.split()
+
+
+def load_budget():
+    if not os.path.exists(BUDGET_FILE):
+        return {"tolerance": 1.25, "slack_ms": 25.0, "heavy_modules": [], "modules": {}}
+    with open(BUDGET_FILE, "r") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget check")
+    parser.add_argument("--update", action="store_true", help="Write the measured times as the new budget")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list per target")
+    parser.add_argument("modules", nargs="*", help="Modules to measure (default: those in the budget)")
+    args = parser.parse_args()
+
+    budget = load_budget()
+    modules = args.modules or list(budget["modules"])
+    tolerance = budget.get("tolerance", 1.25)
+    # The absolute slack keeps small modules from failing on timer noise.
+    slack_ms = budget.get("slack_ms", 25.0)
+    heavy_modules = budget.get("heavy_modules", [])
+    failed = []
+
+    for module in modules:
+        times = import_times(module, args.runs)
+        total_ms = times[module][1] / 1000
+        limit_ms = budget["modules"].get(module)
+
+        status = ""
+        if limit_ms is not None:
+            over = total_ms > limit_ms * tolerance + slack_ms
+            status = f"budget {limit_ms:.0f} ms  {'OVER' if over else 'ok'}"
+            if over:
+                failed.append(module)
+        print(f"{module:<24} {total_ms:8.1f} ms  {status}")
+
+        loaded = loaded_heavy_modules(module, heavy_modules)
+        if loaded:
+            print(f"    imports {', '.join(loaded)} at startup")
+            failed.append(module)
+
+        slowest = sorted(times.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+        for name, (self_us, cumulative_us) in slowest:
+            print(f"    {name:<40} self {self_us / 1000:7.1f} ms  cumulative {cumulative_us / 1000:7.1f} ms")
+
+        if args.update:
+            budget["modules"][module] = round(total_ms, 1)
+
+    if args.update:
+        with open(BUDGET_FILE, "w") as f:
+            json.dump(budget, f, indent=4)
+        print(f"Budget written to {BUDGET_FILE}")
+        return 0
+
+    if failed:
+        print(f"Import budget exceeded: {', '.join(dict.fromkeys(failed))}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
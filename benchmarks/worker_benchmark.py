@@ -0,0 +1,108 @@
+"""Compares in-process inference with the FaceWorker process while the main
+interpreter is kept busy, the way Tk redraws and pyautogui calls do.
+
+    python -m benchmarks.worker_benchmark --source video:clip.mp4 --seconds 20
+
+Reports capture-to-result latency and the gaps between consecutive results;
+the gaps are what shows up as cursor stutter.
+"""
+import argparse
+import threading
+import time
+import numpy as np
+from src.camera_thread import CameraThread
+from src.face_processor import FaceProcessor
+from src.face_worker import FaceWorker
+from src.frame_source import create_frame_source, REPLAY_RECORDED
+
+
+def hold_gil(stop, hitch_ms, every_ms):
+    # A pure Python loop never releases the GIL, like a long Tk callback.
+    while not stop.is_set():
+        end = time.perf_counter() + hitch_ms / 1000.0
+        while time.perf_counter() < end:
+            pass
+        stop.wait(every_ms / 1000.0)
+
+
+def percentiles(values):
+    if len(values) == 0:
+        return "n/a"
+    values = np.asarray(values) * 1000
+    return (f"p50 {np.percentile(values, 50):6.1f}  p95 {np.percentile(values, 95):6.1f}  "
+            f"max {values.max():6.1f} ms")
+
+
+def frame_shape(source):
+    # Sizes the worker's frame ring from a real frame; the camera thread
+    # opens the source again from the start.
+    if not source.open():
+        raise RuntimeError("Can't open frame source")
+    ok, frame, _ = source.read()
+    source.release()
+    if not ok:
+        raise RuntimeError("Frame source returned no frame")
+    return frame.shape
+
+
+def run(mode, args):
+    source = create_frame_source(args.source, REPLAY_RECORDED, loop=True)
+    if mode == "worker":
+        face_processor = FaceWorker(frame_shape=frame_shape(source))
+    else:
+        face_processor = FaceProcessor()
+    face_processor.preview_enabled = False
+
+    latencies = []
+    arrivals = []
+
+    def on_result(timestamp, seq, inferred):
+        now = time.monotonic()
+        arrivals.append(now)
+        if timestamp is not None:
+            latencies.append(now - timestamp)
+
+    face_processor.set_result_callback(on_result)
+    if not face_processor.initialize():
+        print(f"{mode}: landmarker failed to start")
+        return
+
+    # Give the worker time to load the model before timing starts.
+    time.sleep(args.warmup)
+    camera_thread = CameraThread(frame_callback=face_processor.process_frame, frame_source=source)
+    stop = threading.Event()
+    hitch_thread = threading.Thread(target=hold_gil, args=(stop, args.hitch_ms, args.hitch_every_ms),
+                                    daemon=True)
+
+    camera_thread.start()
+    hitch_thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    camera_thread.stop()
+    hitch_thread.join()
+    face_processor.close()
+
+    gaps = np.diff(arrivals) if len(arrivals) > 1 else []
+    print(f"{mode:<10} results {len(arrivals):5d}  ({len(arrivals) / args.seconds:5.1f}/s)")
+    print(f"{'':<10} latency  {percentiles(latencies)}")
+    print(f"{'':<10} gaps     {percentiles(gaps)}")
+    print(f"{'':<10} stats    {face_processor.get_stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process vs worker process inference under GIL load")
+    parser.add_argument("--source", default="synthetic", help="Frame source spec, as for app.py --source")
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--hitch-ms", type=float, default=30.0, help="Length of each GIL hold")
+    parser.add_argument("--hitch-every-ms", type=float, default=100.0, help="Pause between GIL holds")
+    parser.add_argument("--mode", choices=("inprocess", "worker", "both"), default="both")
+    args = parser.parse_args()
+
+    modes = ("inprocess", "worker") if args.mode == "both" else (args.mode,)
+    for mode in modes:
+        run(mode, args)
+
+
+if __name__ == "__main__":
+    main()
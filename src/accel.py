@@ -1,5 +1,5 @@
-import math
 import abc
+import numpy as np
 
 class AccelGraph(metaclass=abc.ABCMeta):
 
@@ -18,7 +18,8 @@ class SigmoidAccel(AccelGraph):
         self.slope = slope
         self.multiply = multiply
 
-    def __call__(self, x: float) -> float:
-        x = abs(x)
-        sig = 1 / (1 + math.exp(-self.slope * (x - self.shift_x)))
+    def __call__(self, x):
+        # Works on scalars and element-wise on arrays.
+        x = np.abs(x)
+        sig = 1 / (1 + np.exp(-self.slope * (x - self.shift_x)))
         return self.multiply * sig
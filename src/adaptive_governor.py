@@ -0,0 +1,118 @@
+import threading
+import time
+
+DEFAULT_LEVELS = [
+    (640, 480, 30),
+    (480, 360, 30),
+    (320, 240, 30),
+    (320, 240, 20),
+    (320, 240, 15),
+]
+
+class AdaptiveGovernor:
+    """Steps capture resolution and frame rate against a latency budget.
+
+    observe() takes the capture-to-result latency of every processed frame.
+    When its moving average stays above the budget for `down_after` frames
+    the governor moves to the next cheaper level; when it stays below
+    `lower * budget` for `up_after` frames it moves back up. The different
+    counts give hysteresis so the level does not oscillate.
+
+    Every change starts the average and the counts over, and frames that
+    were captured before the change are not counted, so one overload is
+    judged on frames of the new level only.
+    """
+
+    def __init__(self, latency_budget_ms=60.0, levels=None, level=0,
+                 lower=0.6, down_after=15, up_after=90, smoothing=0.1, on_change=None):
+        self.levels = [tuple(l) for l in (levels or DEFAULT_LEVELS)]
+        self.latency_budget = latency_budget_ms / 1000.0
+        self.lower = lower
+        self.down_after = down_after
+        self.up_after = up_after
+        self.smoothing = smoothing
+        self.on_change = on_change
+        self.lock = threading.Lock()
+
+        self.level_index = min(max(int(level), 0), len(self.levels) - 1)
+        self.average_latency = None
+        self.over_budget = 0
+        self.under_budget = 0
+        self.changed_at = None
+        self.observed = 0
+        self.skipped = 0
+        self.changes = 0
+
+    @property
+    def level(self):
+        return self.levels[self.level_index]
+
+    def set_source_fps(self, fps):
+        # The top level runs at the rate the camera negotiated rather than
+        # the configured one, so the governor only ever throttles below it.
+        if not fps or fps <= 0:
+            return
+        with self.lock:
+            width, height, _ = self.levels[0]
+            self.levels[0] = (width, height, fps)
+
+    def observe(self, latency, timestamp=None):
+        # timestamp is the frame's capture time on the time.monotonic() clock.
+        if timestamp is None:
+            timestamp = time.monotonic() - latency
+        with self.lock:
+            if self.changed_at is not None and timestamp < self.changed_at:
+                self.skipped += 1
+                return False
+            self.observed += 1
+            if self.average_latency is None:
+                self.average_latency = latency
+            else:
+                self.average_latency += self.smoothing * (latency - self.average_latency)
+
+            if self.average_latency > self.latency_budget:
+                self.over_budget += 1
+                self.under_budget = 0
+            elif self.average_latency < self.lower * self.latency_budget:
+                self.under_budget += 1
+                self.over_budget = 0
+            else:
+                self.over_budget = 0
+                self.under_budget = 0
+
+            new_index = self.level_index
+            if self.over_budget >= self.down_after and self.level_index < len(self.levels) - 1:
+                new_index += 1
+            elif self.under_budget >= self.up_after and self.level_index > 0:
+                new_index -= 1
+
+            if new_index == self.level_index:
+                return False
+
+            average = self.average_latency
+            self.level_index = new_index
+            self.average_latency = None
+            self.over_budget = 0
+            self.under_budget = 0
+            self.changed_at = timestamp + latency
+            self.changes += 1
+            level = self.level
+
+        print(f"Governor: {level[0]}x{level[1]} @ {level[2]} fps (avg latency {average * 1000:.1f} ms)")
+        if self.on_change:
+            self.on_change(new_index, level)
+        return True
+
+    def get_stats(self):
+        with self.lock:
+            width, height, fps = self.level
+            return {
+                "level": self.level_index,
+                "width": width,
+                "height": height,
+                "fps": fps,
+                "average_latency_ms": None if self.average_latency is None else self.average_latency * 1000,
+                "latency_budget_ms": self.latency_budget * 1000,
+                "changes": self.changes,
+                "skipped": self.skipped,
+            }
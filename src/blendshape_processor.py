@@ -1,13 +1,22 @@
 import time
-import pyautogui
 from collections import deque
+from src.landmarks import BLENDSHAPE_INDEX
+from src.input_backend import PyAutoGuiBackend
+
+JAW_OPEN = BLENDSHAPE_INDEX["jawOpen"]
 
 class BlendshapeProcessor:    
-    def __init__(self, profile_manager=None):
+    def __init__(self, profile_manager=None, input_backend=None):
         self.profile_manager = profile_manager
+        self.input_backend = input_backend or PyAutoGuiBackend()
         
         self.default_threshold = 0.5
         self.bindings = []
+        # binding_index maps blendshape name -> binding; bound_scores holds
+        # (name, score index, binding) for every binding the model can score.
+        self.binding_index = {}
+        self.bound_scores = []
+        self.current_blendshapes = None
         
         self.active_key = None 
         self.active_action = None
@@ -29,6 +38,11 @@ class BlendshapeProcessor:
                                "mouthRollLower", "mouthFunnel", "mouthSmileLeft", "jawOpen"]
         self.eye_priority = ["eyeLookInLeft", "eyeLookOutLeft", "eyeLookUpLeft", "eyeLookDownLeft"]
         self.brow_priority = ["browDownLeft", "browInnerUp"]
+        self.priority = {}
+        for category, names in (("mouth", self.mouth_priority), ("eye", self.eye_priority),
+                                ("brow", self.brow_priority)):
+            for rank, name in enumerate(names):
+                self.priority[name] = (category, rank)
 
         self.actions = {
             "mouse": [
@@ -91,6 +105,15 @@ class BlendshapeProcessor:
         
         self.bindings = bs_settings.get("bindings", [])
         self.default_threshold = bs_settings.get("threshold", 0.5)
+        self._index_bindings()
+
+    def _index_bindings(self):
+        # Rebuilt whenever bindings are added or removed; thresholds and
+        # modes are read from the binding dicts, so in-place edits still apply.
+        self.binding_index = {binding["blendshape"]: binding for binding in self.bindings}
+        self.bound_scores = [(name, BLENDSHAPE_INDEX[name], binding)
+                             for name, binding in self.binding_index.items()
+                             if name in BLENDSHAPE_INDEX]
 
     def enable(self):
         self.is_enabled = True
@@ -136,7 +159,8 @@ class BlendshapeProcessor:
         except Exception as e:
             print(f"Error saving blendshape settings: {e}")
     
-    def update_blendshape(self, blendshapes):
+    def update_blendshape(self, blendshapes, timestamp=None):
+        # blendshapes is the float32 score vector published by FaceProcessor.
         self.current_blendshapes = blendshapes
 
         if not self.is_enabled:
@@ -144,17 +168,17 @@ class BlendshapeProcessor:
                 self._release_key()
             return None, 0
 
-        if not blendshapes:
+        if blendshapes is None:
             if self.active_key:
                 self._release_key()
             return None, 0
         
-        action, value = self.process_blendshapes(blendshapes)
+        action, value = self.process_blendshapes(blendshapes, timestamp)
 
         return action, value
 
-    def process_blendshapes(self, blendshapes):
-        if not blendshapes:
+    def process_blendshapes(self, blendshapes, timestamp=None):
+        if blendshapes is None:
             if hasattr(self, 'active_categories'):
                 for category in self.active_categories:
                     self._release_category(category)
@@ -162,32 +186,21 @@ class BlendshapeProcessor:
                 self._release_key()
             return None, 0
         
-        current_time = time.time()
-        blendshape_values = {}
-
-        jaw_open_value = 0.0
-        
-        for blendshape in blendshapes:
-            name = blendshape.category_name
-            value = blendshape.score
-            blendshape_values[name] = value
+        current_time = timestamp if timestamp is not None else time.monotonic()
 
-            if name == "jawOpen":
-                jaw_open_value = value
-
-        if jaw_open_value > self.jaw_open_threshold:
+        if blendshapes[JAW_OPEN] > self.jaw_open_threshold:
             self.jaw_open_counter = 0
         else:
             self.jaw_open_counter += 1
             
-        self._process_hold_mode(blendshape_values)
+        self._process_hold_mode(blendshapes)
 
-        action, value = self._process_press_mode(blendshape_values, current_time)
+        action, value = self._process_press_mode(blendshapes, current_time)
 
         if self.active_action == "scroll_up":
-            pyautogui.scroll(5)  
+            self.input_backend.scroll(5)  
         elif self.active_action == "scroll_down":
-            pyautogui.scroll(-5)
+            self.input_backend.scroll(-5)
 
         return action, value
     
@@ -205,25 +218,19 @@ class BlendshapeProcessor:
         if current_active:
             binding = self._find_binding(current_active)
             if (binding and binding.get("mode", "hold") == "hold" and
-                current_active in blendshape_values and
-                blendshape_values[current_active] >= binding.get("threshold", self.default_threshold)):
+                blendshape_values[BLENDSHAPE_INDEX[current_active]] >= binding.get("threshold", self.default_threshold)):
                 return  
             else:
                 self._release_category(category)
         
+        # priority_list is ordered, so the first match has the best priority.
         best_candidate = None
-        best_priority = float('inf')
-        
         for name in priority_list:
-            if name in blendshape_values:
-                binding = self._find_binding(name)
-                if (binding and binding.get("mode", "hold") == "hold" and 
-                    blendshape_values[name] >= binding.get("threshold", self.default_threshold)):
-                    
-                    priority = priority_list.index(name)
-                    if priority < best_priority:
-                        best_priority = priority
-                        best_candidate = name
+            binding = self._find_binding(name)
+            if (binding and binding.get("mode", "hold") == "hold" and 
+                blendshape_values[BLENDSHAPE_INDEX[name]] >= binding.get("threshold", self.default_threshold)):
+                best_candidate = name
+                break
         
         if best_candidate and not current_active:
             self._hold_category(category, best_candidate)
@@ -240,15 +247,15 @@ class BlendshapeProcessor:
         try:
             if action in self.actions["mouse"]:
                 if action in ["mouse_click", "mouse_left_click"]:
-                    pyautogui.mouseDown(button="left")
+                    self.input_backend.mouse_down(button="left")
                 elif action == "mouse_right_click":
-                    pyautogui.mouseDown(button="right")
+                    self.input_backend.mouse_down(button="right")
                 elif action == "mouse_middle_click":
-                    pyautogui.mouseDown(button="middle")
+                    self.input_backend.mouse_down(button="middle")
                     
             elif action.startswith("key_"):
                 key = action[4:]  
-                pyautogui.keyDown(key)
+                self.input_backend.key_down(key)
                 
             print(f"[{category}] Key Down: {blendshape_name} -> {action}")
         except Exception as e:
@@ -270,15 +277,15 @@ class BlendshapeProcessor:
         try:
             if action in self.actions["mouse"]:
                 if action in ["mouse_click", "mouse_left_click"]:
-                    pyautogui.mouseUp(button="left")
+                    self.input_backend.mouse_up(button="left")
                 elif action == "mouse_right_click":
-                    pyautogui.mouseUp(button="right")
+                    self.input_backend.mouse_up(button="right")
                 elif action == "mouse_middle_click":
-                    pyautogui.mouseUp(button="middle")
+                    self.input_backend.mouse_up(button="middle")
                     
             elif action.startswith("key_"):
                 key = action[4:] 
-                pyautogui.keyUp(key)
+                self.input_backend.key_up(key)
                 
             print(f"[{category}] Key Up: {blendshape_name} -> {action}")
         except Exception as e:
@@ -291,12 +298,12 @@ class BlendshapeProcessor:
         eye_candidates = []
         brow_candidates = []
         
-        for name, value in blendshape_values.items():
-            binding = self._find_binding(name)
-            if (binding and binding.get("mode", "hold") == "press" and 
+        for name, index, binding in self.bound_scores:
+            value = float(blendshape_values[index])
+            if (binding.get("mode", "hold") == "press" and 
                 value >= binding.get("threshold", self.default_threshold)):
                 
-                last_press = self.last_press_time.get(name, 0)
+                last_press = self.last_press_time.get(name, float("-inf"))
                 if current_time - last_press < self.press_cooldown:
                     continue
                 
@@ -307,14 +314,13 @@ class BlendshapeProcessor:
                     "binding": binding
                 }
                 
-                if name in self.mouth_priority:
-                    candidate["priority"] = self.mouth_priority.index(name)
+                category, priority = self.priority.get(name, (None, None))
+                candidate["priority"] = priority
+                if category == "mouth":
                     mouth_candidates.append(candidate)
-                elif name in self.eye_priority:
-                    candidate["priority"] = self.eye_priority.index(name)
+                elif category == "eye":
                     eye_candidates.append(candidate)
-                elif name in self.brow_priority:
-                    candidate["priority"] = self.brow_priority.index(name)
+                elif category == "brow":
                     brow_candidates.append(candidate)
         
         actions_to_press = []
@@ -344,21 +350,21 @@ class BlendshapeProcessor:
         try:
             if action in self.actions["mouse"]:
                 if action in ["mouse_click", "mouse_left_click"]:
-                    pyautogui.click()
+                    self.input_backend.click()
                 elif action == "mouse_right_click":
-                    pyautogui.click(button="right")
+                    self.input_backend.click(button="right")
                 elif action == "mouse_middle_click":
-                    pyautogui.click(button="middle")
+                    self.input_backend.click(button="middle")
                 elif action == "mouse_double_click":
-                    pyautogui.doubleClick()
+                    self.input_backend.double_click()
                 elif action == "scroll_up":
-                    pyautogui.scroll(3)
+                    self.input_backend.scroll(3)
                 elif action == "scroll_down":
-                    pyautogui.scroll(-3)
+                    self.input_backend.scroll(-3)
                     
             elif action.startswith("key_"):
                 key = action[4:]  
-                pyautogui.press(key)
+                self.input_backend.press(key)
                 
             print(f"Press Action: {blendshape_name} -> {action}")
         except Exception as e:
@@ -370,10 +376,7 @@ class BlendshapeProcessor:
         return True
     
     def _find_binding(self, blendshape_name):
-        for binding in self.bindings:
-            if binding["blendshape"] == blendshape_name:
-                return binding
-        return None
+        return self.binding_index.get(blendshape_name)
 
     def _get_threshold(self, blendshape_name):
         binding = self._find_binding(blendshape_name)
@@ -382,11 +385,11 @@ class BlendshapeProcessor:
         return self.default_threshold
     
     def get_blendshape_value(self, blendshape_name):
-        if hasattr(self, 'current_blendshapes') and self.current_blendshapes:
-            for blendshape in self.current_blendshapes:
-                if blendshape.category_name == blendshape_name:
-                    return blendshape.score
-        return 0.0
+        scores = self.current_blendshapes
+        index = BLENDSHAPE_INDEX.get(blendshape_name)
+        if scores is None or index is None:
+            return 0.0
+        return float(scores[index])
 
     def _hold_key(self, blendshape_name, action):
         self.active_key = blendshape_name
@@ -395,17 +398,17 @@ class BlendshapeProcessor:
         try:
             if action in self.actions["mouse"]:
                 if action in ["mouse_click", "mouse_left_click"]:
-                    pyautogui.mouseDown(button="left")
+                    self.input_backend.mouse_down(button="left")
                 elif action == "mouse_right_click":
-                    pyautogui.mouseDown(button="right")
+                    self.input_backend.mouse_down(button="right")
                 elif action == "mouse_middle_click":
-                    pyautogui.mouseDown(button="middle")
+                    self.input_backend.mouse_down(button="middle")
                 elif action in ["scroll_up", "scroll_down"]:
                     pass 
                     
             elif action.startswith("key_"):
                 key = action[4:]  
-                pyautogui.keyDown(key)
+                self.input_backend.key_down(key)
                 
             print(f"Key Down: {blendshape_name} -> {action}")
         except Exception as e:
@@ -422,17 +425,17 @@ class BlendshapeProcessor:
             
             if action in self.actions["mouse"]:
                 if action in ["mouse_click", "mouse_left_click"]:
-                    pyautogui.mouseUp(button="left")
+                    self.input_backend.mouse_up(button="left")
                 elif action == "mouse_right_click":
-                    pyautogui.mouseUp(button="right")
+                    self.input_backend.mouse_up(button="right")
                 elif action == "mouse_middle_click":
-                    pyautogui.mouseUp(button="middle")
+                    self.input_backend.mouse_up(button="middle")
                 elif action in ["scroll_up", "scroll_down"]:
                     pass
                     
             elif action.startswith("key_"):
                 key = action[4:] 
-                pyautogui.keyUp(key)
+                self.input_backend.key_up(key)
                 
             print(f"Key Up: {self.active_key} -> {action}")
         except Exception as e:
@@ -479,6 +482,7 @@ class BlendshapeProcessor:
             "threshold": threshold,
             "mode": mode
         })
+        self._index_bindings()
         
         self.save_to_profile()
         return True
@@ -499,6 +503,7 @@ class BlendshapeProcessor:
         for i, binding in enumerate(self.bindings):
             if binding["blendshape"] == blendshape:
                 self.bindings.pop(i)
+                self._index_bindings()
                     
                 self.save_to_profile()
                 return True
@@ -507,8 +512,19 @@ class BlendshapeProcessor:
 
     def set_bindings(self, bindings):
         self.bindings = bindings
+        self._index_bindings()
         self.save_to_profile()
     
+    def on_camera_degraded(self):
+        # Release held buttons and keys instead of leaving them down for the
+        # length of the outage.
+        if hasattr(self, 'active_categories'):
+            for category in self.active_categories:
+                self._release_category(category)
+        if self.active_key:
+            self._release_key()
+        self.current_blendshapes = None
+
     def cleanup(self):
         if self.active_key:
             self._release_key()
\ No newline at end of file
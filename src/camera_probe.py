@@ -0,0 +1,120 @@
+import argparse
+import time
+from src.frame_source import WebcamSource, platform_backends
+
+DEFAULT_FOURCCS = ("MJPG", "YUYV", None)
+DEFAULT_FPS = (60, 30)
+
+
+def probe_configuration(device_index, backend, fourcc, fps, width=640, height=480,
+                        warmup_frames=10, sample_frames=60):
+    """Opens the camera with one configuration and measures the frame rate it
+    actually delivers. Returns None if the camera does not open or read."""
+    source = WebcamSource(device_index, width, height, backend=backend, fourcc=fourcc, fps=fps)
+    try:
+        if not source.open():
+            return None
+
+        for _ in range(warmup_frames):
+            ret, frame, _ = source.read()
+            if not ret:
+                return None
+
+        start = time.monotonic()
+        for _ in range(sample_frames):
+            ret, frame, _ = source.read()
+            if not ret:
+                return None
+        elapsed = time.monotonic() - start
+
+        negotiated = source.get_format()
+        return {
+            "backend": backend,
+            "fourcc": fourcc,
+            "fps": fps,
+            "width": width,
+            "height": height,
+            "actual_width": frame.shape[1],
+            "actual_height": frame.shape[0],
+            "actual_fourcc": negotiated["fourcc"],
+            "achieved_fps": sample_frames / elapsed if elapsed > 0 else 0.0,
+        }
+    except Exception as e:
+        print(f"Probe error ({backend}, {fourcc}, {fps} fps): {e}")
+        return None
+    finally:
+        source.release()
+
+
+def probe_camera(device_index=0, backends=None, fourccs=DEFAULT_FOURCCS, fps_list=DEFAULT_FPS,
+                 width=640, height=480, sample_frames=60):
+    """Tries every backend/FOURCC/fps combination and returns the working
+    ones, fastest first. Configurations that silently fall back to another
+    resolution are ranked after the ones that deliver the requested size."""
+    results = []
+    for backend in backends or platform_backends():
+        for fourcc in fourccs:
+            for fps in fps_list:
+                result = probe_configuration(device_index, backend, fourcc, fps, width, height,
+                                             sample_frames=sample_frames)
+                label = f"{backend:<12} {fourcc or 'default':<8} {fps:>3} fps"
+                if result is None:
+                    print(f"{label}  failed")
+                    continue
+                print(f"{label}  -> {result['achieved_fps']:.1f} fps "
+                      f"({result['actual_width']}x{result['actual_height']} {result['actual_fourcc']})")
+                results.append(result)
+
+    def rank(result):
+        exact_size = result["actual_width"] == width and result["actual_height"] == height
+        return (exact_size, result["achieved_fps"])
+
+    results.sort(key=rank, reverse=True)
+    return results
+
+
+def save_best(profile_manager, device_index, result, profile_name=None):
+    config = {
+        "backend": result["backend"],
+        "fourcc": result["fourcc"],
+        "fps": result["fps"],
+        "width": result["width"],
+        "height": result["height"],
+        "achieved_fps": round(result["achieved_fps"], 1),
+    }
+    profile_manager.update_profile_settings({
+        "camera": {"devices": {str(device_index): config}}
+    }, profile_name)
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the fastest capture configuration of a webcam")
+    parser.add_argument("--device", type=int, default=0)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--frames", type=int, default=60, help="Frames timed per configuration")
+    parser.add_argument("--backends", nargs="*", default=None,
+                        help=f"Backends to try (default: {' '.join(platform_backends())})")
+    parser.add_argument("--profile", default=None,
+                        help="Store the fastest configuration in this profile")
+    args = parser.parse_args()
+
+    results = probe_camera(args.device, args.backends, width=args.width, height=args.height,
+                           sample_frames=args.frames)
+    if not results:
+        print("No working camera configuration found.")
+        return 1
+
+    best = results[0]
+    print(f"Best: {best['backend']} {best['fourcc'] or 'default'} @ {best['achieved_fps']:.1f} fps")
+
+    if args.profile:
+        from src.profile_manager import ProfileManager
+        config = save_best(ProfileManager(), args.device, best, args.profile)
+        print(f"Saved to profile '{args.profile}': {config}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
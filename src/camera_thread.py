@@ -2,95 +2,432 @@ import cv2, numpy as np
 import threading
 import time
 from threading import Thread, Event
+from src.frame_source import WebcamSource
+from src.frame_mailbox import FrameMailbox
+from src.frame_pool import FramePool
+from src.session_recorder import SessionRecorder
+
+CAPTURE_READ = "read"
+CAPTURE_LATEST = "latest"
+
+CAMERA_CONNECTING = "connecting"
+CAMERA_STREAMING = "streaming"
+CAMERA_DEGRADED = "degraded"
+CAMERA_STOPPED = "stopped"
 
 class CameraThread:
-    
-    def __init__(self, frame_callback=None):
+
+    def __init__(self, frame_callback=None, frame_source=None):
         self.lock = threading.Lock()
         self.frame_callback = frame_callback
-        self.cap = None
+        self.frame_width = 640
+        self.frame_height = 480
+        self.frame_source = frame_source or WebcamSource(0, self.frame_width, self.frame_height)
         self.is_running = False
         self.stop_flag = Event()
         self.camera_thread = None
+        self.inference_thread = None
+        self.pool_size = 6
+        self.frame_pool = FramePool((self.frame_height, self.frame_width, 3), self.pool_size)
+        self.mailbox = FrameMailbox(discard=lambda frame: frame.release())
+        self.frame_seq = 0
+        self.governor = None
+        self.frame_credit = 1.0
+        self.last_frame_time = None
+        self.throttled = 0
+        self.scaled_frame = None
         self.current_frame = None
-        self.frame_width = 640
-        self.frame_height = 480
-    
+        self.current_timestamp = None
+
+        # "latest" grabs without decoding while inference is busy and drains
+        # frames queued in the driver; "read" decodes every frame, which keeps
+        # replays of recorded sources deterministic.
+        self.capture_mode = CAPTURE_LATEST if self.frame_source.live else CAPTURE_READ
+        self.drain_threshold = 0.004
+        self.max_drain = 4
+        self.inference_idle = Event()
+        self.inference_idle.set()
+        self.frame_interval = 1 / 30
+        self.last_grab_time = None
+        self.drained = 0
+        self.skipped_decodes = 0
+        self.frame_age = None
+        self.max_frame_age = 0.0
+
+        # Reconnection runs on its own thread with exponential backoff while
+        # the capture loop waits; listeners are told about every transition.
+        self.state = CAMERA_STOPPED
+        self.state_listeners = []
+        self.max_failures = 5
+        self.failure_count = 0
+        self.reconnect_thread = None
+        self.reconnected = Event()
+        self.reconnect_delay = 0.25
+        self.max_reconnect_delay = 8.0
+        self.backoff_delay = self.reconnect_delay
+        self.max_devices = 4
+        self.read_failures = 0
+        self.reconnects = 0
+
+        self.recorder = None
+        self.recording_path = None
+        self.recording_shape = None
+
+    def add_state_listener(self, listener):
+        self.state_listeners.append(listener)
+
+    def set_state(self, state):
+        if state == self.state:
+            return
+        self.state = state
+        print(f"Camera {state}.")
+        for listener in self.state_listeners:
+            try:
+                listener(state)
+            except Exception as e:
+                print(f"Camera state listener error: {e}")
+
     def start(self):
         if not self.is_running:
             self.is_running = True
             self.stop_flag.clear()
+            self.mailbox.reopen()
             self.camera_thread = Thread(target=self.camera_loop, daemon=True)
             self.camera_thread.start()
+            self.inference_thread = Thread(target=self.inference_loop, daemon=True)
+            self.inference_thread.start()
             print("Camera thread started.")
-    
+
+    def stop(self):
+        self.stop_flag.set()
+        self.reconnected.set()
+        self.mailbox.close()
+
+    def join(self, timeout=None):
+        # Waits for both loops to exit after stop(), so the source is released
+        # and a recording is closed with its metadata written.
+        for thread in (self.camera_thread, self.inference_thread):
+            if thread is not None and thread is not threading.current_thread():
+                thread.join(timeout)
+
+    def set_frame_source(self, frame_source):
+        if self.is_running:
+            print("Can't change frame source while the camera thread is running")
+            return False
+        self.frame_source = frame_source
+        return True
+
     def camera_loop(self):
+        self.set_state(CAMERA_CONNECTING)
         try:
-            self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_height)
-            
-            if not self.cap.isOpened():
-                print("Can't open camera!")
-                self.is_running = False
-                return
+            opened = self.frame_source.open()
         except Exception as e:
             print(f"Error camera init: {e}")
+            opened = False
+
+        if opened:
+            self.set_state(CAMERA_STREAMING)
+        elif self.frame_source.live:
+            self.begin_reconnect()
+        else:
+            print("Can't open frame source!")
+            self.set_state(CAMERA_STOPPED)
             self.is_running = False
             return
-        
-        failure_count = 0 
-        
+
+        self.failure_count = 0
+
         while not self.stop_flag.is_set():
+            if self.state == CAMERA_DEGRADED:
+                # Idle until the reconnect thread has a working device.
+                self.reconnected.wait(0.5)
+                continue
+
             try:
-                start_time = time.time()
-                ret, frame = self.cap.read()
-                # print(f"frame time: {time.time() - start_time:.4f} giây")
+                ret = self.grab_latest()
+                if ret:
+                    # Only the frame inference will actually take is decoded:
+                    # the grabbed one is held until inference goes idle and
+                    # dropped only when the next one is due first.
+                    grabbed_timestamp = self.frame_source.grabbed_timestamp
+                    self.update_frame_interval(grabbed_timestamp)
+                    if self.capture_mode == CAPTURE_LATEST and not self.inference_idle.is_set():
+                        if not self.inference_idle.wait(self.hold_time(grabbed_timestamp)):
+                            self.skipped_decodes += 1
+                            continue
+                    if not self.governor_allows(self.frame_source.grabbed_timestamp):
+                        continue
+                    ret, frame, timestamp = self.frame_source.retrieve()
                 if not ret:
-                    failure_count += 1
-                    print(f"Lỗi đọc frame từ camera (lần {failure_count})")
-                    
-                    if failure_count > 5:
-                        print("Thử khởi động lại camera...")
-                        self.cap.release()
-                        time.sleep(1)
-                        self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-                        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
-                        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_height)
-                        failure_count = 0
-                    
-                    time.sleep(0.1)
+                    if self.frame_source.finished:
+                        print("Frame source exhausted.")
+                        break
+
+                    self.failure_count += 1
+                    self.read_failures += 1
+                    if self.failure_count > self.max_failures:
+                        self.begin_reconnect()
+                    else:
+                        self.stop_flag.wait(0.02)
+                    continue
+                self.failure_count = 0
+
+                frame = self.scale_frame(frame)
+                self.frame_seq += 1
+
+                if self.recording_path is not None:
+                    self.open_recorder(frame.shape)
+                if not self.frame_pool.matches(frame.shape):
+                    self.frame_pool = FramePool(frame.shape, self.pool_size)
+
+                # Every buffer still referenced: drop this frame, the mailbox
+                # reports the sequence gap.
+                pooled = self.frame_pool.acquire(self.frame_seq, timestamp)
+                if pooled is None:
                     continue
-                failure_count = 0
-                
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=pooled.array)
+
+                recorder = self.recorder
+                if recorder is not None:
+                    recorder.submit(pooled)
+
+                pooled.retain()
                 with self.lock:
-                    self.current_frame = frame_rgb.copy()
-                
-                if self.frame_callback:
-                    self.frame_callback(frame_rgb)
-                
+                    previous = self.current_frame
+                    self.current_frame = pooled
+                    self.current_timestamp = timestamp
+                if previous is not None:
+                    previous.release()
+
+                if not self.mailbox.put(pooled, self.frame_seq, timestamp):
+                    pooled.release()
+
             except Exception as e:
                 print(f"Camera_loop bug: {e}")
                 time.sleep(0.1)
-            
+
+        self.frame_source.release()
+        self.stop_recording()
+        self.mailbox.close()
+        self.set_state(CAMERA_STOPPED)
+        self.is_running = False
+
+    def begin_reconnect(self):
+        # Every reconnect starts from a clean count and the shortest delay, so
+        # one burst of failures costs one reconnect.
+        self.failure_count = 0
+        self.backoff_delay = self.reconnect_delay
+        self.reconnected.clear()
+        self.set_state(CAMERA_DEGRADED)
+        if self.reconnect_thread is None or not self.reconnect_thread.is_alive():
+            self.reconnect_thread = Thread(target=self.reconnect_loop, daemon=True)
+            self.reconnect_thread.start()
+
+    def reconnect_loop(self):
+        attempt = 0
+        while not self.stop_flag.is_set():
+            attempt += 1
             try:
-                cv2.waitKey(1)
-            except:
-                pass
-    
+                self.frame_source.release()
+                if self.open_any_device():
+                    self.failure_count = 0
+                    self.backoff_delay = self.reconnect_delay
+                    self.reconnects += 1
+                    self.set_state(CAMERA_STREAMING)
+                    self.reconnected.set()
+                    return
+            except Exception as e:
+                print(f"Camera reconnect error: {e}")
+
+            delay = self.backoff_delay
+            if attempt == 1 or delay >= self.max_reconnect_delay:
+                print(f"Camera reconnect attempt {attempt} failed, retrying in {delay:.1f}s")
+            self.stop_flag.wait(delay)
+            self.backoff_delay = min(delay * 2, self.max_reconnect_delay)
+
+    def open_any_device(self):
+        # Tries the configured device first, then the other indices in case
+        # the camera came back under a different one.
+        if self.frame_source.open():
+            return True
+        if not hasattr(self.frame_source, "device_index"):
+            return False
+
+        preferred = self.frame_source.device_index
+        for index in range(self.max_devices):
+            if index == preferred:
+                continue
+            self.frame_source.device_index = index
+            if self.frame_source.open():
+                print(f"Camera found at device {index}")
+                return True
+            self.frame_source.release()
+        self.frame_source.device_index = preferred
+        return False
+
+    def start_recording(self, path, shape=None):
+        # The recorder is opened by the capture loop with the shape of the
+        # first frame it captures, unless a shape is given.
+        if self.recorder is not None or self.recording_path is not None:
+            print("Already recording")
+            return False
+        self.recording_shape = shape
+        self.recording_path = path
+        return True
+
+    def open_recorder(self, frame_shape):
+        recorder = SessionRecorder(self.recording_path, self.recording_shape or frame_shape)
+        self.recording_path = None
+        recorder.start()
+        # The recorder's queue holds pooled frames too, so the pool grows by
+        # that much to keep capture from running dry.
+        self.pool_size += recorder.queue_size + 1
+        self.frame_pool = FramePool(frame_shape, self.pool_size)
+        self.recorder = recorder
+
+    def stop_recording(self):
+        self.recording_path = None
+        recorder = self.recorder
+        if recorder is None:
+            return None
+        self.recorder = None
+        recorder.stop()
+        self.pool_size -= recorder.queue_size + 1
+        return recorder.get_stats()
+
+    def set_governor(self, governor):
+        self.governor = governor
+
+    def report_latency(self, latency):
+        if self.governor:
+            self.governor.observe(latency)
+
+    def grab_latest(self):
+        # A grab that returns almost immediately was served from the driver
+        # queue, so keep grabbing until one has to wait for a fresh frame.
+        start = time.monotonic()
+        if not self.frame_source.grab():
+            return False
+        if self.capture_mode != CAPTURE_LATEST or not self.frame_source.live:
+            return True
+
+        drained = 0
+        while time.monotonic() - start < self.drain_threshold and drained < self.max_drain:
+            start = time.monotonic()
+            if not self.frame_source.grab():
+                return False
+            drained += 1
+        self.drained += drained
+        return True
+
+    def update_frame_interval(self, timestamp):
+        if self.last_grab_time is not None:
+            interval = timestamp - self.last_grab_time
+            if 0 < interval < 0.5:
+                self.frame_interval += 0.1 * (interval - self.frame_interval)
+        self.last_grab_time = timestamp
+
+    def hold_time(self, timestamp):
+        # How long a grabbed frame is worth keeping: until the next is due.
+        return min(max(timestamp + self.frame_interval - time.monotonic(), 0.0), 0.1)
+
+    def governor_allows(self, timestamp):
+        # Skips frames, before they are decoded, to hold the governor's rate.
+        if self.governor is None:
+            return True
+        fps = self.governor.level[2]
+
+        if self.last_frame_time is not None:
+            self.frame_credit = min(self.frame_credit + (timestamp - self.last_frame_time) * fps, 2.0)
+        self.last_frame_time = timestamp
+        if self.frame_credit < 1.0:
+            self.throttled += 1
+            return False
+        self.frame_credit -= 1.0
+        return True
+
+    def scale_frame(self, frame):
+        # Returns the frame scaled to the governor's resolution.
+        if self.governor is None:
+            return frame
+        width, height, _ = self.governor.level
+
+        if frame.shape[1] == width and frame.shape[0] == height:
+            return frame
+        if self.scaled_frame is None or self.scaled_frame.shape[:2] != (height, width):
+            self.scaled_frame = np.empty((height, width, 3), dtype=frame.dtype)
+        cv2.resize(frame, (width, height), dst=self.scaled_frame, interpolation=cv2.INTER_AREA)
+        return self.scaled_frame
+
+    def inference_loop(self):
+        while not self.stop_flag.is_set():
+            item = self.mailbox.get(timeout=0.1)
+            if item is None:
+                if self.mailbox.closed and self.mailbox.is_empty():
+                    break
+                continue
+
+            pooled, seq, timestamp = item
+            self.inference_idle.clear()
+            self.record_frame_age(time.monotonic() - timestamp)
+            try:
+                if self.frame_callback:
+                    self.frame_callback(pooled.readonly, timestamp, seq)
+            except Exception as e:
+                print(f"Inference_loop bug: {e}")
+            finally:
+                pooled.release()
+                self.inference_idle.set()
+
+    def record_frame_age(self, age):
+        # How old a frame is when inference picks it up.
+        if self.frame_age is None:
+            self.frame_age = age
+        else:
+            self.frame_age += 0.1 * (age - self.frame_age)
+        self.max_frame_age = max(self.max_frame_age, age)
+
     def set_frame_callback(self, callback):
         self.frame_callback = callback
 
+    def get_stats(self):
+        stats = self.mailbox.get_stats()
+        stats["captured"] = self.frame_seq
+        stats["pool"] = self.frame_pool.get_stats()
+        stats["throttled"] = self.throttled
+        stats["capture_mode"] = self.capture_mode
+        stats["drained"] = self.drained
+        stats["skipped_decodes"] = self.skipped_decodes
+        stats["frame_age_ms"] = None if self.frame_age is None else self.frame_age * 1000
+        stats["max_frame_age_ms"] = self.max_frame_age * 1000
+        stats["driver_buffer_size_set"] = getattr(self.frame_source, "buffer_size_supported", False)
+        stats["state"] = self.state
+        stats["read_failures"] = self.read_failures
+        stats["reconnects"] = self.reconnects
+        if self.recorder:
+            stats["recorder"] = self.recorder.get_stats()
+        if self.governor:
+            stats["governor"] = self.governor.get_stats()
+        return stats
+
     def get_frame(self):
+        # Read-only view of the latest frame. It stays valid until the pool
+        # cycles; use acquire_frame() to hold on to a frame for longer.
+        with self.lock:
+            if self.current_frame is not None:
+                return self.current_frame.readonly
+            return None
+
+    def acquire_frame(self):
+        # The caller owns the returned reference and must release() it.
         with self.lock:
             if self.current_frame is not None:
-                return self.current_frame.copy()
+                return self.current_frame.retain()
             return None
-    
+
     def __del__(self):
         if hasattr(self, "is_running") and self.is_running:
-            self.stop_flag.set()  
-        if hasattr(self, "cap") and self.cap:
-            self.cap.release()
\ No newline at end of file
+            self.stop()
+        if hasattr(self, "frame_source") and self.frame_source:
+            self.frame_source.release()
@@ -0,0 +1,173 @@
+import hmac
+import json
+import os
+import re
+import secrets
+import socketserver
+import threading
+
+DEFAULT_PORT = 8765
+DEFAULT_TOKEN_FILE = os.path.join(os.path.expanduser("~"), ".no-hands-control-token")
+# Web pages can reach localhost, so a connection that opens like an HTTP
+# request is closed before any of its lines is read as a command.
+HTTP_REQUEST_LINE = re.compile(rb"^[A-Z]+ \S+ HTTP/\d")
+MAX_LINE = 4096
+
+HELP = {
+    "status": "Pipeline, camera and face processing stats",
+    "mouse on|off": "Cursor control",
+    "blendshapes on|off": "Blendshape bindings",
+    "voice on|off": "Voice commands",
+    "mode live|image": "Landmarker running mode",
+    "profile [name]": "Switch profile, or show the current one",
+    "stop": "Stop the pipeline and exit",
+}
+
+
+def load_token(path=DEFAULT_TOKEN_FILE):
+    """Returns the shared control token stored at path, creating one that
+    only this user can read when there is none."""
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            token = f.read().strip()
+        if token:
+            return token
+    token = secrets.token_urlsafe(24)
+    with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+        f.write(token + "\n")
+    return token
+
+
+class ControlServer:
+    """Line-based control interface for running the pipeline without a
+    window. Listens on localhost only; every command line gets one JSON line
+    back. The first line of a connection must be `auth <token>`, e.g.
+    `(echo "auth $(cat ~/.no-hands-control-token)"; echo status) | nc 127.0.0.1 8765`.
+    """
+
+    def __init__(self, pipeline, token, port=DEFAULT_PORT, host="127.0.0.1"):
+        if not token:
+            raise ValueError("The control server needs a token")
+        self.pipeline = pipeline
+        self.token = token
+        self.address = (host, port)
+        self.server = None
+        self.thread = None
+        self.stopped = threading.Event()
+        self.state = {"mouse": False, "blendshapes": False, "voice": False}
+
+    def start(self):
+        control = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, message):
+                self.wfile.write((json.dumps(message, default=str) + "\n").encode("utf-8"))
+
+            def handle(self):
+                first = self.rfile.readline(MAX_LINE)
+                if HTTP_REQUEST_LINE.match(first):
+                    return
+                if not control.authorized(first.decode("utf-8", "replace")):
+                    self.reply({"ok": False, "error": "send 'auth <token>' first"})
+                    return
+                self.reply({"ok": True})
+                while not control.stopped.is_set():
+                    line = self.rfile.readline(MAX_LINE)
+                    if not line:
+                        break
+                    self.reply(control.handle_command(line.decode("utf-8", "replace")))
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer(self.address, Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        host, port = self.server.server_address[:2]
+        print(f"Control server listening on {host}:{port}")
+
+    def stop(self):
+        self.stopped.set()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def authorized(self, line):
+        words = line.split()
+        return (len(words) == 2 and words[0].lower() == "auth"
+                and hmac.compare_digest(words[1].encode("utf-8"), self.token.encode("utf-8")))
+
+    def wait(self, timeout=None):
+        return self.stopped.wait(timeout)
+
+    def handle_command(self, line):
+        words = line.strip().split()
+        if not words:
+            return {"ok": False, "error": "empty command"}
+        command, arguments = words[0].lower(), words[1:]
+        try:
+            if command == "status":
+                return {"ok": True, "state": self.state, "stats": self.pipeline.get_stats()}
+            if command in ("mouse", "blendshapes", "voice"):
+                return self.set_control(command, arguments)
+            if command == "mode":
+                return self.set_mode(arguments)
+            if command == "profile":
+                return self.set_profile(arguments)
+            if command == "stop":
+                self.stopped.set()
+                return {"ok": True}
+            if command == "help":
+                return {"ok": True, "commands": HELP}
+            return {"ok": False, "error": f"unknown command '{command}'", "commands": HELP}
+        except Exception as e:
+            print(f"Control command error: {e}")
+            return {"ok": False, "error": str(e)}
+
+    def set_control(self, name, arguments):
+        if not arguments or arguments[0] not in ("on", "off"):
+            return {"ok": False, "error": f"usage: {name} on|off"}
+        enable = arguments[0] == "on"
+        ok = True
+
+        if name == "mouse":
+            mouse_controller = self.pipeline.get_mouse_controller()
+            if enable:
+                mouse_controller.start_tracking()
+            else:
+                mouse_controller.stop_tracking()
+        elif name == "blendshapes":
+            blendshape_processor = self.pipeline.get_blendshape_processor()
+            if enable:
+                blendshape_processor.enable()
+            else:
+                blendshape_processor.disable()
+                blendshape_processor.cleanup()
+        elif name == "voice":
+            voice_processor = self.pipeline.get_voice_processor()
+            ok = voice_processor.start() if enable else voice_processor.stop()
+
+        if ok:
+            self.state[name] = enable
+        return {"ok": bool(ok), "state": self.state}
+
+    def set_mode(self, arguments):
+        modes = {"live": "LIVE_STREAM", "image": "IMAGE"}
+        if not arguments or arguments[0].lower() not in modes:
+            return {"ok": False, "error": "usage: mode live|image"}
+        face_processor = self.pipeline.get_face_processor()
+        if face_processor.get_current_mode() != modes[arguments[0].lower()]:
+            if not face_processor.toggle_mode():
+                return {"ok": False, "error": "mode switch failed"}
+        return {"ok": True, "mode": face_processor.get_current_mode()}
+
+    def set_profile(self, arguments):
+        profile_manager = self.pipeline.get_profile_manager()
+        if not arguments:
+            return {"ok": True, "profile": profile_manager.get_current_profile_name(),
+                    "profiles": profile_manager.list_profiles()}
+        name = arguments[0]
+        if not profile_manager.profile_exists(name):
+            return {"ok": False, "error": f"no profile '{name}'"}
+        self.pipeline.load_profile(name)
+        return {"ok": True, "profile": name}
@@ -0,0 +1,130 @@
+import threading
+import time
+
+DEFAULT_OUTPUT_RATE = 180.0
+
+
+class CursorOutput(threading.Thread):
+    """Moves the cursor at a fixed rate, independent of the camera.
+
+    Each camera sample adds a displacement that is spread evenly over the
+    expected time until the next sample, so the cursor moves in small steps
+    between samples instead of one jump per frame. Whatever is still pending
+    when the next sample is due, or when it arrives early, is emitted on the
+    next tick, so the total movement matches the samples exactly and a new
+    sample is never slowed down by the previous one. Sub-pixel remainders are
+    kept by the input backend.
+    """
+
+    def __init__(self, input_backend, rate_hz=DEFAULT_OUTPUT_RATE):
+        super().__init__(daemon=True, name="cursor-output")
+        self.input_backend = input_backend
+        self.rate_hz = rate_hz
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.running = True
+
+        self.pending_x = 0.0
+        self.pending_y = 0.0
+        self.leftover_x = 0.0
+        self.leftover_y = 0.0
+        self.deadline = 0.0
+        self.sample_interval = 1 / 30
+        self.last_sample_timestamp = None
+
+        self.samples = 0
+        self.ticks = 0
+        self.moves = 0
+        self.late_ticks = 0
+
+    def set_rate(self, rate_hz):
+        self.rate_hz = min(max(float(rate_hz), 30.0), 1000.0)
+
+    def submit(self, dx, dy, timestamp=None):
+        # Called from the result callback; only records the target.
+        now = time.monotonic()
+        if timestamp is None:
+            timestamp = now
+        with self.lock:
+            if self.last_sample_timestamp is not None:
+                interval = timestamp - self.last_sample_timestamp
+                if 0 < interval < 0.2:
+                    self.sample_interval += 0.2 * (interval - self.sample_interval)
+            self.last_sample_timestamp = timestamp
+            # What the previous sample has not spread yet goes out on the next
+            # tick; only the new displacement is spread over the next interval.
+            self.leftover_x += self.pending_x
+            self.leftover_y += self.pending_y
+            self.pending_x = dx
+            self.pending_y = dy
+            self.deadline = now + self.sample_interval
+            self.samples += 1
+        self.wake.set()
+
+    def clear(self):
+        with self.lock:
+            self.pending_x = self.pending_y = 0.0
+            self.leftover_x = self.leftover_y = 0.0
+            self.last_sample_timestamp = None
+        self.input_backend.discard_pending()
+
+    def step(self, now, period):
+        with self.lock:
+            remaining = self.deadline - now
+            fraction = 1.0 if remaining <= period else period / remaining
+            dx = self.pending_x * fraction
+            dy = self.pending_y * fraction
+            self.pending_x -= dx
+            self.pending_y -= dy
+            dx += self.leftover_x
+            dy += self.leftover_y
+            self.leftover_x = self.leftover_y = 0.0
+            idle = fraction == 1.0
+        return dx, dy, idle
+
+    def run(self):
+        next_tick = time.monotonic()
+        while self.running:
+            period = 1 / self.rate_hz
+            now = time.monotonic()
+            if now < next_tick:
+                time.sleep(next_tick - now)
+                now = time.monotonic()
+            elif now - next_tick > period:
+                # Fell behind (sleep granularity, GIL); resync instead of bursting.
+                self.late_ticks += 1
+                next_tick = now
+            next_tick += period
+            self.ticks += 1
+
+            try:
+                dx, dy, idle = self.step(now, period)
+                self.input_backend.move(dx, dy)
+                if self.input_backend.flush() != (0, 0):
+                    self.moves += 1
+            except Exception as e:
+                print(f"Error in cursor output: {e}")
+                idle = True
+
+            if idle:
+                # Nothing left to spread; sleep until the next sample.
+                self.wake.clear()
+                with self.lock:
+                    has_pending = self.pending_x != 0.0 or self.pending_y != 0.0
+                if not has_pending:
+                    self.wake.wait(0.1)
+                    next_tick = time.monotonic()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+
+    def get_stats(self):
+        return {
+            "rate_hz": self.rate_hz,
+            "sample_interval_ms": self.sample_interval * 1000,
+            "samples": self.samples,
+            "ticks": self.ticks,
+            "moves": self.moves,
+            "late_ticks": self.late_ticks,
+        }
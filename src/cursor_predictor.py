@@ -0,0 +1,112 @@
+import math
+import numpy as np
+
+PREDICTOR_NONE = "none"
+PREDICTOR_CONSTANT_VELOCITY = "constant_velocity"
+PREDICTOR_KALMAN = "kalman"
+
+
+def damped_lead(velocity, horizon, damping):
+    # Distance covered over the horizon if the velocity decays at `damping`
+    # per second; damping 0 is plain constant-velocity extrapolation.
+    if damping <= 0:
+        return velocity * horizon
+    return velocity * (1 - math.exp(-damping * horizon)) / damping
+
+
+class ConstantVelocityPredictor:
+    """Extrapolates a position along its current velocity.
+
+    The velocity is the finite difference of consecutive positions, lightly
+    averaged so single noisy samples do not throw the cursor ahead.
+    """
+
+    def __init__(self, damping=5.0, velocity_smoothing=0.5):
+        self.damping = damping
+        self.velocity_smoothing = velocity_smoothing
+        self.reset()
+
+    def reset(self):
+        self.position = None
+        self.velocity = np.zeros(2)
+        self.timestamp = None
+
+    def update(self, position, timestamp):
+        position = np.asarray(position, dtype=np.float64)
+        if self.position is not None:
+            dt = timestamp - self.timestamp
+            if dt > 0:
+                velocity = (position - self.position) / dt
+                self.velocity += (1 - self.velocity_smoothing) * (velocity - self.velocity)
+        self.position = position
+        self.timestamp = timestamp
+
+    def predict(self, horizon):
+        return self.position + damped_lead(self.velocity, horizon, self.damping)
+
+
+class KalmanPredictor:
+    """Constant-velocity Kalman filter per axis.
+
+    State is (position, velocity); `process_noise` is the acceleration
+    variance in px/s^2 and `measurement_noise` the position variance in px^2.
+    Prediction uses the same damped lead as ConstantVelocityPredictor.
+    """
+
+    def __init__(self, damping=5.0, process_noise=2000.0, measurement_noise=1.0):
+        self.damping = damping
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.reset()
+
+    def reset(self):
+        self.state = None
+        # Both axes share the covariance because they share the model.
+        self.covariance = np.eye(2) * 1000.0
+        self.timestamp = None
+
+    def update(self, position, timestamp):
+        position = np.asarray(position, dtype=np.float64)
+        if self.state is None:
+            self.state = np.array([position, np.zeros(2)])
+            self.timestamp = timestamp
+            return
+
+        dt = max(timestamp - self.timestamp, 1e-3)
+        self.timestamp = timestamp
+        transition = np.array([[1.0, dt], [0.0, 1.0]])
+        noise = self.process_noise * np.array([[dt ** 4 / 4, dt ** 3 / 2], [dt ** 3 / 2, dt ** 2]])
+        self.state = transition @ self.state
+        self.covariance = transition @ self.covariance @ transition.T + noise
+
+        gain = self.covariance[:, 0] / (self.covariance[0, 0] + self.measurement_noise)
+        innovation = position - self.state[0]
+        self.state = self.state + np.outer(gain, innovation)
+        self.covariance = self.covariance - np.outer(gain, self.covariance[0])
+
+    @property
+    def position(self):
+        return None if self.state is None else self.state[0]
+
+    @property
+    def velocity(self):
+        return np.zeros(2) if self.state is None else self.state[1]
+
+    def predict(self, horizon):
+        return self.state[0] + damped_lead(self.state[1], horizon, self.damping)
+
+
+def create_predictor(settings):
+    """Builds the predictor named in the profile's `prediction` section, or
+    None when prediction is off."""
+    method = settings.get("method", PREDICTOR_NONE) if settings.get("enabled", False) else PREDICTOR_NONE
+    damping = float(settings.get("damping", 5.0))
+    if method == PREDICTOR_CONSTANT_VELOCITY:
+        return ConstantVelocityPredictor(damping)
+    if method == PREDICTOR_KALMAN:
+        return KalmanPredictor(damping,
+                               float(settings.get("process_noise", 2000.0)),
+                               float(settings.get("measurement_noise", 1.0)))
+    if method != PREDICTOR_NONE:
+        print(f"Unknown prediction method '{method}', prediction disabled")
+    return None
@@ -0,0 +1,84 @@
+import time
+import numpy as np
+from src.landmarks import head_pose_to_pixels
+from src.modified_oneEuroFilter import VectorOneEuroFilter
+
+
+class CursorSmoother:
+    """The cursor filter and velocity smoothing of MouseController: the One
+    Euro filter's per-axis alpha drives an exponential average of the
+    frame-to-frame motion.
+
+    shape is 2 for one cursor; (n, 2) with mincutoff and beta of shape
+    (n, 1) runs n settings side by side, as the tuning tools do.
+    """
+
+    def __init__(self, shape=2, freq=30, mincutoff=0.5, beta=0.07, dcutoff=1.0):
+        self.filter = VectorOneEuroFilter(shape, freq=freq, mincutoff=mincutoff, beta=beta, dcutoff=dcutoff)
+        self.velocity = np.zeros(self.filter.shape)
+        self.previous = None
+
+    def reset(self):
+        self.filter.reset()
+        self.velocity = np.zeros(self.filter.shape)
+        self.previous = None
+
+    def __call__(self, point, timestamp=None):
+        # Returns the smoothed step, or None for the first point after a reset.
+        if timestamp is None:
+            timestamp = time.monotonic()
+        _, alpha = self.filter(point, timestamp)
+        previous, self.previous = self.previous, point
+        if previous is None:
+            return None
+        self.velocity = (point - previous) * alpha + (1 - alpha) * self.velocity
+        return self.velocity
+
+
+def cursor_points(streams, cursor_source="landmarks", head_pose_gain=(80.0, 80.0)):
+    # The cursor track of a session's landmark streams in pixels, NaN without a face.
+    if cursor_source == "head_pose":
+        width, height = streams["frame_size"]
+        return np.array([head_pose_to_pixels(angles, width, height, head_pose_gain)
+                         for angles in streams["head_pose"]], dtype=np.float64)
+    return streams["landmark_cursor"].astype(np.float64)
+
+
+def reference_velocity(points, window=5):
+    # Zero-phase smoothing of the raw motion: what the cursor should follow.
+    delta = np.nan_to_num(np.diff(points, axis=0, prepend=points[:1]))
+    kernel = np.ones(window) / window
+    return np.stack([np.convolve(delta[:, axis], kernel, mode="same") for axis in (0, 1)], axis=1)
+
+
+def smoothed_steps(points, timestamps, mincutoff, beta, shape=2):
+    """Replays a cursor track through MouseController's smoothing.
+
+    Yields (frame index, smoothed step) for every frame with a face that
+    follows another one; a frame without a face starts the smoothing over.
+    With shape (n, 2) and mincutoff and beta of shape (n, 1) each step holds
+    one row per setting.
+    """
+    smoother = CursorSmoother(shape, freq=30, mincutoff=mincutoff, beta=beta)
+    for i in range(len(points)):
+        if np.isnan(points[i, 0]):
+            smoother.reset()
+            continue
+        step = smoother(points[i], timestamps[i])
+        if step is not None:
+            yield i, step
+
+
+def predicted_step(predictor, velocity, timestamp, horizon, filtered, prev_predicted):
+    """Integrates a smoothed step into a position, extrapolates it by horizon
+    and returns the step between consecutive predicted positions.
+
+    Returns (step, filtered, predicted); pass the last two back in with the
+    next step. The first step after a reset (prev_predicted None) is the
+    smoothed step itself.
+    """
+    filtered = filtered + velocity
+    predictor.update(filtered, timestamp)
+    predicted = predictor.predict(horizon)
+    step = velocity if prev_predicted is None else predicted - prev_predicted
+    return step, filtered, predicted
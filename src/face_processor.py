@@ -1,164 +1,656 @@
-import mediapipe as mp
 import time
 import numpy as np
-from mediapipe.tasks import python
-from mediapipe.tasks.python import vision
 import cv2 as cv
 import threading
+from src.frame_pool import FramePool
+from src.motion_gate import MotionGate
+from src.landmarks import (landmarks_to_array, map_from_roi, scale_to_pixels, bounding_box, blendshapes_to_array,
+                           head_pose_angles, head_pose_to_pixels)
+
+DEFAULT_MODEL_PATH = "src/tasks/face_landmarker.task"
+
+CURSOR_LANDMARKS = "landmarks"
+CURSOR_HEAD_POSE = "head_pose"
+
+# mediapipe is imported when the first landmarker is built, so processes that
+# never run one (the GUI side of FaceWorker, tools) do not pay for it.
+mp = None
+python = None
+vision = None
+
+def import_mediapipe():
+    global mp, python, vision
+    if mp is None:
+        import mediapipe
+        from mediapipe.tasks import python as tasks_python
+        from mediapipe.tasks.python import vision as tasks_vision
+        python = tasks_python
+        vision = tasks_vision
+        mp = mediapipe
+
+# Model files are read once per process and shared by every landmarker.
+_model_buffers = {}
+_model_lock = threading.Lock()
+
+def load_model_bytes(model_path):
+    with _model_lock:
+        if model_path not in _model_buffers:
+            with open(model_path, mode="rb") as f:
+                _model_buffers[model_path] = f.read()
+        return _model_buffers[model_path]
 
 class FaceProcessor:
-    def __init__(self, landmark_call_back = None, blendshape_call_back = None,  model_path="src/tasks/face_landmarker.task"):
+    def __init__(self, landmark_call_back = None, blendshape_call_back = None,  model_path=DEFAULT_MODEL_PATH):
         self.model_path = model_path
         self.model = None
         self.result = None  
         self.lock = threading.Lock()
         self.is_initialized = False
         self.processed_frame = None
+        self.preview_pool = None
+        self.preview_enabled = True
+
+        # LIVE_STREAM submissions keyed by their detect_async timestamp,
+        # so results can be matched to the frame they came from.
+        self.pending = {}
+        self.last_timestamp_ms = -1
+
+        # Backpressure: at most max_in_flight submissions are outstanding;
+        # frames arriving while the model is full are skipped instead of
+        # queueing inside MediaPipe. Submissions older than in_flight_timeout
+        # are written off as dropped by the model.
+        self.max_in_flight = 2
+        self.in_flight_timeout = 1.0
+        self.submitted = 0
+        self.busy_skips = 0
+        self.model_drops = 0
+        self.late_results = 0
+        self.inference_latency = None
+        self.average_inference_latency = None
+        self.max_inference_latency = 0.0
+        self.result_timestamp = None
+        self.result_seq = None
 
         self.frame_width = 640
         self.frame_height = 480
-        self.indices = [133, 362] 
+        self.indices = np.array([133, 362])
+
+        # Landmarks of the current result, converted once per result:
+        # landmarks is float32 (478, 3) normalized x, y, z in full-frame
+        # coordinates, landmark_pixels is (478, 2) in frame_width x
+        # frame_height pixels. Both are replaced, never written in place,
+        # so a reference taken under the lock stays consistent.
+        self.landmarks = None
+        self.landmark_pixels = None
+        # float32 (52,) scores laid out as landmarks.BLENDSHAPE_NAMES.
+        self.blendshape_scores = None
+
+        # The cursor follows either the landmarks at self.indices or the head
+        # pose (yaw, pitch, roll) taken from the facial transformation
+        # matrix, mapped at head_pose_gain pixels per radian.
+        self.cursor_source = CURSOR_LANDMARKS
+        self.head_pose_gain = (80.0, 80.0)
+        self.head_pose = None
 
         self.landmark_call_back = landmark_call_back
         self.blendshape_call_back = blendshape_call_back
+        self.latency_call_back = None
+        self.result_call_back = None
 
         self.is_live_stream_mode = True  
         self.mode_change_callback = None
+        self.mode_listeners = []
+        # The model file is read once; landmarkers are keyed by
+        # is_live_stream_mode and self.model is the one in use.
+        self.model_buffer = None
+        self.models = {}
+        # Written by configure() from any thread, applied by the inference
+        # thread in apply_pending_settings().
+        self.pending_settings = None
+        self.rebuild_models = False
+        # detect_async timestamps of warm-up inferences, whose results are
+        # not published.
+        self.warmup_timestamps = set()
+        self.warmed_up = threading.Event()
+        # Serializes building, swapping and closing landmarkers: mode
+        # switches run on the caller's thread, rebuilds on the inference one.
+        self.model_lock = threading.RLock()
+        # Orders timestamp allocation and detect_async across threads.
+        self.submit_lock = threading.Lock()
+
+        # ROI tracking: crop around the last face before inference.
+        # roi is (x0, y0, x1, y1) in pixels of the full frame.
+        self.roi_tracking = False
+        self.roi_padding = 0.35
+        self.roi_margin = 0.1
+        self.roi_redetect_interval = 30
+        self.roi = None
+        self.input_size = (self.frame_width, self.frame_height)
+        self.frames_since_redetect = 0
+        self.roi_frames = 0
+        self.full_frames = 0
+
+        # Motion gating: reuse the last result while the face region is still.
+        # face_box is the normalized (left, top, right, bottom) of the last face.
+        self.motion_gate = None
+        self.face_box = None
+        self.republished = 0
+
+    def configure(self, settings):
+        # Once the landmarker runs, settings are applied by the inference
+        # thread between frames, so a model is never replaced under a frame.
+        if not self.is_initialized:
+            self.apply_settings(settings)
+            return
+        with self.lock:
+            self.pending_settings = {**(self.pending_settings or {}), **settings}
+
+    def apply_settings(self, settings):
+        self.configure_cursor(settings)
+        self.max_in_flight = max(1, int(settings.get("max_in_flight", self.max_in_flight)))
+        self.roi_tracking = settings.get("roi_tracking", self.roi_tracking)
+        self.roi_padding = settings.get("roi_padding", self.roi_padding)
+        self.roi_redetect_interval = settings.get("roi_redetect_interval", self.roi_redetect_interval)
+        if not self.roi_tracking:
+            self.roi = None
+
+        if settings.get("motion_gating", False):
+            self.motion_gate = MotionGate(
+                threshold=settings.get("motion_threshold", 2.0),
+                min_inference_hz=settings.get("min_inference_hz", 5.0)
+            )
+        else:
+            self.motion_gate = None
+
+    def apply_pending_settings(self):
+        # Called by the inference thread before a frame.
+        with self.lock:
+            settings, self.pending_settings = self.pending_settings, None
+        if settings is not None:
+            self.apply_settings(settings)
+        if self.rebuild_models:
+            self.rebuild_models = False
+            self.replace_models()
+
+    def configure_cursor(self, settings):
+        self.head_pose_gain = tuple(settings.get("head_pose_gain", self.head_pose_gain))
+        self.set_cursor_source(settings.get("cursor_source", self.cursor_source))
+
+    def set_cursor_source(self, source):
+        if source not in (CURSOR_LANDMARKS, CURSOR_HEAD_POSE):
+            print(f"Unknown cursor source '{source}'")
+            return
+        if source == self.cursor_source:
+            return
+        self.cursor_source = source
+        # Landmarkers only output transformation matrices when built to, so
+        # the cached ones are rebuilt before the next frame.
+        if self.models:
+            self.rebuild_models = True
+
+    def replace_models(self):
+        # The new landmarker is in place before the old ones are closed.
+        with self.model_lock:
+            old_models, self.models = self.models, {}
+            model = self.get_model(self.is_live_stream_mode) if self.is_initialized else None
+            with self.lock:
+                self.model = model
+                self.pending.clear()
+            for old_model in old_models.values():
+                old_model.close()
 
     def set_mode_change_callback(self, callback):
         self.mode_change_callback = callback
 
-    def toggle_mode(self):
-        self.close()
-        
-        self.is_live_stream_mode = not self.is_live_stream_mode
-        
-        success = self.initialize()
-        
-        mode_name = "LIVE_STREAM" if self.is_live_stream_mode else "IMAGE"
-        print(f"Switched to {mode_name} mode - {'Success' if success else 'Failed'}")
-        
+    def add_mode_change_listener(self, listener):
+        self.mode_listeners.append(listener)
+
+    def notify_mode_change(self, mode_name, success):
         if self.mode_change_callback:
             self.mode_change_callback(mode_name, success)
-        
+        for listener in self.mode_listeners:
+            try:
+                listener(mode_name, success)
+            except Exception as e:
+                print(f"Mode listener error: {e}")
+
+    def toggle_mode(self):
+        # Both landmarkers stay open once built, so switching back and forth
+        # is a swap of self.model rather than a rebuild.
+        with self.model_lock:
+            live_stream = not self.is_live_stream_mode
+            model = self.get_model(live_stream)
+            success = model is not None
+            if success:
+                with self.lock:
+                    self.model = model
+                    self.is_live_stream_mode = live_stream
+                    self.pending.clear()
+        if success and self.motion_gate:
+            self.motion_gate.reset()
+
+        mode_name = self.get_current_mode()
+        print(f"Switched to {mode_name} mode - {'Success' if success else 'Failed'}")
+        self.notify_mode_change(mode_name, success)
         return success
 
     def get_current_mode(self):
         return "LIVE_STREAM" if self.is_live_stream_mode else "IMAGE"
 
+    def load_model_buffer(self):
+        if self.model_buffer is None:
+            self.model_buffer = load_model_bytes(self.model_path)
+        return self.model_buffer
+
+    def create_model(self, live_stream):
+        import_mediapipe()
+        base_options = python.BaseOptions(model_asset_buffer=self.load_model_buffer())
+        if live_stream:
+            options = vision.FaceLandmarkerOptions(
+                base_options=base_options,
+                output_face_blendshapes=True,
+                output_facial_transformation_matrixes=self.cursor_source == CURSOR_HEAD_POSE,
+                running_mode=mp.tasks.vision.RunningMode.LIVE_STREAM,
+                num_faces=1,
+                result_callback=self.mp_callback
+            )
+        else:
+            options = vision.FaceLandmarkerOptions(
+                base_options=base_options,
+                output_face_blendshapes=True,
+                output_facial_transformation_matrixes=self.cursor_source == CURSOR_HEAD_POSE,
+                running_mode=mp.tasks.vision.RunningMode.IMAGE,
+                num_faces=1
+            )
+        return vision.FaceLandmarker.create_from_options(options)
+
+    def get_model(self, live_stream):
+        # Landmarkers are built on first use and then kept for later switches.
+        with self.model_lock:
+            model = self.models.get(live_stream)
+            if model is None:
+                try:
+                    model = self.create_model(live_stream)
+                    self.models[live_stream] = model
+                except Exception as e:
+                    print(f"FaceProcessor Init Error: {e}")
+                    return None
+            return model
+
     def initialize(self):
-        try:
-            with open(self.model_path, mode="rb") as f:
-                model_buffer = f.read()
-            
-            base_options = python.BaseOptions(model_asset_buffer=model_buffer)
-            if self.is_live_stream_mode:
-                options = vision.FaceLandmarkerOptions(
-                    base_options=base_options,
-                    output_face_blendshapes=True,
-                    output_facial_transformation_matrixes=False,
-                    running_mode=mp.tasks.vision.RunningMode.LIVE_STREAM,
-                    num_faces=1,
-                    result_callback=self.mp_callback
-                )
-            else:
-                options = vision.FaceLandmarkerOptions(
-                    base_options=base_options,
-                    output_face_blendshapes=True,
-                    output_facial_transformation_matrixes=False,
-                    running_mode=mp.tasks.vision.RunningMode.IMAGE,
-                    num_faces=1
-                )
-            
-            self.model = vision.FaceLandmarker.create_from_options(options)
-            self.is_initialized = True
-            print("FaceProcessor Initialized Successfully")
-            return True
+        model = self.get_model(self.is_live_stream_mode)
+        if model is None:
+            self.is_initialized = False
+            return False
+        self.model = model
+        self.is_initialized = True
+        print("FaceProcessor Initialized Successfully")
+        return True
 
+    def warm_up(self, timeout=5.0):
+        # Runs one inference on a blank frame so the first camera frame does
+        # not pay for graph and delegate setup.
+        with self.lock:
+            model, live_stream = self.model, self.is_live_stream_mode
+        if model is None:
+            return False
+        try:
+            blank = np.zeros((self.frame_height, self.frame_width, 3), dtype=np.uint8)
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=blank)
+            if not live_stream:
+                model.detect(mp_image)
+                return True
+            self.warmed_up.clear()
+            with self.submit_lock:
+                timestamp_ms = self.next_timestamp_ms(time.monotonic())
+                self.warmup_timestamps.add(timestamp_ms)
+                model.detect_async(mp_image, timestamp_ms)
+            return self.warmed_up.wait(timeout)
         except Exception as e:
-            print(f"FaceProcessor Init Error: {e}")
-            self.is_initialized = False
+            print(f"FaceProcessor warm-up error: {e}")
             return False
 
     def mp_callback(self, mp_result, output_image, timestamp_ms):
+        if timestamp_ms in self.warmup_timestamps:
+            self.warmup_timestamps.discard(timestamp_ms)
+            self.warmed_up.set()
+            return
         with self.lock:
+            # Submissions that timed out or were cleared by a mode, source or
+            # camera change are no longer pending; their results are dropped.
+            entry = self.pending.pop(timestamp_ms, None)
+            if entry is None:
+                self.late_results += 1
+                return
+            seq, timestamp, roi, submit_time = entry
             self.result = mp_result
-        self.new_result()
+            # Older submissions that never came back were dropped by MediaPipe.
+            for stale in [ts for ts in self.pending if ts < timestamp_ms]:
+                del self.pending[stale]
+                self.model_drops += 1
+            self.record_inference_latency(time.monotonic() - submit_time)
+            self.update_tracking(mp_result, roi)
+            self.result_timestamp = timestamp
+            self.result_seq = seq
+        self.new_result(timestamp, seq)
+
+    def set_latency_callback(self, callback):
+        self.latency_call_back = callback
 
-    def new_result (self):
+    def set_result_callback(self, callback):
+        # Called with (timestamp, seq, inferred) after every published result.
+        self.result_call_back = callback
+
+    def new_result (self, timestamp=None, seq=None, inferred=True):
+        # Only results of an actual inference report latency; a republished
+        # one would tell the governor the model is nearly free.
         try:
+            if inferred and self.latency_call_back and timestamp is not None:
+                self.latency_call_back(time.monotonic() - timestamp)
             self.cursor = self.get_cursor()
             if self.landmark_call_back and len(self.cursor) > 0:
-                self.landmark_call_back(self.cursor)
-            if self.blendshape_call_back and self.result and self.result.face_blendshapes:
-                self.blendshape_call_back(self.result.face_blendshapes[0])
+                self.landmark_call_back(self.cursor, timestamp)
+            scores = self.blendshape_scores
+            if self.blendshape_call_back and scores is not None:
+                self.blendshape_call_back(scores, timestamp)
+            if self.result_call_back:
+                self.result_call_back(timestamp, seq, inferred)
         except Exception as e:
             print(f"new_result error: {e}")
 
-    def process_frame(self, frame):
+    def record_inference_latency(self, latency):
+        # Submit-to-result time of one frame. Called with self.lock held.
+        self.inference_latency = latency
+        if self.average_inference_latency is None:
+            self.average_inference_latency = latency
+        else:
+            self.average_inference_latency += 0.1 * (latency - self.average_inference_latency)
+        self.max_inference_latency = max(self.max_inference_latency, latency)
+
+    def model_busy(self, now):
+        with self.lock:
+            for ts in [ts for ts, entry in self.pending.items() if now - entry[3] > self.in_flight_timeout]:
+                del self.pending[ts]
+                self.model_drops += 1
+            return len(self.pending) >= self.max_in_flight
+
+    def next_timestamp_ms(self, timestamp):
+        # MediaPipe rejects timestamps that do not strictly increase.
+        timestamp_ms = max(int(timestamp * 1000), self.last_timestamp_ms + 1)
+        self.last_timestamp_ms = timestamp_ms
+        return timestamp_ms
+
+    def process_frame(self, frame, timestamp=None, seq=None):
         try:
-            if not self.is_initialized or self.model is None:
+            if self.pending_settings is not None or self.rebuild_models:
+                self.apply_pending_settings()
+
+            # Read together so a concurrent toggle_mode() cannot pair one
+            # mode's landmarker with the other's call.
+            with self.lock:
+                model, live_stream = self.model, self.is_live_stream_mode
+            if not self.is_initialized or model is None:
                 return frame
+
+            if timestamp is None:
+                timestamp = time.monotonic()
+
+            self.input_size = (frame.shape[1], frame.shape[0])
+            if live_stream and self.model_busy(time.monotonic()):
+                # The pending result still arrives and is published then.
+                self.busy_skips += 1
+                return self.render_preview(frame, seq)
+
+            if not self.needs_inference(frame, timestamp):
+                self.republish(timestamp, seq)
+                return self.render_preview(frame, seq)
+
+            roi = self.select_roi()
+            if roi is not None:
+                x0, y0, x1, y1, _, _ = roi
+                model_input = np.ascontiguousarray(frame[y0:y1, x0:x1])
+            else:
+                model_input = frame
             
-            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame)
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=model_input)
 
-            if self.is_live_stream_mode:
-                timestamp_ms = int(time.time() * 1000)
-                self.model.detect_async(mp_image, timestamp_ms)
-                
-                process_frame = frame.copy()
-                with self.lock:
-                    if self.result and self.result.face_landmarks:
-                        for idx in self.indices:
-                            landmark = self.result.face_landmarks[0][idx]
-                            x = int(landmark.x * frame.shape[1])
-                            y = int(landmark.y * frame.shape[0])
-                            cv.circle(process_frame, (x, y), 1, (0, 255, 0), -1)
-                self.processed_frame = process_frame
-                return process_frame
+            if live_stream:
+                with self.submit_lock:
+                    timestamp_ms = self.next_timestamp_ms(timestamp)
+                    with self.lock:
+                        self.pending[timestamp_ms] = (seq, timestamp, roi, time.monotonic())
+                    self.submitted += 1
+                    model.detect_async(mp_image, timestamp_ms)
             else:
-                detection_result = self.model.detect(mp_image)
+                submit_time = time.monotonic()
+                detection_result = model.detect(mp_image)
+                self.submitted += 1
 
                 with self.lock:
+                    self.record_inference_latency(time.monotonic() - submit_time)
+                    self.update_tracking(detection_result, roi)
                     self.result = detection_result
+                    self.result_timestamp = timestamp
+                    self.result_seq = seq
 
-                self.new_result()
-                
-                process_frame = frame.copy()
-                if detection_result and detection_result.face_landmarks:
-                    for idx in self.indices:
-                        landmark = detection_result.face_landmarks[0][idx]
-                        x = int(landmark.x * frame.shape[1])
-                        y = int(landmark.y * frame.shape[0])
-                        cv.circle(process_frame, (x, y), 1, (0, 255, 0), -1)
-                
-                self.processed_frame = process_frame
-                return process_frame
+                self.new_result(timestamp, seq)
+
+            return self.render_preview(frame, seq)
                 
         except Exception as e:
             print(f"Lỗi xử lý frame: {e}")
             return frame
 
+    def select_roi(self):
+        if not self.roi_tracking:
+            return None
+
+        with self.lock:
+            roi = self.roi
+        # Crops are in pixels of the frame size they were derived from.
+        if roi is not None and (roi[4], roi[5]) != self.input_size:
+            roi = None
+        self.frames_since_redetect += 1
+        if roi is None or self.frames_since_redetect >= self.roi_redetect_interval:
+            self.frames_since_redetect = 0
+            self.full_frames += 1
+            return None
+
+        self.roi_frames += 1
+        return roi
+
+    def needs_inference(self, frame, timestamp):
+        if self.motion_gate is None:
+            return True
+        with self.lock:
+            # Only a found face can be reused, and in LIVE_STREAM a result
+            # still in flight would arrive after the republished one.
+            if self.face_box is None or self.pending:
+                self.motion_gate.reset()
+                return True
+            region = self.gate_region()
+        return self.motion_gate.should_infer(frame, region, timestamp)
+
+    def gate_region(self):
+        width, height = self.input_size
+        left, top, right, bottom = self.face_box
+        pad_x, pad_y = (right - left) * 0.1, (bottom - top) * 0.1
+        x0 = int(max(0.0, left - pad_x) * width)
+        y0 = int(max(0.0, top - pad_y) * height)
+        x1 = int(min(1.0, right + pad_x) * width)
+        y1 = int(min(1.0, bottom + pad_y) * height)
+        return (x0, y0, x1, y1)
+
+    def republish(self, timestamp, seq):
+        # Hands the previous result on again, stamped with the new frame.
+        with self.lock:
+            self.result_timestamp = timestamp
+            self.result_seq = seq
+        self.republished += 1
+        self.new_result(timestamp, seq, inferred=False)
+
+    def update_tracking(self, result, roi):
+        # Converts the landmarks of a result into arrays, mapping a cropped
+        # input back to full-frame coordinates, and updates the face box and
+        # ROI for the next frame. Called with self.lock held.
+        if not result or not result.face_landmarks:
+            self.landmarks = None
+            self.landmark_pixels = None
+            self.blendshape_scores = None
+            self.head_pose = None
+            self.roi = None
+            self.face_box = None
+            return
+
+        landmarks = landmarks_to_array(result.face_landmarks[0])
+        if roi is not None:
+            map_from_roi(landmarks, roi)
+        self.landmarks = landmarks
+        self.landmark_pixels = scale_to_pixels(landmarks, self.frame_width, self.frame_height)
+        if result.face_blendshapes:
+            self.blendshape_scores = blendshapes_to_array(result.face_blendshapes[0])
+        else:
+            self.blendshape_scores = None
+        if result.facial_transformation_matrixes:
+            self.head_pose = head_pose_angles(result.facial_transformation_matrixes[0])
+        else:
+            self.head_pose = None
+
+        if not self.roi_tracking and self.motion_gate is None:
+            return
+
+        self.face_box = bounding_box(landmarks)
+        if self.roi_tracking:
+            self.update_roi(*self.face_box, *self.input_size)
+
+    def update_roi(self, left, top, right, bottom, width, height):
+        # Keeps the current crop while the face box stays inside it, so the
+        # landmarker sees a stable input; otherwise re-centres a padded square.
+        left, right = left * width, right * width
+        top, bottom = top * height, bottom * height
+        size = max(right - left, bottom - top)
+
+        if self.roi is not None:
+            x0, y0, x1, y1, _, _ = self.roi
+            margin = self.roi_margin * (x1 - x0)
+            crop_size = x1 - x0
+            inside = (left >= x0 + margin and right <= x1 - margin and
+                      top >= y0 + margin and bottom <= y1 - margin)
+            if inside and size * (1 + 2 * self.roi_padding) > 0.6 * crop_size:
+                return
+
+        crop_size = int(min(size * (1 + 2 * self.roi_padding), width, height))
+        if crop_size <= 0:
+            self.roi = None
+            return
+        cx, cy = (left + right) / 2, (top + bottom) / 2
+        x0 = int(min(max(cx - crop_size / 2, 0), width - crop_size))
+        y0 = int(min(max(cy - crop_size / 2, 0), height - crop_size))
+        self.roi = (x0, y0, x0 + crop_size, y0 + crop_size, width, height)
+
+    def render_preview(self, frame, seq=None):
+        # The overlay is drawn into a preallocated buffer; if the GUI still
+        # holds every buffer the previous preview is kept.
+        if not self.preview_enabled:
+            return frame
+        if self.preview_pool is None or not self.preview_pool.matches(frame.shape):
+            self.preview_pool = FramePool(frame.shape, size=3)
+
+        preview = self.preview_pool.acquire(seq)
+        if preview is None:
+            return frame
+
+        np.copyto(preview.array, frame)
+        with self.lock:
+            if self.landmarks is not None:
+                points = scale_to_pixels(self.landmarks[self.indices], frame.shape[1], frame.shape[0])
+                for x, y in points.astype(np.int32).tolist():
+                    cv.circle(preview.array, (x, y), 1, (0, 255, 0), -1)
+            previous = self.processed_frame
+            self.processed_frame = preview
+        if previous is not None:
+            previous.release()
+        return preview.readonly
+
     def get_processed_frame(self):
+        # Read-only view; use acquire_processed_frame() to keep it past the call.
+        with self.lock:
+            if self.processed_frame is not None:
+                return self.processed_frame.readonly
+        return None
+
+    def acquire_processed_frame(self):
+        # The caller owns the returned reference and must release() it.
         with self.lock:
             if self.processed_frame is not None:
-                return self.processed_frame
+                return self.processed_frame.retain()
         return None
 
+    def on_camera_degraded(self):
+        with self.lock:
+            self.roi = None
+            self.face_box = None
+            self.landmarks = None
+            self.landmark_pixels = None
+            self.blendshape_scores = None
+            self.head_pose = None
+            self.pending.clear()
+
+    def get_stats(self):
+        return {
+            "roi_frames": self.roi_frames,
+            "full_frames": self.full_frames,
+            "roi": self.roi[:4] if self.roi else None,
+            "republished": self.republished,
+            "motion_gate": self.motion_gate.get_stats() if self.motion_gate else None,
+            "submitted": self.submitted,
+            "in_flight": len(self.pending),
+            "max_in_flight": self.max_in_flight,
+            "busy_skips": self.busy_skips,
+            "model_drops": self.model_drops,
+            "late_results": self.late_results,
+            "inference_latency_ms": None if self.inference_latency is None else self.inference_latency * 1000,
+            "average_inference_latency_ms": (None if self.average_inference_latency is None
+                                             else self.average_inference_latency * 1000),
+            "max_inference_latency_ms": self.max_inference_latency * 1000,
+        }
+
+    def get_landmarks(self):
+        # (normalized (478, 3), pixels (478, 2)) of the current result, or
+        # (None, None). The arrays are shared and must not be modified.
+        with self.lock:
+            return self.landmarks, self.landmark_pixels
+
+    def get_blendshapes(self):
+        # float32 (52,) scores indexed by landmarks.BLENDSHAPE_INDEX, or None.
+        with self.lock:
+            return self.blendshape_scores
+
+    def get_head_pose(self):
+        # float32 (yaw, pitch, roll) in radians, or None when the landmarker
+        # does not output transformation matrices.
+        with self.lock:
+            return self.head_pose
+
     def get_cursor(self):
         with self.lock:
-            if self.result and self.result.face_landmarks and len(self.result.face_landmarks) > 0:
-                positions = np.array([[self.result.face_landmarks[0][idx].x * self.frame_width, self.result.face_landmarks[0][idx].y * self.frame_height] for idx in self.indices])
-                mean_position = np.mean(positions, axis=0)
-            else:
-                mean_position = []
-        return mean_position
+            pixels, head_pose = self.landmark_pixels, self.head_pose
+        if self.cursor_source == CURSOR_HEAD_POSE and head_pose is not None:
+            return head_pose_to_pixels(head_pose, self.frame_width, self.frame_height, self.head_pose_gain)
+        if pixels is None:
+            return []
+        return pixels[self.indices].mean(axis=0)
     
     def close(self):
-        if self.model:
-            self.model.close()
-            self.model = None
-            self.is_initialized = False
+        self.is_initialized = False
+        self.model = None
+        with self.model_lock:
+            models, self.models = self.models, {}
+        for model in models.values():
+            try:
+                model.close()
+            except Exception as e:
+                print(f"FaceProcessor close error: {e}")
     
     def __del__(self):
         self.close()
@@ -0,0 +1,382 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from src.face_processor import FaceProcessor, DEFAULT_MODEL_PATH
+from src.landmarks import NUM_LANDMARKS, NUM_BLENDSHAPES, scale_to_pixels, bounding_box
+
+# Each result slot is an int64 sequence header followed by the landmarks,
+# blendshape scores and head pose (NaN when absent) as float32. The header reads WRITING while the body is
+# being written and is checked again after copying, so a slot overwritten
+# mid-read is detected.
+SCORES_OFFSET = NUM_LANDMARKS * 3
+POSE_OFFSET = SCORES_OFFSET + NUM_BLENDSHAPES
+RESULT_FLOATS = POSE_OFFSET + 3
+RESULT_SLOT_BYTES = 8 + RESULT_FLOATS * 4
+NO_SEQ = -1
+WRITING = -2
+
+
+class SharedRing:
+    """Fixed-size slots in one shared memory block. The creator owns the
+    block and unlinks it on close; other processes attach by name."""
+
+    def __init__(self, slot_bytes, slots, name=None):
+        self.slot_bytes = slot_bytes
+        self.slots = slots
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=slot_bytes * slots)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+
+    def slot(self, index, dtype=np.uint8, count=-1):
+        return np.frombuffer(self.shm.buf, dtype=dtype, count=count,
+                             offset=index * self.slot_bytes)
+
+    def frame(self, index, height, width):
+        return self.slot(index, count=height * width * 3).reshape(height, width, 3)
+
+    def result(self, index):
+        # (header, body) views of a result slot.
+        header = self.slot(index, np.int64, 1)
+        body = self.slot(index, np.float32, RESULT_FLOATS + 2)[2:]
+        return header, body
+
+    def close(self):
+        try:
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+        except Exception as e:
+            print(f"Shared memory close error: {e}")
+
+
+def worker_main(model_path, settings, live_stream, frame_ring_name, frame_slot_bytes, frame_slots,
+                result_ring_name, result_slots, requests, results):
+    """Entry point of the worker process: runs a FaceProcessor on frames
+    from the frame ring and writes every result into the result ring."""
+    frame_ring = SharedRing(frame_slot_bytes, frame_slots, frame_ring_name)
+    result_ring = SharedRing(RESULT_SLOT_BYTES, result_slots, result_ring_name)
+    face_processor = FaceProcessor(model_path=model_path)
+    face_processor.is_live_stream_mode = live_stream
+    face_processor.preview_enabled = False
+    face_processor.configure(settings)
+    next_slot = [0]
+
+    def publish(timestamp, seq, inferred):
+        landmarks, _ = face_processor.get_landmarks()
+        scores = face_processor.get_blendshapes()
+        head_pose = face_processor.get_head_pose()
+        index = next_slot[0]
+        next_slot[0] = (index + 1) % result_slots
+        header, body = result_ring.result(index)
+        has_face = landmarks is not None
+        seq = NO_SEQ if seq is None else seq
+        header[0] = WRITING
+        if has_face:
+            body[:SCORES_OFFSET] = landmarks.ravel()
+            body[SCORES_OFFSET:POSE_OFFSET] = scores if scores is not None else 0.0
+            body[POSE_OFFSET:] = head_pose if head_pose is not None else np.nan
+        header[0] = seq
+        # The worker's in-flight counters travel with each result.
+        model_stats = (face_processor.inference_latency, face_processor.model_drops, face_processor.busy_skips)
+        results.put(("result", index, seq, timestamp, has_face, inferred, model_stats))
+
+    face_processor.set_result_callback(publish)
+    if not face_processor.initialize():
+        results.put(("error", "initialize failed"))
+        return
+    face_processor.warm_up()
+    results.put(("ready",))
+
+    try:
+        while True:
+            message = requests.get()
+            frame_message = None
+            # Only the newest queued frame is processed; the rest are returned.
+            while True:
+                kind = message[0]
+                if kind == "stop":
+                    return
+                if kind == "frame":
+                    if frame_message is not None:
+                        results.put(("ack", frame_message[1], False))
+                    frame_message = message
+                elif kind == "configure":
+                    face_processor.configure(message[1])
+                elif kind == "mode":
+                    if message[1] != face_processor.is_live_stream_mode:
+                        face_processor.toggle_mode()
+                elif kind == "degraded":
+                    face_processor.on_camera_degraded()
+                try:
+                    message = requests.get_nowait()
+                except queue.Empty:
+                    break
+
+            if frame_message is None:
+                continue
+            _, slot, seq, timestamp, height, width = frame_message
+            # mp.Image copies the pixels, so the slot is free once this returns.
+            face_processor.process_frame(frame_ring.frame(slot, height, width), timestamp, seq)
+            results.put(("ack", slot, True))
+    finally:
+        face_processor.close()
+        frame_ring.close()
+        result_ring.close()
+
+
+class FaceWorker(FaceProcessor):
+    """FaceProcessor that runs the landmarker in a separate process.
+
+    Frames are copied into a shared memory ring and only the slot index
+    crosses the process boundary; landmarks and blendshape scores come back
+    through a second ring. Preview rendering and the cursor and blendshape
+    callbacks stay in this process. When the worker dies it is restarted.
+    """
+
+    def __init__(self, landmark_call_back=None, blendshape_call_back=None,
+                 model_path=DEFAULT_MODEL_PATH, frame_shape=(480, 640, 3),
+                 frame_slots=3, result_slots=8):
+        super().__init__(landmark_call_back, blendshape_call_back, model_path)
+        self.frame_shape = tuple(frame_shape)
+        self.frame_slots = frame_slots
+        self.result_slots = result_slots
+        self.settings = {}
+        self.context = mp.get_context("spawn")
+        self.process = None
+        self.frame_ring = None
+        self.result_ring = None
+        self.requests = None
+        self.results = None
+        self.reader_thread = None
+        self.closing = False
+        self.free_slots = []
+        self.restart_delay = 1.0
+        self.ready = threading.Event()
+        # Held while the worker process is replaced, by a crash or a resize.
+        self.worker_lock = threading.Lock()
+
+        self.submitted = 0
+        self.busy_drops = 0
+        self.superseded = 0
+        self.oversized = 0
+        self.torn_results = 0
+        self.restarts = 0
+
+    def configure(self, settings):
+        self.configure_cursor(settings)
+        self.settings = dict(settings)
+        if self.requests is not None:
+            self.requests.put(("configure", self.settings))
+
+    def initialize(self):
+        try:
+            self.closing = False
+            self.start_worker()
+            if self.reader_thread is None or not self.reader_thread.is_alive():
+                self.reader_thread = threading.Thread(target=self.reader_loop, daemon=True)
+                self.reader_thread.start()
+            self.is_initialized = True
+            return True
+        except Exception as e:
+            print(f"FaceWorker start error: {e}")
+            self.is_initialized = False
+            return False
+
+    def start_worker(self):
+        frame_bytes = int(np.prod(self.frame_shape))
+        self.frame_ring = SharedRing(frame_bytes, self.frame_slots)
+        self.result_ring = SharedRing(RESULT_SLOT_BYTES, self.result_slots)
+        self.requests = self.context.Queue()
+        self.results = self.context.Queue()
+        with self.lock:
+            self.free_slots = list(range(self.frame_slots))
+        self.ready.clear()
+        self.process = self.context.Process(
+            target=worker_main,
+            args=(self.model_path, self.settings, self.is_live_stream_mode,
+                  self.frame_ring.name, frame_bytes, self.frame_slots,
+                  self.result_ring.name, self.result_slots, self.requests, self.results),
+            daemon=True
+        )
+        self.process.start()
+        print(f"Face worker started (pid {self.process.pid})")
+
+    def stop_worker(self, timeout=2.0):
+        if self.process is not None:
+            if self.process.is_alive():
+                self.requests.put(("stop",))
+                self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout)
+            self.process = None
+        for ring in (self.frame_ring, self.result_ring):
+            if ring is not None:
+                ring.close()
+        self.frame_ring = None
+        self.result_ring = None
+
+    def restart_worker(self):
+        with self.worker_lock:
+            if self.process is None or self.process.is_alive():
+                return
+            self.restarts += 1
+            print(f"Face worker exited (code {self.process.exitcode}), restarting")
+            self.stop_worker()
+            with self.lock:
+                self.landmarks = None
+                self.landmark_pixels = None
+                self.blendshape_scores = None
+                self.face_box = None
+            time.sleep(min(self.restart_delay * self.restarts, 10.0))
+            if not self.closing:
+                self.start_worker()
+
+    def resize_worker(self, frame_shape):
+        # The frame ring is sized when the worker starts; a source that
+        # delivers larger frames than expected gets a new worker and ring.
+        print(f"Face worker: {frame_shape[1]}x{frame_shape[0]} frames do not fit the "
+              f"{self.frame_shape[1]}x{self.frame_shape[0]} frame ring, restarting the worker")
+        with self.worker_lock:
+            self.frame_shape = tuple(frame_shape)
+            self.stop_worker()
+            if not self.closing:
+                self.start_worker()
+
+    def process_frame(self, frame, timestamp=None, seq=None):
+        try:
+            if not self.is_initialized or self.process is None:
+                return frame
+            if timestamp is None:
+                timestamp = time.monotonic()
+
+            ring = self.frame_ring
+            if ring is None:
+                return self.render_preview(frame, seq)
+            height, width = frame.shape[:2]
+            if height * width * 3 > ring.slot_bytes:
+                self.oversized += 1
+                self.resize_worker(frame.shape)
+                return self.render_preview(frame, seq)
+
+            with self.lock:
+                slot = self.free_slots.pop() if self.free_slots else None
+            if slot is None:
+                # Every slot is still with the worker; skip rather than queue.
+                self.busy_drops += 1
+                return self.render_preview(frame, seq)
+
+            np.copyto(ring.frame(slot, height, width), frame)
+            self.requests.put(("frame", slot, seq, timestamp, height, width))
+            self.submitted += 1
+            return self.render_preview(frame, seq)
+        except Exception as e:
+            print(f"FaceWorker submit error: {e}")
+            return frame
+
+    def reader_loop(self):
+        while not self.closing:
+            results = self.results
+            try:
+                message = results.get(timeout=0.5)
+            except queue.Empty:
+                if self.process is not None and not self.process.is_alive() and not self.closing:
+                    self.restart_worker()
+                continue
+            except Exception:
+                # The queue was replaced by a restart or close.
+                continue
+
+            kind = message[0]
+            if kind == "result":
+                self.read_result(*message[1:])
+            elif kind == "ack":
+                _, slot, processed = message
+                if not processed:
+                    self.superseded += 1
+                with self.lock:
+                    self.free_slots.append(slot)
+            elif kind == "ready":
+                self.ready.set()
+                print("Face worker ready")
+            elif kind == "error":
+                print(f"Face worker error: {message[1]}")
+
+    def read_result(self, slot, seq, timestamp, has_face, inferred, model_stats):
+        ring = self.result_ring
+        if ring is None:
+            return
+        inference_latency, self.model_drops, self.busy_skips = model_stats
+        if inference_latency is not None:
+            with self.lock:
+                self.record_inference_latency(inference_latency)
+        if has_face:
+            header, body = ring.result(slot)
+            body = body.copy()
+            if header[0] != seq:
+                self.torn_results += 1
+                return
+            landmarks = body[:SCORES_OFFSET].reshape(NUM_LANDMARKS, 3)
+            scores = body[SCORES_OFFSET:POSE_OFFSET]
+            head_pose = None if np.isnan(body[POSE_OFFSET]) else body[POSE_OFFSET:]
+            pixels = scale_to_pixels(landmarks, self.frame_width, self.frame_height)
+            face_box = bounding_box(landmarks)
+        else:
+            landmarks = scores = head_pose = pixels = face_box = None
+
+        seq = None if seq == NO_SEQ else int(seq)
+        with self.lock:
+            self.landmarks = landmarks
+            self.landmark_pixels = pixels
+            self.blendshape_scores = scores
+            self.head_pose = head_pose
+            self.face_box = face_box
+            self.result_timestamp = timestamp
+            self.result_seq = seq
+        self.new_result(timestamp, seq, inferred)
+
+    def warm_up(self, timeout=10.0):
+        # The worker warms its landmarker up before reporting ready.
+        return self.ready.wait(timeout)
+
+    def toggle_mode(self):
+        self.is_live_stream_mode = not self.is_live_stream_mode
+        if self.requests is not None:
+            self.requests.put(("mode", self.is_live_stream_mode))
+
+        mode_name = self.get_current_mode()
+        print(f"Switched to {mode_name} mode")
+        self.notify_mode_change(mode_name, True)
+        return True
+
+    def on_camera_degraded(self):
+        super().on_camera_degraded()
+        if self.requests is not None:
+            self.requests.put(("degraded",))
+
+    def get_stats(self):
+        return {
+            "worker_pid": self.process.pid if self.process else None,
+            "submitted": self.submitted,
+            "busy_drops": self.busy_drops,
+            "superseded": self.superseded,
+            "oversized": self.oversized,
+            "torn_results": self.torn_results,
+            "restarts": self.restarts,
+            "model_drops": self.model_drops,
+            "busy_skips": self.busy_skips,
+            "inference_latency_ms": None if self.inference_latency is None else self.inference_latency * 1000,
+            "average_inference_latency_ms": (None if self.average_inference_latency is None
+                                             else self.average_inference_latency * 1000),
+        }
+
+    def close(self):
+        self.closing = True
+        self.is_initialized = False
+        self.stop_worker()
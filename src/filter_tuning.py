@@ -0,0 +1,173 @@
+import argparse
+import time
+import numpy as np
+from src.accel import SigmoidAccel
+from src.cursor_simulation import cursor_points, reference_velocity, smoothed_steps
+from src.landmark_stream import load_streams
+
+
+def run_grid(points, timestamps, mincutoffs, betas, velocity_scale, accel, max_lag=15):
+    """Runs MouseController's filter and velocity smoothing for every
+    (mincutoff, beta) pair at once, one channel pair per setting.
+
+    Returns per-setting sums that can be added up across sessions:
+    squared screen velocity over fixation frames, the fixation frame count,
+    and the correlation of the cursor velocity with the reference velocity
+    of moving frames `lag` frames earlier, for every lag below `max_lag`.
+    """
+    count = len(mincutoffs)
+    valid = ~np.isnan(points[:, 0])
+    reference = reference_velocity(points)
+    speed = np.linalg.norm(reference, axis=1)
+    still = valid & (speed < np.percentile(speed[valid], 25))
+    moving = valid & (speed > np.percentile(speed[valid], 50))
+    # Leading zeros so the lag window can reach before the first frame.
+    lagged = np.concatenate([np.zeros((max_lag, 2)), reference * moving[:, None]])
+    lags = np.arange(max_lag)
+
+    jitter = np.zeros(count)
+    correlation = np.zeros((count, max_lag))
+
+    # Frames right after a reset have no step yet and would add nothing.
+    for t, v in smoothed_steps(points, timestamps, mincutoffs[:, None], betas[:, None], (count, 2)):
+        if still[t]:
+            scaled = v * velocity_scale
+            screen = scaled * accel(scaled)
+            jitter += np.sum(screen ** 2, axis=1)
+        correlation += v @ lagged[t + max_lag - lags].T
+
+    return jitter, np.count_nonzero(still), correlation
+
+
+def peak_lag(correlation):
+    # Whole-frame peak refined with a parabola through its neighbours.
+    index = np.argmax(correlation, axis=1)
+    inner = np.clip(index, 1, correlation.shape[1] - 2)
+    rows = np.arange(len(correlation))
+    y0, y1, y2 = correlation[rows, inner - 1], correlation[rows, inner], correlation[rows, inner + 1]
+    curvature = y0 - 2 * y1 + y2
+    offset = np.where(curvature < 0, 0.5 * (y0 - y2) / np.where(curvature < 0, curvature, 1), 0.0)
+    return np.where(index == inner, inner + np.clip(offset, -0.5, 0.5), index)
+
+
+def pareto_front(jitter, lag):
+    order = np.lexsort((jitter, lag))
+    front = []
+    best = np.inf
+    for i in order:
+        if jitter[i] < best:
+            front.append(i)
+            best = jitter[i]
+    return np.array(front)
+
+
+def knee(front, jitter, lag):
+    # Closest point of the front to the ideal (zero jitter, zero lag) after
+    # scaling both to the range the front spans.
+    def scaled(values):
+        values = values[front]
+        span = values.max() - values.min()
+        return (values - values.min()) / span if span > 0 else np.zeros(len(values))
+    return front[int(np.argmin(np.hypot(scaled(jitter), scaled(lag))))]
+
+
+def tune(session_paths, mincutoffs, betas, velocity_scale, cursor_source="landmarks",
+         head_pose_gain=(80.0, 80.0), max_lag=15):
+    """Scores every (mincutoff, beta) pair on the recorded sessions.
+
+    Returns the flattened grid and, per setting, the RMS screen velocity in
+    pixels per frame while the head is still (jitter) and the delay of the
+    cursor behind the head while it moves in seconds (lag).
+    """
+    grid_mincutoff, grid_beta = (axis.ravel() for axis in np.meshgrid(mincutoffs, betas, indexing="ij"))
+    accel = SigmoidAccel()
+    jitter_sum = np.zeros(len(grid_mincutoff))
+    still_frames = 0
+    correlation = np.zeros((len(grid_mincutoff), max_lag))
+    frame_times = []
+
+    for session_path in session_paths:
+        streams = load_streams(session_path)
+        points = cursor_points(streams, cursor_source, head_pose_gain)
+        if np.all(np.isnan(points[:, 0])):
+            print(f"{session_path}: no face found, skipped")
+            continue
+        timestamps = streams["timestamps"]
+        session_jitter, session_still, session_correlation = run_grid(
+            points, timestamps, grid_mincutoff, grid_beta, velocity_scale, accel, max_lag)
+        jitter_sum += session_jitter
+        still_frames += session_still
+        correlation += session_correlation
+        frame_times.append(np.median(np.diff(timestamps)))
+
+    if not frame_times:
+        raise ValueError("No usable sessions")
+    jitter = np.sqrt(jitter_sum / max(still_frames, 1))
+    lag = peak_lag(correlation) * float(np.median(frame_times))
+    return grid_mincutoff, grid_beta, jitter, lag
+
+
+def save_settings(profile_manager, mincutoff, beta, profile_name=None):
+    settings = {"mincutoff": round(float(mincutoff), 3), "beta": round(float(beta), 4)}
+    profile_manager.update_profile_settings({"mouse_controller": settings}, profile_name)
+    return settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune the cursor filter's mincutoff and beta on recorded sessions")
+    parser.add_argument("sessions", nargs="+", help="Session directories written by --record")
+    parser.add_argument("--profile", default=None,
+                        help="Read velocity scale and cursor source from this profile and store the result in it")
+    parser.add_argument("--mincutoff-range", type=float, nargs=2, default=[0.1, 3.0])
+    parser.add_argument("--beta-range", type=float, nargs=2, default=[0.001, 0.2])
+    parser.add_argument("--steps", type=int, default=40, help="Grid points per parameter (log spaced)")
+    parser.add_argument("--velocity-scale", type=float, default=None,
+                        help="Gain used to express jitter in screen pixels (default: the profile's)")
+    parser.add_argument("--max-lag-ms", type=float, default=None,
+                        help="Pick the least jittery setting within this lag instead of the knee")
+    args = parser.parse_args()
+
+    settings = {}
+    profile_manager = None
+    if args.profile:
+        from src.profile_manager import ProfileManager
+        profile_manager = ProfileManager()
+        settings = profile_manager.get_profile_settings(args.profile)
+    mouse_settings = settings.get("mouse_controller", {})
+    face_settings = settings.get("face_processing", {})
+    velocity_scale = args.velocity_scale or float(mouse_settings.get("velocity_scale", 20.0))
+
+    mincutoffs = np.geomspace(*args.mincutoff_range, args.steps)
+    betas = np.geomspace(*args.beta_range, args.steps)
+    start = time.perf_counter()
+    grid_mincutoff, grid_beta, jitter, lag = tune(
+        args.sessions, mincutoffs, betas, velocity_scale,
+        face_settings.get("cursor_source", "landmarks"), face_settings.get("head_pose_gain", (80.0, 80.0)))
+    print(f"Scored {len(grid_mincutoff)} settings in {time.perf_counter() - start:.1f} s")
+
+    front = pareto_front(jitter, lag)
+    if args.max_lag_ms is not None:
+        within = front[lag[front] <= args.max_lag_ms / 1000]
+        if len(within) == 0:
+            print(f"No setting lags less than {args.max_lag_ms:.0f} ms")
+            return 1
+        best = within[int(np.argmin(jitter[within]))]
+    else:
+        best = knee(front, jitter, lag)
+
+    print(f"{'mincutoff':>9} {'beta':>7} {'jitter px':>9} {'lag ms':>7}")
+    for i in front:
+        marker = "  <-" if i == best else ""
+        print(f"{grid_mincutoff[i]:9.3f} {grid_beta[i]:7.4f} {jitter[i]:9.3f} {lag[i] * 1000:7.1f}{marker}")
+    for name in ("mincutoff", "beta"):
+        if name in mouse_settings:
+            print(f"Current {name}: {mouse_settings[name]}")
+
+    if profile_manager:
+        saved = save_settings(profile_manager, grid_mincutoff[best], grid_beta[best], args.profile)
+        print(f"Saved to profile '{args.profile}': {saved}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,101 @@
+import threading
+
+class FrameMailbox:
+    """Single-slot, latest-frame-wins handoff between capture and inference.
+
+    put() never blocks: a frame that inference has not taken yet is simply
+    overwritten and handed to `discard`, if given. get() waits for a frame
+    newer than the last one taken.
+
+    Counters:
+        published   frames written by the producer
+        consumed    frames taken by the consumer
+        superseded  frames overwritten in the slot before they were taken
+        dropped     sequence numbers the consumer never saw that were lost
+                    before reaching the mailbox
+    """
+
+    def __init__(self, discard=None):
+        self.condition = threading.Condition()
+        self.discard = discard
+        self.frame = None
+        self.seq = 0
+        self.timestamp = None
+        self.last_taken_seq = 0
+        self.closed = False
+
+        self.published = 0
+        self.consumed = 0
+        self.superseded = 0
+        self.dropped = 0
+        self._superseded_since_take = 0
+
+    def put(self, frame, seq, timestamp=None):
+        with self.condition:
+            if self.closed:
+                return False
+
+            stale = self.frame
+            if stale is not None:
+                self.superseded += 1
+                self._superseded_since_take += 1
+            self.frame = frame
+            self.seq = seq
+            self.timestamp = timestamp
+            self.published += 1
+            self.condition.notify()
+
+        if stale is not None and self.discard:
+            self.discard(stale)
+        return True
+
+    def get(self, timeout=None):
+        """Returns (frame, seq, timestamp), or None on timeout or close."""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.frame is not None or self.closed, timeout):
+                return None
+            if self.frame is None:
+                return None
+
+            frame, seq, timestamp = self.frame, self.seq, self.timestamp
+            self.frame = None
+
+            if self.last_taken_seq:
+                missed = seq - self.last_taken_seq - 1
+                self.dropped += max(0, missed - self._superseded_since_take)
+            self._superseded_since_take = 0
+            self.last_taken_seq = seq
+            self.consumed += 1
+            return frame, seq, timestamp
+
+    def is_empty(self):
+        with self.condition:
+            return self.frame is None
+
+    def close(self):
+        # A frame still in the slot can be taken after close, so the last
+        # frame of a finite source is not lost.
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def reopen(self):
+        with self.condition:
+            stale = self.frame
+            self.closed = False
+            self.frame = None
+            self.last_taken_seq = 0
+            self._superseded_since_take = 0
+
+        if stale is not None and self.discard:
+            self.discard(stale)
+
+    def get_stats(self):
+        with self.condition:
+            return {
+                "published": self.published,
+                "consumed": self.consumed,
+                "superseded": self.superseded,
+                "dropped": self.dropped,
+                "last_seq": self.last_taken_seq,
+            }
@@ -0,0 +1,87 @@
+import threading
+from collections import deque
+import numpy as np
+
+class PooledFrame:
+    """A preallocated buffer with a reference count.
+
+    The stage that acquires a frame owns one reference; every other stage that
+    keeps it past the current call must retain() it and release() it when
+    done. `readonly` is a non-writeable view handed to consumers.
+    """
+
+    __slots__ = ("pool", "index", "array", "readonly", "seq", "timestamp", "refcount")
+
+    def __init__(self, pool, index, shape, dtype):
+        self.pool = pool
+        self.index = index
+        self.array = np.zeros(shape, dtype=dtype)
+        self.readonly = self.array.view()
+        self.readonly.flags.writeable = False
+        self.seq = 0
+        self.timestamp = None
+        self.refcount = 0
+
+    def retain(self):
+        self.pool._retain(self)
+        return self
+
+    def release(self):
+        self.pool._release(self)
+
+
+class FramePool:
+    """Ring of preallocated frames reused in acquisition order.
+
+    Buffers go back to the ring once their reference count drops to zero, so
+    in steady state no frame memory is allocated. acquire() returns None when
+    every buffer is still referenced; the caller drops that frame.
+    """
+
+    def __init__(self, shape, size=6, dtype=np.uint8):
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.lock = threading.Lock()
+        self.frames = [PooledFrame(self, i, self.shape, dtype) for i in range(size)]
+        self.free = deque(self.frames)
+
+        self.acquired = 0
+        self.exhausted = 0
+
+    def acquire(self, seq=0, timestamp=None):
+        with self.lock:
+            if not self.free:
+                self.exhausted += 1
+                return None
+            frame = self.free.popleft()
+            frame.refcount = 1
+            self.acquired += 1
+        frame.seq = seq
+        frame.timestamp = timestamp
+        return frame
+
+    def _retain(self, frame):
+        with self.lock:
+            if frame.refcount <= 0:
+                raise ValueError("Can't retain a frame that was already released")
+            frame.refcount += 1
+
+    def _release(self, frame):
+        with self.lock:
+            if frame.refcount <= 0:
+                raise ValueError("Frame released more times than it was retained")
+            frame.refcount -= 1
+            if frame.refcount == 0:
+                self.free.append(frame)
+
+    def matches(self, shape):
+        return tuple(shape) == self.shape
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "size": len(self.frames),
+                "free": len(self.free),
+                "acquired": self.acquired,
+                "exhausted": self.exhausted,
+            }
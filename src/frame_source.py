@@ -0,0 +1,463 @@
+import abc
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+REPLAY_RECORDED = "recorded"
+REPLAY_FAST = "fast"
+REPLAY_FIXED = "fixed"
+REPLAY_MODES = (REPLAY_RECORDED, REPLAY_FAST, REPLAY_FIXED)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+
+
+def retrieve_into(cap, buffer):
+    # Decodes into the previous frame's buffer so steady-state capture does
+    # not allocate; the caller converts each frame before the next retrieve.
+    if buffer is None:
+        return cap.retrieve()
+    return cap.retrieve(buffer)
+
+
+BACKENDS = {
+    "ANY": cv2.CAP_ANY,
+    "V4L2": cv2.CAP_V4L2,
+    "DSHOW": cv2.CAP_DSHOW,
+    "MSMF": cv2.CAP_MSMF,
+    "AVFOUNDATION": cv2.CAP_AVFOUNDATION,
+}
+
+
+def platform_backends():
+    # Backends worth trying on this platform, preferred first.
+    if sys.platform.startswith("win"):
+        return ["DSHOW", "MSMF"]
+    if sys.platform.startswith("linux"):
+        return ["V4L2", "ANY"]
+    if sys.platform == "darwin":
+        return ["AVFOUNDATION"]
+    return ["ANY"]
+
+
+def default_backend():
+    return BACKENDS[platform_backends()[0]]
+
+
+def backend_id(backend):
+    if backend is None:
+        return default_backend()
+    if isinstance(backend, str):
+        return BACKENDS[backend.upper()]
+    return backend
+
+
+def decode_fourcc(value):
+    value = int(value)
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00")
+
+
+class FrameSource(metaclass=abc.ABCMeta):
+    """Base class of every frame producer used by CameraThread.
+
+    read() returns (ok, frame_bgr, timestamp) where timestamp is in seconds on
+    the time.monotonic() timeline. Recorded sources are paced according to
+    replay_mode: "recorded" follows the media timestamps, "fixed" plays at fps
+    and "fast" returns frames as quickly as they can be decoded.
+
+    read() is grab() followed by retrieve(): grab() advances to the next
+    frame and stamps it, retrieve() decodes the last grabbed frame. Callers
+    that do not need every frame can grab() several times and retrieve()
+    only the one they will use.
+    """
+
+    live = False
+
+    def __init__(self, replay_mode=REPLAY_RECORDED, fps=30.0, loop=False):
+        if replay_mode not in REPLAY_MODES:
+            raise ValueError(f"replay_mode should be one of {REPLAY_MODES}")
+        if fps <= 0:
+            raise ValueError("fps should be >0")
+        self.replay_mode = replay_mode
+        self.fps = float(fps)
+        self.loop = loop
+        self.finished = False
+        self.frame_index = 0
+        self.last_media_time = None
+        self.grabbed_timestamp = None
+        self._start_time = None
+        self._first_media_time = None
+        self._media_offset = 0.0
+
+    @abc.abstractmethod
+    def open(self) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def _grab_frame(self):
+        """Advances to the next frame, returns (ok, media_time) where media_time may be None."""
+        pass
+
+    @abc.abstractmethod
+    def _retrieve_frame(self):
+        """Decodes the grabbed frame, returns (ok, frame_bgr)."""
+        pass
+
+    def _rewind(self) -> bool:
+        return False
+
+    def release(self):
+        pass
+
+    def is_opened(self) -> bool:
+        return True
+
+    def grab(self) -> bool:
+        ok, media_time = self._grab_frame()
+        if not ok and self.loop and self.last_media_time is not None and self._rewind():
+            self._media_offset = self.last_media_time + 1.0 / self.fps
+            ok, media_time = self._grab_frame()
+
+        if not ok:
+            if not self.live:
+                self.finished = True
+            self.grabbed_timestamp = None
+            return False
+
+        self.grabbed_timestamp = self._pace(media_time)
+        self.frame_index += 1
+        return True
+
+    def retrieve(self):
+        if self.grabbed_timestamp is None:
+            return False, None, None
+        ok, frame = self._retrieve_frame()
+        if not ok:
+            return False, None, None
+        return True, frame, self.grabbed_timestamp
+
+    def read(self):
+        if not self.grab():
+            return False, None, None
+        return self.retrieve()
+
+    def _pace(self, media_time):
+        if self.live:
+            return time.monotonic()
+
+        if self.replay_mode == REPLAY_FIXED or media_time is None:
+            media_time = self.frame_index / self.fps
+        else:
+            media_time += self._media_offset
+        self.last_media_time = media_time
+
+        if self.replay_mode == REPLAY_FAST:
+            return time.monotonic()
+
+        if self._start_time is None:
+            self._start_time = time.monotonic()
+            self._first_media_time = media_time
+        target = self._start_time + (media_time - self._first_media_time)
+        delay = target - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        return target
+
+    def _reset_timeline(self):
+        self.finished = False
+        self.frame_index = 0
+        self.last_media_time = None
+        self.grabbed_timestamp = None
+        self._start_time = None
+        self._first_media_time = None
+        self._media_offset = 0.0
+
+
+class WebcamSource(FrameSource):
+
+    live = True
+
+    def __init__(self, device_index=0, width=640, height=480, backend=None, buffer_size=1,
+                 fourcc=None, fps=None):
+        super().__init__()
+        self.device_index = device_index
+        self.width = width
+        self.height = height
+        self.backend = backend_id(backend)
+        self.buffer_size = buffer_size
+        self.buffer_size_supported = False
+        self.fourcc = fourcc
+        self.requested_fps = fps
+        self.cap = None
+        self._frame = None
+
+    @classmethod
+    def from_settings(cls, settings, width=640, height=480):
+        """Builds a webcam from the profile's "camera" section, using the
+        configuration stored by the probe for the selected device."""
+        device_index = settings.get("device_index", 0)
+        config = settings.get("devices", {}).get(str(device_index), {})
+        return cls(
+            device_index,
+            config.get("width", width),
+            config.get("height", height),
+            backend=config.get("backend"),
+            fourcc=config.get("fourcc"),
+            fps=config.get("fps")
+        )
+
+    def open(self) -> bool:
+        self.release()
+        self.cap = cv2.VideoCapture(self.device_index, self.backend)
+        # FOURCC has to be set before the size for some drivers to accept it.
+        if self.fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.requested_fps:
+            self.cap.set(cv2.CAP_PROP_FPS, self.requested_fps)
+        # Not every backend honours this; the capture loop drains the queue
+        # itself when it does not.
+        self.buffer_size_supported = bool(self.buffer_size and self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size))
+        return self.cap.isOpened()
+
+    def _grab_frame(self):
+        if self.cap is None:
+            return False, None
+        return self.cap.grab(), None
+
+    def _retrieve_frame(self):
+        ret, frame = retrieve_into(self.cap, self._frame)
+        if ret:
+            self._frame = frame
+        return ret, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def is_opened(self) -> bool:
+        return self.cap is not None and self.cap.isOpened()
+
+    def get_format(self):
+        if self.cap is None:
+            return None
+        return {
+            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": self.cap.get(cv2.CAP_PROP_FPS),
+            "fourcc": decode_fourcc(self.cap.get(cv2.CAP_PROP_FOURCC)),
+            "backend": self.cap.getBackendName(),
+        }
+
+
+class VideoFileSource(FrameSource):
+
+    def __init__(self, path, replay_mode=REPLAY_RECORDED, fps=None, loop=False):
+        super().__init__(replay_mode, fps or 30.0, loop)
+        self.path = path
+        self.cap = None
+        self._frame = None
+        self._fixed_fps = fps is not None
+
+    def open(self) -> bool:
+        self.release()
+        self._reset_timeline()
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            return False
+        file_fps = self.cap.get(cv2.CAP_PROP_FPS)
+        if not self._fixed_fps and file_fps and file_fps > 0:
+            self.fps = float(file_fps)
+        return True
+
+    def _grab_frame(self):
+        if self.cap is None or not self.cap.grab():
+            return False, None
+        return True, self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+
+    def _retrieve_frame(self):
+        ret, frame = retrieve_into(self.cap, self._frame)
+        if ret:
+            self._frame = frame
+        return ret, frame
+
+    def _rewind(self) -> bool:
+        return self.cap is not None and self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def is_opened(self) -> bool:
+        return self.cap is not None and self.cap.isOpened()
+
+
+class ImageSequenceSource(FrameSource):
+    """Plays the images of a directory in name order.
+
+    If the directory contains a timestamps.txt file with one value in seconds
+    per line, those timestamps are used for "recorded" replay.
+    """
+
+    def __init__(self, directory, replay_mode=REPLAY_RECORDED, fps=30.0, loop=False,
+                 timestamps_file="timestamps.txt"):
+        super().__init__(replay_mode, fps, loop)
+        self.directory = directory
+        self.timestamps_file = timestamps_file
+        self.files = []
+        self.timestamps = None
+        self.position = 0
+
+    def open(self) -> bool:
+        self._reset_timeline()
+        self.position = 0
+        if not os.path.isdir(self.directory):
+            return False
+
+        self.files = sorted(
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+
+        timestamps_path = os.path.join(self.directory, self.timestamps_file)
+        self.timestamps = None
+        if os.path.exists(timestamps_path):
+            with open(timestamps_path, "r") as f:
+                values = [float(line) for line in f if line.strip()]
+            if len(values) >= len(self.files):
+                self.timestamps = values
+            else:
+                print(f"Ignoring {timestamps_path}: {len(values)} timestamps for {len(self.files)} images")
+
+        return len(self.files) > 0
+
+    def _grab_frame(self):
+        if self.position >= len(self.files):
+            return False, None
+        media_time = self.timestamps[self.position] if self.timestamps else None
+        self.position += 1
+        return True, media_time
+
+    def _retrieve_frame(self):
+        frame = cv2.imread(self.files[self.position - 1], cv2.IMREAD_COLOR)
+        return frame is not None, frame
+
+    def _rewind(self) -> bool:
+        self.position = 0
+        return len(self.files) > 0
+
+
+class SyntheticSource(FrameSource):
+    """Deterministic generator: a bright ellipse moving over a static gradient."""
+
+    def __init__(self, width=640, height=480, replay_mode=REPLAY_FIXED, fps=30.0,
+                 num_frames=None, seed=0):
+        super().__init__(replay_mode, fps)
+        self.width = width
+        self.height = height
+        self.num_frames = num_frames
+        self.seed = seed
+        self.background = None
+        self.frame = None
+        self.position = 0
+
+    def open(self) -> bool:
+        self._reset_timeline()
+        self.position = 0
+        rng = np.random.default_rng(self.seed)
+        gradient = np.linspace(40, 120, self.width, dtype=np.float32)
+        background = np.repeat(gradient[np.newaxis, :], self.height, axis=0)
+        background += rng.normal(0, 4, size=background.shape).astype(np.float32)
+        background = np.clip(background, 0, 255).astype(np.uint8)
+        self.background = cv2.cvtColor(background, cv2.COLOR_GRAY2BGR)
+        self.frame = np.empty_like(self.background)
+        return True
+
+    def _grab_frame(self):
+        if self.background is None:
+            return False, None
+        if self.num_frames is not None and self.position >= self.num_frames:
+            return False, None
+        self.position += 1
+        return True, (self.position - 1) / self.fps
+
+    def _retrieve_frame(self):
+        t = (self.position - 1) / self.fps
+        cx = int(self.width / 2 + self.width / 4 * np.sin(2 * np.pi * 0.2 * t))
+        cy = int(self.height / 2 + self.height / 6 * np.sin(2 * np.pi * 0.3 * t))
+        axes = (self.width // 8, self.height // 5)
+
+        np.copyto(self.frame, self.background)
+        cv2.ellipse(self.frame, (cx, cy), axes, 0, 0, 360, (180, 200, 230), -1)
+        return True, self.frame
+
+    def _rewind(self) -> bool:
+        self.position = 0
+        return True
+
+
+class SessionSource(FrameSource):
+    """Replays a session written by SessionRecorder with its capture timestamps."""
+
+    def __init__(self, path, replay_mode=REPLAY_RECORDED, fps=30.0, loop=False):
+        super().__init__(replay_mode, fps, loop)
+        self.path = path
+        self.reader = None
+        self.frame = None
+        self.position = 0
+
+    def open(self) -> bool:
+        from src.session_recorder import SessionReader
+        self._reset_timeline()
+        self.position = 0
+        self.reader = SessionReader(self.path)
+        if self.frame is None or self.frame.shape != self.reader.shape:
+            self.frame = np.empty(self.reader.shape, dtype=np.uint8)
+        return len(self.reader) > 0
+
+    def _grab_frame(self):
+        if self.reader is None or self.position >= len(self.reader):
+            return False, None
+        media_time = float(self.reader.timestamps[self.position])
+        self.position += 1
+        return True, media_time
+
+    def _retrieve_frame(self):
+        # Sessions are stored as RGB; sources hand out BGR like a camera.
+        cv2.cvtColor(self.reader.frame(self.position - 1), cv2.COLOR_RGB2BGR, dst=self.frame)
+        return True, self.frame
+
+    def _rewind(self) -> bool:
+        self.position = 0
+        return self.reader is not None and len(self.reader) > 0
+
+    def release(self):
+        self.reader = None
+
+
+def create_frame_source(spec, replay_mode=REPLAY_RECORDED, fps=None, loop=False,
+                        width=640, height=480):
+    """Builds a source from a "kind:argument" string.
+
+    Examples: "webcam:0", "video:session.mp4", "images:frames/", "synthetic:300",
+    "session:recordings/run1".
+    """
+    kind, _, argument = spec.partition(":")
+    kind = kind.lower()
+
+    if kind == "webcam":
+        return WebcamSource(int(argument or 0), width, height)
+    if kind == "video":
+        return VideoFileSource(argument, replay_mode, fps, loop)
+    if kind == "images":
+        return ImageSequenceSource(argument, replay_mode, fps or 30.0, loop)
+    if kind == "synthetic":
+        num_frames = int(argument) if argument else None
+        return SyntheticSource(width, height, replay_mode, fps or 30.0, num_frames)
+    if kind == "session":
+        return SessionSource(argument, replay_mode, fps or 30.0, loop)
+    raise ValueError(f"Unknown frame source '{spec}'")
@@ -2,6 +2,7 @@ import tkinter as tk
 import customtkinter as ctk
 import PIL.Image, PIL.ImageTk
 import cv2
+import numpy as np
 from src.pipeline import Pipeline
 from src.gui.profile_manager_ui import ProfileManagerUI
 from src.gui.mouse_settings_ui import MouseSettingsUI
@@ -30,6 +31,13 @@ class MainWindow(ctk.CTk):
         self._create_main_layout()
         
         self.update_interval = 10
+        self.preview_seq = None
+        self.preview_rgba = None
+        self.preview_flipped = None
+        self.preview_image = None
+        self.canvas_image = None
+        self.bind("<Unmap>", self.on_visibility_change)
+        self.bind("<Map>", self.on_visibility_change)
         self.update_frame()
     
     def _create_main_layout(self):
@@ -195,6 +203,8 @@ class MainWindow(ctk.CTk):
             
             # Update mouse settings UI
             self.mouse_settings.update_from_profile(self.current_settings)
+            self.mouse_controller.configure_output(self.current_settings.get("mouse_controller", {}))
+            self.face_processor.configure(self.current_settings.get("face_processing", {}))
             
             # Update voice settings UI
             self.voice_settings.update_from_profile()
@@ -203,19 +213,49 @@ class MainWindow(ctk.CTk):
         except Exception as e:
             print(f"Error loading profile: {e}")
     
+    def _allocate_preview(self, shape):
+        height, width = shape[:2]
+        self.preview_flipped = np.empty((height, width, 3), dtype=np.uint8)
+        self.preview_rgba = np.full((height, width, 4), 255, dtype=np.uint8)
+        # RGBA images created with frombuffer share memory with the array,
+        # so writing into preview_rgba updates preview_image in place.
+        self.preview_image = PIL.Image.frombuffer("RGBA", (width, height), self.preview_rgba, "raw", "RGBA", 0, 1)
+        self.photo = PIL.ImageTk.PhotoImage(image=self.preview_image)
+
+        self.canvas.config(width=width, height=height)
+        if self.canvas_image is None:
+            self.canvas_image = self.canvas.create_image(0, 0, image=self.photo, anchor=tk.NW)
+        else:
+            self.canvas.itemconfig(self.canvas_image, image=self.photo)
+
+    def on_visibility_change(self, event):
+        if event.widget is not self:
+            return
+        # Nothing is shown while minimized, so no overlay is drawn or uploaded.
+        self.face_processor.preview_enabled = self.state() != "iconic"
+
     def update_frame(self):
-        frame = self.face_processor.get_processed_frame()
-        frame = cv2.flip(frame, 1) if frame is not None else None
-        if frame is not None:
-            self.photo = PIL.ImageTk.PhotoImage(image=PIL.Image.fromarray(frame))
-            
-            self.canvas.config(width=frame.shape[1], height=frame.shape[0])
-            self.canvas.create_image(0, 0, image=self.photo, anchor=tk.NW)
+        if not self.face_processor.preview_enabled:
+            self.after(self.update_interval, self.update_frame)
+            return
+        pooled = self.face_processor.acquire_processed_frame()
+        if pooled is not None:
+            try:
+                if pooled.seq != self.preview_seq:
+                    self.preview_seq = pooled.seq
+                    if self.preview_rgba is None or self.preview_rgba.shape[:2] != pooled.array.shape[:2]:
+                        self._allocate_preview(pooled.array.shape)
+
+                    cv2.flip(pooled.array, 1, dst=self.preview_flipped)
+                    cv2.cvtColor(self.preview_flipped, cv2.COLOR_RGB2RGBA, dst=self.preview_rgba)
+                    self.photo.paste(self.preview_image)
+            finally:
+                pooled.release()
         self.after(self.update_interval, self.update_frame)
     
     def __del__(self):
         if hasattr(self, 'camera_thread') and self.camera_thread:
-            self.camera_thread.stop_flag.set()
+            self.camera_thread.stop()
 
     def on_closing(self):
         if hasattr(self, 'blendshape_processor'):
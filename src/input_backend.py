@@ -0,0 +1,310 @@
+import os
+import sys
+import threading
+import time
+
+BACKEND_AUTO = "auto"
+BACKEND_PYAUTOGUI = "pyautogui"
+BACKEND_XTEST = "xtest"
+BACKEND_NULL = "null"
+
+
+class InputBackend:
+    """Mouse and keyboard output shared by cursor control, blendshape
+    bindings and voice commands.
+
+    move() only accumulates: fractional pixels are kept until they add up
+    to a whole one, and every move queued before flush() is sent as a single
+    event. Buttons and keys flush first so they land at the latest position.
+    Subclasses implement the underscore methods; calls are serialized.
+    """
+
+    name = None
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending_x = 0.0
+        self.pending_y = 0.0
+        self.events = 0
+        self.moves = 0
+        self.coalesced = 0
+        self.queued_moves = 0
+        self.injection_time = 0.0
+
+    def move(self, dx, dy):
+        with self.lock:
+            self.pending_x += dx
+            self.pending_y += dy
+            self.queued_moves += 1
+
+    def flush(self):
+        with self.lock:
+            return self._flush_locked()
+
+    def _flush_locked(self):
+        move_x = int(round(self.pending_x))
+        move_y = int(round(self.pending_y))
+        if move_x == 0 and move_y == 0:
+            return 0, 0
+        self.pending_x -= move_x
+        self.pending_y -= move_y
+        self.coalesced += max(self.queued_moves - 1, 0)
+        self.queued_moves = 0
+        self._inject(self._move_rel, move_x, move_y)
+        self.moves += 1
+        return move_x, move_y
+
+    def discard_pending(self):
+        with self.lock:
+            self.pending_x = self.pending_y = 0.0
+            self.queued_moves = 0
+
+    def _inject(self, function, *args):
+        start = time.perf_counter()
+        try:
+            function(*args)
+        finally:
+            self.injection_time += time.perf_counter() - start
+            self.events += 1
+
+    def _action(self, function, *args):
+        with self.lock:
+            self._flush_locked()
+            self._inject(function, *args)
+
+    def mouse_down(self, button="left"):
+        self._action(self._mouse_down, button)
+
+    def mouse_up(self, button="left"):
+        self._action(self._mouse_up, button)
+
+    def click(self, button="left"):
+        self._action(self._click, button, 1)
+
+    def double_click(self, button="left"):
+        self._action(self._click, button, 2)
+
+    def scroll(self, clicks):
+        self._action(self._scroll, clicks)
+
+    def key_down(self, key):
+        self._action(self._key_down, key)
+
+    def key_up(self, key):
+        self._action(self._key_up, key)
+
+    def press(self, key):
+        self._action(self._press, key)
+
+    def hotkey(self, *keys):
+        self._action(self._hotkey, keys)
+
+    def _press(self, key):
+        self._key_down(key)
+        self._key_up(key)
+
+    def _hotkey(self, keys):
+        for key in keys:
+            self._key_down(key)
+        for key in reversed(keys):
+            self._key_up(key)
+
+    def close(self):
+        pass
+
+    def get_stats(self):
+        return {
+            "backend": self.name,
+            "events": self.events,
+            "moves": self.moves,
+            "coalesced_moves": self.coalesced,
+            "average_injection_us": (self.injection_time / self.events * 1e6) if self.events else None,
+        }
+
+
+class PyAutoGuiBackend(InputBackend):
+    name = BACKEND_PYAUTOGUI
+
+    def __init__(self):
+        super().__init__()
+        import pyautogui
+        pyautogui.FAILSAFE = False
+        pyautogui.PAUSE = 0
+        pyautogui.MINIMUM_DURATION = 0
+        pyautogui.MINIMUM_SLEEP = 0.0049
+        self.pyautogui = pyautogui
+
+    def _move_rel(self, dx, dy):
+        self.pyautogui.moveRel(dx, dy, duration=0)
+
+    def _mouse_down(self, button):
+        self.pyautogui.mouseDown(button=button)
+
+    def _mouse_up(self, button):
+        self.pyautogui.mouseUp(button=button)
+
+    def _click(self, button, clicks):
+        self.pyautogui.click(button=button, clicks=clicks)
+
+    def _scroll(self, clicks):
+        self.pyautogui.scroll(clicks)
+
+    def _key_down(self, key):
+        self.pyautogui.keyDown(key)
+
+    def _key_up(self, key):
+        self.pyautogui.keyUp(key)
+
+    def _press(self, key):
+        self.pyautogui.press(key)
+
+    def _hotkey(self, keys):
+        self.pyautogui.hotkey(*keys)
+
+
+class XTestBackend(InputBackend):
+    """Injects events through the X11 XTEST extension (python-xlib).
+
+    Events are written to the X connection without waiting for a reply, and
+    relative motion is sent as is instead of reading the pointer position
+    first as pyautogui does.
+    """
+
+    name = BACKEND_XTEST
+
+    BUTTONS = {"left": 1, "middle": 2, "right": 3}
+    # pyautogui key names that differ from X keysym names.
+    KEYSYMS = {
+        "enter": "Return", "return": "Return", "tab": "Tab", "space": "space",
+        "escape": "Escape", "esc": "Escape", "backspace": "BackSpace", "delete": "Delete",
+        "up": "Up", "down": "Down", "left": "Left", "right": "Right",
+        "home": "Home", "end": "End", "pageup": "Prior", "pagedown": "Next",
+        "ctrl": "Control_L", "ctrlleft": "Control_L", "ctrlright": "Control_R",
+        "shift": "Shift_L", "shiftleft": "Shift_L", "shiftright": "Shift_R",
+        "alt": "Alt_L", "altleft": "Alt_L", "altright": "Alt_R",
+        "win": "Super_L", "winleft": "Super_L", "super": "Super_L",
+    }
+
+    def __init__(self, display_name=None):
+        super().__init__()
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+        self.X = X
+        self.XK = XK
+        self.xtest = xtest
+        self.display = display.Display(display_name)
+        if not self.display.has_extension("XTEST"):
+            self.display.close()
+            raise RuntimeError("X server has no XTEST extension")
+        self.keycodes = {}
+
+    def keycode(self, key):
+        keycode = self.keycodes.get(key)
+        if keycode is None:
+            name = self.KEYSYMS.get(key.lower(), key)
+            if len(name) > 1 and name[0] in "fF" and name[1:].isdigit():
+                name = name.upper()
+            keysym = self.XK.string_to_keysym(name)
+            keycode = self.display.keysym_to_keycode(keysym) if keysym else 0
+            if not keycode:
+                raise ValueError(f"No keycode for key '{key}'")
+            self.keycodes[key] = keycode
+        return keycode
+
+    def fake(self, event_type, detail, **kwargs):
+        self.xtest.fake_input(self.display, event_type, detail, **kwargs)
+
+    def _move_rel(self, dx, dy):
+        # detail=True makes the motion relative to the current position.
+        self.fake(self.X.MotionNotify, True, x=dx, y=dy)
+        self.display.flush()
+
+    def _mouse_down(self, button):
+        self.fake(self.X.ButtonPress, self.BUTTONS[button])
+        self.display.flush()
+
+    def _mouse_up(self, button):
+        self.fake(self.X.ButtonRelease, self.BUTTONS[button])
+        self.display.flush()
+
+    def _click(self, button, clicks):
+        for _ in range(clicks):
+            self.fake(self.X.ButtonPress, self.BUTTONS[button])
+            self.fake(self.X.ButtonRelease, self.BUTTONS[button])
+        self.display.flush()
+
+    def _scroll(self, clicks):
+        # Buttons 4 and 5 are the wheel; one press per notch.
+        button = 4 if clicks > 0 else 5
+        for _ in range(abs(int(clicks))):
+            self.fake(self.X.ButtonPress, button)
+            self.fake(self.X.ButtonRelease, button)
+        self.display.flush()
+
+    def _key_down(self, key):
+        self.fake(self.X.KeyPress, self.keycode(key))
+        self.display.flush()
+
+    def _key_up(self, key):
+        self.fake(self.X.KeyRelease, self.keycode(key))
+        self.display.flush()
+
+    def close(self):
+        try:
+            self.display.close()
+        except Exception as e:
+            print(f"X display close error: {e}")
+
+
+class NullBackend(InputBackend):
+    """Injects nothing; records (time, event, args) for tests and benchmarks."""
+
+    name = BACKEND_NULL
+
+    def __init__(self, record=True):
+        super().__init__()
+        self.record = record
+        self.log = []
+
+    def _log(self, event, *args):
+        if self.record:
+            self.log.append((time.monotonic(), event, args))
+
+    def _move_rel(self, dx, dy):
+        self._log("move", dx, dy)
+
+    def _mouse_down(self, button):
+        self._log("mouse_down", button)
+
+    def _mouse_up(self, button):
+        self._log("mouse_up", button)
+
+    def _click(self, button, clicks):
+        self._log("click", button, clicks)
+
+    def _scroll(self, clicks):
+        self._log("scroll", clicks)
+
+    def _key_down(self, key):
+        self._log("key_down", key)
+
+    def _key_up(self, key):
+        self._log("key_up", key)
+
+
+def create_input_backend(name=BACKEND_AUTO):
+    """Builds the named backend. `auto` uses XTest on Linux under X11 when
+    python-xlib is installed and pyautogui everywhere else; a backend that
+    cannot start falls back to pyautogui."""
+    if name == BACKEND_NULL:
+        # Nothing reads the log of a running app, so keep it from growing.
+        return NullBackend(record=False)
+    if name == BACKEND_XTEST or (name == BACKEND_AUTO and sys.platform.startswith("linux")
+                                 and os.environ.get("DISPLAY")):
+        try:
+            return XTestBackend()
+        except Exception as e:
+            print(f"XTest input backend unavailable ({e}), using pyautogui")
+    elif name not in (BACKEND_AUTO, BACKEND_PYAUTOGUI):
+        print(f"Unknown input backend '{name}', using pyautogui")
+    return PyAutoGuiBackend()
@@ -0,0 +1,91 @@
+import argparse
+import os
+import numpy as np
+from src.face_processor import FaceProcessor, DEFAULT_MODEL_PATH, CURSOR_HEAD_POSE
+from src.session_recorder import SessionReader
+
+STREAMS_FILE = "streams.npz"
+
+
+def extract_streams(session_path, model_path=DEFAULT_MODEL_PATH, progress_every=300):
+    """Runs the landmarker over every frame of a recorded session and returns
+    the per-frame cursor inputs:
+
+    - timestamps: capture time of each frame (s)
+    - landmark_cursor: (N, 2) mean of FaceProcessor.indices in cursor pixels
+    - head_pose: (N, 3) yaw, pitch, roll in radians
+
+    Frames without a face are NaN. IMAGE mode is used so every frame gets a
+    result regardless of how fast this machine is.
+    """
+    reader = SessionReader(session_path)
+    face_processor = FaceProcessor(model_path=model_path)
+    face_processor.is_live_stream_mode = False
+    face_processor.preview_enabled = False
+    face_processor.configure({"cursor_source": CURSOR_HEAD_POSE})
+    if not face_processor.initialize():
+        raise RuntimeError("Face landmarker failed to initialize")
+
+    count = len(reader)
+    landmark_cursor = np.full((count, 2), np.nan, dtype=np.float32)
+    head_pose = np.full((count, 3), np.nan, dtype=np.float32)
+    # Session frames are read-only views into the file.
+    frame = np.empty(reader.shape, dtype=np.uint8)
+
+    try:
+        for i, (view, timestamp, seq) in enumerate(reader):
+            np.copyto(frame, view)
+            face_processor.process_frame(frame, timestamp, seq)
+            _, pixels = face_processor.get_landmarks()
+            if pixels is not None:
+                landmark_cursor[i] = pixels[face_processor.indices].mean(axis=0)
+            pose = face_processor.get_head_pose()
+            if pose is not None:
+                head_pose[i] = pose
+            if progress_every and (i + 1) % progress_every == 0:
+                print(f"{i + 1}/{count} frames")
+    finally:
+        face_processor.close()
+
+    return {
+        "timestamps": reader.timestamps.astype(np.float64),
+        "landmark_cursor": landmark_cursor,
+        "head_pose": head_pose,
+        "frame_size": np.array([face_processor.frame_width, face_processor.frame_height]),
+    }
+
+
+def save_streams(session_path, streams):
+    path = os.path.join(session_path, STREAMS_FILE)
+    np.savez(path, **streams)
+    return path
+
+
+def load_streams(session_path, extract=True):
+    """Loads the streams stored next to a session, extracting them first if
+    they are missing and `extract` is set."""
+    path = os.path.join(session_path, STREAMS_FILE)
+    if not os.path.exists(path):
+        if not extract:
+            raise FileNotFoundError(path)
+        save_streams(session_path, extract_streams(session_path))
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract cursor input streams from recorded sessions")
+    parser.add_argument("sessions", nargs="+", help="Session directories written by --record")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    args = parser.parse_args()
+
+    for session_path in args.sessions:
+        streams = extract_streams(session_path, args.model)
+        found = np.count_nonzero(~np.isnan(streams["landmark_cursor"][:, 0]))
+        path = save_streams(session_path, streams)
+        print(f"{session_path}: face in {found}/{len(streams['timestamps'])} frames, saved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+import numpy as np
+
+NUM_LANDMARKS = 478
+
+
+def landmarks_to_array(landmarks):
+    """Converts a MediaPipe landmark list into a contiguous float32 (N, 3)
+    array of normalized x, y, z. This is the only place landmark objects are
+    read; everything downstream indexes the array."""
+    count = len(landmarks)
+    values = np.fromiter(
+        (value for landmark in landmarks for value in (landmark.x, landmark.y, landmark.z)),
+        dtype=np.float32, count=count * 3
+    )
+    return values.reshape(count, 3)
+
+
+def map_from_roi(points, roi):
+    """Maps normalized landmarks of a cropped input back to the full frame,
+    in place. roi is (x0, y0, x1, y1, width, height) in pixels."""
+    x0, y0, x1, y1, width, height = roi
+    sx, sy = (x1 - x0) / width, (y1 - y0) / height
+    points[:, 0] *= sx
+    points[:, 0] += x0 / width
+    points[:, 1] *= sy
+    points[:, 1] += y0 / height
+    points[:, 2] *= sx
+    return points
+
+
+def scale_to_pixels(points, width, height):
+    return points[:, :2] * np.array([width, height], dtype=np.float32)
+
+
+def bounding_box(points):
+    """Normalized (left, top, right, bottom) of the landmarks."""
+    left, top = points[:, :2].min(axis=0)
+    right, bottom = points[:, :2].max(axis=0)
+    return (float(left), float(top), float(right), float(bottom))
+
+
+# MediaPipe's face blendshape categories, in the order the model emits them.
+BLENDSHAPE_NAMES = (
+    "_neutral",
+    "browDownLeft", "browDownRight", "browInnerUp", "browOuterUpLeft", "browOuterUpRight",
+    "cheekPuff", "cheekSquintLeft", "cheekSquintRight",
+    "eyeBlinkLeft", "eyeBlinkRight",
+    "eyeLookDownLeft", "eyeLookDownRight", "eyeLookInLeft", "eyeLookInRight",
+    "eyeLookOutLeft", "eyeLookOutRight", "eyeLookUpLeft", "eyeLookUpRight",
+    "eyeSquintLeft", "eyeSquintRight", "eyeWideLeft", "eyeWideRight",
+    "jawForward", "jawLeft", "jawOpen", "jawRight",
+    "mouthClose", "mouthDimpleLeft", "mouthDimpleRight", "mouthFrownLeft", "mouthFrownRight",
+    "mouthFunnel", "mouthLeft", "mouthLowerDownLeft", "mouthLowerDownRight",
+    "mouthPressLeft", "mouthPressRight", "mouthPucker", "mouthRight",
+    "mouthRollLower", "mouthRollUpper", "mouthShrugLower", "mouthShrugUpper",
+    "mouthSmileLeft", "mouthSmileRight", "mouthStretchLeft", "mouthStretchRight",
+    "mouthUpperUpLeft", "mouthUpperUpRight", "noseSneerLeft", "noseSneerRight",
+)
+NUM_BLENDSHAPES = len(BLENDSHAPE_NAMES)
+BLENDSHAPE_INDEX = {name: i for i, name in enumerate(BLENDSHAPE_NAMES)}
+
+
+def blendshapes_to_array(categories):
+    """Converts a MediaPipe blendshape category list into a float32 vector
+    laid out as BLENDSHAPE_NAMES, so scores are looked up by index."""
+    if len(categories) == NUM_BLENDSHAPES:
+        return np.fromiter((category.score for category in categories),
+                           dtype=np.float32, count=NUM_BLENDSHAPES)
+
+    scores = np.zeros(NUM_BLENDSHAPES, dtype=np.float32)
+    for category in categories:
+        index = BLENDSHAPE_INDEX.get(category.category_name)
+        if index is not None:
+            scores[index] = category.score
+    return scores
+
+
+def head_pose_angles(matrix):
+    """(yaw, pitch, roll) in radians from a 4x4 facial transformation
+    matrix. Yaw turns about the vertical axis, pitch about the horizontal."""
+    rotation = np.asarray(matrix, dtype=np.float64)[:3, :3]
+    yaw = np.arcsin(np.clip(-rotation[2, 0], -1.0, 1.0))
+    pitch = np.arctan2(rotation[2, 1], rotation[2, 2])
+    roll = np.arctan2(rotation[1, 0], rotation[0, 0])
+    return np.array([yaw, pitch, roll], dtype=np.float32)
+
+
+def head_pose_to_pixels(angles, width, height, gain):
+    """Maps yaw and pitch onto the cursor frame: the centre for a frontal
+    face, `gain` pixels per radian away from it. A negative gain flips an
+    axis."""
+    gain_x, gain_y = gain
+    # The transform lives in a y-up space, so pitch towards the chest is
+    # positive and moves the cursor down the image like the landmarks do.
+    return np.array([width / 2 + angles[0] * gain_x, height / 2 + angles[1] * gain_y], dtype=np.float32)
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 class LowPassFilter(object):
 
@@ -185,3 +186,95 @@ class OneEuroFilter(object):
         self.__lasttime = None
 
 # ----------------------------------------------------------------------------
+
+class VectorOneEuroFilter(object):
+
+    def __init__(self, shape, freq:float, mincutoff=1.0, beta=0.0, dcutoff=1.0) -> None:
+        """Initializes a One Euro Filter over an array of independent channels
+
+        Every element of the array (cursor x and y, head pose angles, a
+        blendshape vector, or one channel per parameter set when tuning) gets
+        its own adaptive cutoff. The parameters are scalars or arrays that
+        broadcast to `shape`.
+
+        :param shape: Shape of the filtered array, or the number of channels.
+        :type shape: int or tuple
+        :param freq: An estimate of the frequency in Hz of the signal (> 0), if timestamps are not available.
+        :type freq: float
+        :param mincutoff: Min cutoff frequency in Hz (> 0). Lower values allow to remove more jitter.
+        :type mincutoff: float or array, optional
+        :param  beta: Parameter to reduce latency (> 0).
+        :type beta: float or array, optional
+        :param  dcutoff: Used to filter the derivates. 1 Hz by default.
+        :type dcutoff: float or array, optional
+        :raises ValueError: If one of the parameters is not >0
+        """
+
+        self.shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        if freq<=0:
+            raise ValueError("freq should be >0")
+        self.freq = float(freq)
+        self.mincutoff = np.broadcast_to(np.asarray(mincutoff, dtype=np.float64), self.shape)
+        self.beta = np.broadcast_to(np.asarray(beta, dtype=np.float64), self.shape)
+        self.dcutoff = np.broadcast_to(np.asarray(dcutoff, dtype=np.float64), self.shape)
+        if np.any(self.mincutoff<=0):
+            raise ValueError("mincutoff should be >0")
+        if np.any(self.dcutoff<=0):
+            raise ValueError("dcutoff should be >0")
+        self.reset()
+
+    def reset(self) -> None:
+        """Resets the internal state of the filter."""
+
+        self.x = None
+        self.dx = None
+        self.lasttime = None
+
+    def __call__(self, x, timestamp:float=None):
+        """Filters one sample of every channel.
+
+        :param x: Noisy values, broadcastable to the filter shape.
+        :type x: array
+        :param timestamp: timestamp in seconds.
+        :type timestamp: float, optional
+        :returns: the filtered values and the alpha used for each channel
+        :rtype: tuple of arrays
+        """
+
+        if self.lasttime and timestamp and timestamp>self.lasttime:
+            self.freq = 1.0 / (timestamp-self.lasttime)
+        self.lasttime = timestamp
+        x = np.broadcast_to(np.asarray(x, dtype=np.float64), self.shape)
+
+        # alpha = 1 / (1 + tau/te) with tau = 1 / (2*pi*cutoff), written as
+        # r / (1 + r) with r = 2*pi*cutoff*te so each alpha is one expression.
+        rate = 2*math.pi/self.freq
+        if self.x is None:
+            self.x = x.copy()
+            self.dx = np.zeros(self.shape)
+        else:
+            r = rate*self.dcutoff
+            self.dx += r/(1.0+r)*((x-self.x)*self.freq-self.dx)
+
+        r = rate*(self.mincutoff+self.beta*np.abs(self.dx))
+        alpha = r/(1.0+r)
+        self.x += alpha*(x-self.x)
+        return self.x.copy(), alpha
+
+    def filter_series(self, values, timestamps=None):
+        """Filters a whole series, one sample per row.
+
+        :param values: Samples with shape (T,) + filter shape.
+        :type values: array
+        :param timestamps: Per-sample timestamps in seconds, shape (T,).
+        :type timestamps: array, optional
+        :returns: filtered values and alphas, both with the shape of `values`
+        :rtype: tuple of arrays
+        """
+
+        values = np.asarray(values, dtype=np.float64)
+        filtered = np.empty(values.shape[:1] + self.shape)
+        alphas = np.empty_like(filtered)
+        for i in range(len(values)):
+            filtered[i], alphas[i] = self(values[i], None if timestamps is None else timestamps[i])
+        return filtered, alphas
@@ -0,0 +1,81 @@
+import cv2
+import numpy as np
+
+class MotionGate:
+    """Decides whether a frame changed enough to be worth running the model.
+
+    The region of interest is downsampled to a small grey thumbnail and
+    compared with the thumbnail of the last frame that was inferred. When the
+    mean absolute difference stays under `threshold` (grey levels) the
+    previous result can be reused. At least `min_inference_hz` inferences
+    per second are forced so slowly changing expressions still come through.
+    """
+
+    def __init__(self, threshold=2.0, size=(32, 24), min_inference_hz=5.0):
+        self.threshold = threshold
+        self.size = size
+        self.min_interval = 1.0 / min_inference_hz if min_inference_hz > 0 else float("inf")
+
+        width, height = size
+        self.small = np.empty((height, width, 3), dtype=np.uint8)
+        self.gray = np.empty((height, width), dtype=np.uint8)
+        self.reference = np.empty((height, width), dtype=np.uint8)
+        self.diff = np.empty((height, width), dtype=np.uint8)
+        self.has_reference = False
+        self.reference_region = None
+        self.last_inference_time = None
+        self.last_change = 0.0
+
+        self.inferred = 0
+        self.skipped = 0
+
+    def reset(self):
+        self.has_reference = False
+        self.reference_region = None
+        self.last_inference_time = None
+
+    def should_infer(self, frame, region, timestamp):
+        """region is (x0, y0, x1, y1) in pixels, or None for the whole frame.
+
+        Frames are compared inside the region of the last inferred frame, so
+        a face box that wobbles between results does not count as motion.
+        """
+        if not self.has_reference or timestamp - self.last_inference_time >= self.min_interval:
+            return self._infer(frame, region, timestamp)
+
+        self._thumbnail(frame, self.reference_region, self.gray)
+        cv2.absdiff(self.gray, self.reference, dst=self.diff)
+        self.last_change = float(self.diff.mean())
+        if self.last_change > self.threshold:
+            return self._infer(frame, region, timestamp)
+
+        self.skipped += 1
+        return False
+
+    def _thumbnail(self, frame, region, dst):
+        area = frame
+        if region is not None:
+            x0, y0, x1, y1 = region
+            if x1 > x0 and y1 > y0:
+                area = frame[y0:y1, x0:x1]
+        cv2.resize(area, self.size, dst=self.small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self.small, cv2.COLOR_RGB2GRAY, dst=dst)
+
+    def _infer(self, frame, region, timestamp):
+        # The reference only moves on inference, so slow drift adds up until
+        # it crosses the threshold.
+        self._thumbnail(frame, region, self.reference)
+        self.has_reference = True
+        self.reference_region = region
+        self.last_inference_time = timestamp
+        self.inferred += 1
+        return True
+
+    def get_stats(self):
+        total = self.inferred + self.skipped
+        return {
+            "inferred": self.inferred,
+            "skipped": self.skipped,
+            "skip_ratio": self.skipped / total if total else 0.0,
+            "last_change": self.last_change,
+        }
@@ -1,47 +1,18 @@
 import numpy as np
 import numpy.typing as npt
-import pyautogui
 from src.accel import SigmoidAccel
 import time
-from src.modified_oneEuroFilter import OneEuroFilter
 import threading
-import queue
-import math
-# class MouseMoverThread(threading.Thread):
-#     def __init__(self):
-#         super().__init__(daemon=True)
-#         self.queue = queue.Queue()
-#         self.running = True
-    
-#     def run(self):
-#         while self.running:
-#             try:
-#                 if not self.queue.empty():
-#                     vx, vy, duration = self.queue.get(block=False)
-#                     pyautogui.moveRel(vx, vy, duration=duration)
-#                     self.queue.task_done()
-#                 else:
-#                     time.sleep(0.001)  # Ngủ ngắn khi không có công việc
-    
-#             except Exception as e:
-#                 print(f"Error in mouse mover thread: {e}")
-    
-#     def move(self, vx, vy, duration=0.016):
-#         self.queue.put((vx, vy, duration))
-    
-#     def stop(self):
-#         self.running = False
+from src.cursor_output import CursorOutput, DEFAULT_OUTPUT_RATE
+from src.cursor_predictor import create_predictor
+from src.input_backend import PyAutoGuiBackend
+from src.cursor_simulation import CursorSmoother, predicted_step
 
 class MouseController:
-    def __init__(self):
-        pyautogui.FAILSAFE = False
-        pyautogui.PAUSE = 0
-        pyautogui.MINIMUM_DURATION = 0
-        pyautogui.MINIMUM_SLEEP = 0.0049
+    def __init__(self, input_backend=None):
+        self.input_backend = input_backend or PyAutoGuiBackend()
         self.mincutoff = 0.5
         self.beta = 0.07
-        self.vx = 0
-        self.vy = 0
         config = {
             'freq': 30,      
             'mincutoff': self.mincutoff, 
@@ -49,10 +20,10 @@ class MouseController:
             'dcutoff': 1.0    
             }
 
-        self.f1 = OneEuroFilter(**config)
+        # x and y are filtered separately, each with its own adaptive cutoff.
+        self.smoother = CursorSmoother(2, **config)
  
         self.position_buffer = None
-        self.prev_smooth_position = None
         self.velocity_scale = 20.0
         self.accel = SigmoidAccel()
         self.get_cursor = None
@@ -66,8 +37,19 @@ class MouseController:
         self.previous_cursor = None
         self.tmp = time.time()
 
-        # self.mouse_mover = MouseMoverThread()
-        # self.mouse_mover.start()
+        # Cursor movement is emitted by its own thread so the result callback
+        # never waits on the OS.
+        self.output = CursorOutput(self.input_backend, DEFAULT_OUTPUT_RATE)
+        self.output.start()
+
+        # Optional extrapolation of the filtered position over the measured
+        # capture-to-output latency.
+        self.predictor = None
+        self.horizon_scale = 1.0
+        self.max_horizon = 0.08
+        self.latency = None
+        self.filtered_position = np.zeros(2)
+        self.prev_predicted = None
 
     def reset(self):
         config = {
@@ -76,47 +58,82 @@ class MouseController:
             'beta': self.beta,       
             'dcutoff': 1.0    
             }
-        self.f1 = OneEuroFilter(**config)
-        self.prev_smooth_position = None
+        self.smoother = CursorSmoother(2, **config)
+        self.reset_prediction()
+        self.output.clear()
+
+    def reset_prediction(self):
+        self.filtered_position = np.zeros(2)
+        self.prev_predicted = None
+        if self.predictor is not None:
+            self.predictor.reset()
+
+    def set_output_rate(self, rate_hz):
+        self.output.set_rate(rate_hz)
+
+    def configure_output(self, settings):
+        # Output rate and prediction; the filter sliders are set by the GUI.
+        self.set_output_rate(settings.get("output_rate_hz", self.output.rate_hz))
+        prediction = settings.get("prediction", {})
+        self.horizon_scale = float(prediction.get("horizon_scale", 1.0))
+        self.max_horizon = float(prediction.get("max_horizon_ms", 80.0)) / 1000
+        with self.lock:
+            self.predictor = create_predictor(prediction)
+            self.reset_prediction()
+
+    def configure(self, settings):
+        self.velocity_scale = float(settings.get("velocity_scale", self.velocity_scale))
+        self.mincutoff = float(settings.get("mincutoff", self.mincutoff))
+        self.beta = float(settings.get("beta", self.beta))
+        self.configure_output(settings)
+        self.reset()
 
     def set_get_cursor(self, get_cursor_func):
         self.get_cursor = get_cursor_func
         print("Get cursor function set successfully")
     
-    def apply_smoothing(self, point):
-        current_time = time.time()
-        return self.f1(math.sqrt(point[0]**2+point[1]**2), current_time)
-    
-    def move(self, current_position):
-        _, alpha = self.apply_smoothing(current_position)
-        
-        if self.prev_smooth_position is not None:
-            self.vx, self.vy  = ((current_position - self.prev_smooth_position) * alpha + (1 - alpha) * (np.array([self.vx, self.vy])))
-            self.prev_smooth_position = current_position
-            vx = -self.vx*self.accel(self.vx*self.velocity_scale)*self.velocity_scale
-            vy = self.vy*self.accel(self.vy*self.velocity_scale)*self.velocity_scale
-            #vx = -self.vx*self.velocity_scale
-            #vy = self.vy*self.velocity_scale
-            pyautogui.moveRel(vx/2, vy/2, duration=0)
-            time.sleep(0.01)
-            pyautogui.moveRel(vx/2, vy/2, duration=0)
-
-            # self.mouse_mover.move(vx, vy, duration=0.022)
-
-            return vx, vy
-        else:
-            self.prev_smooth_position = current_position
-            # self.mouse_mover.move(vx, vy, duration=0.022)
-        return 0, 0
+    def prediction_horizon(self):
+        # Capture-to-result latency plus, on average, half a sample interval
+        # spent spreading the step in the output thread.
+        if self.latency is None:
+            return 0.0
+        horizon = self.horizon_scale * (self.latency + self.output.sample_interval / 2)
+        return min(max(horizon, 0.0), self.max_horizon)
+
+    def predict_step(self, predictor, timestamp):
+        step, self.filtered_position, self.prev_predicted = predicted_step(
+            predictor, self.smoother.velocity, timestamp, self.prediction_horizon(),
+            self.filtered_position, self.prev_predicted)
+        return step
+
+    def move(self, current_position, timestamp=None):
+        if timestamp is None:
+            timestamp = time.monotonic()
+        step = self.smoother(current_position, timestamp)
+        if step is None:
+            return 0, 0
+
+        # configure_output() may swap the predictor from the GUI thread.
+        predictor = self.predictor
+        dx, dy = self.predict_step(predictor, timestamp) if predictor is not None else step
+        vx = -dx*self.accel(dx*self.velocity_scale)*self.velocity_scale
+        vy = dy*self.accel(dy*self.velocity_scale)*self.velocity_scale
+        self.output.submit(vx, vy, timestamp)
+        return vx, vy
     
-    def update_loop(self, cursor_pos=None):
+    def update_loop(self, cursor_pos=None, timestamp=None):
         try:
             if self.tracking_active and cursor_pos is not None:
+                if timestamp is not None:
+                    latency = time.monotonic() - timestamp
+                    # Replayed sessions may carry timestamps from another clock.
+                    if 0 <= latency < 0.5:
+                        self.latency = latency if self.latency is None else self.latency + 0.1 * (latency - self.latency)
                 # cursor_pos = self.get_cursor()
                 # if np.array_equal(cursor_pos, self.previous_cursor):
                 #     continue
                 # print(f"Cursor Position: {cursor_pos}")
-                self.move(cursor_pos)
+                self.move(cursor_pos, timestamp)
                 # print(time.time())
                 # self.previous_cursor = np.array(cursor_pos)
         except Exception as e:
@@ -127,7 +144,8 @@ class MouseController:
     def start_tracking(self):
         with self.lock:
             self.tracking_active = True
-            self.prev_smooth_position = None
+            self.smoother.previous = None
+            self.reset_prediction()
 
             # if self.update_thread is None or not self.update_thread.is_alive():
             #         self.running = True
@@ -138,10 +156,31 @@ class MouseController:
         
     def stop_tracking(self):
         self.tracking_active = False
+        self.output.clear()
         print("Mouse tracking stopped")
     
+    def on_camera_degraded(self):
+        # No samples will arrive; forget the last position so the cursor does
+        # not jump by the whole outage once frames resume.
+        with self.lock:
+            self.smoother.previous = None
+            self.smoother.velocity = np.zeros(2)
+            self.reset_prediction()
+        self.output.clear()
+
+    def get_stats(self):
+        stats = self.output.get_stats()
+        stats["input"] = self.input_backend.get_stats()
+        stats["latency_ms"] = None if self.latency is None else self.latency * 1000
+        stats["prediction_horizon_ms"] = self.prediction_horizon() * 1000 if self.predictor is not None else None
+        return stats
+
+    def close(self):
+        self.output.stop()
+        self.output.join(timeout=0.5)
+
     def click(self):
-        pyautogui.click()
+        self.input_backend.click()
 
     def increase_speed(self, step=5):
         try:
@@ -1,10 +1,16 @@
-from src.camera_thread import CameraThread
-from src.face_processor import FaceProcessor
+from src.camera_thread import CameraThread, CAMERA_DEGRADED, CAMERA_STREAMING
+from src.face_processor import FaceProcessor, load_model_bytes, DEFAULT_MODEL_PATH
+from src.face_worker import FaceWorker
 from src.mouse_controller import MouseController
+from src.input_backend import create_input_backend
 from src.profile_manager import ProfileManager
 from src.voice_processor import VoiceProcessor
 from src.blendshape_processor import BlendshapeProcessor
+from src.adaptive_governor import AdaptiveGovernor
+from src.frame_source import WebcamSource
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 class Pipeline():
     _instance = None
@@ -17,37 +23,189 @@ class Pipeline():
             cls._instance.profile_manager = None
             cls._instance.face_processor = None
             cls._instance.mouse_controller = None 
+            cls._instance.input_backend = None
             cls._instance.voice_processor = None
             cls._instance.blendshape_processor = None
             cls._instance.latest_processed_frame = None
+            cls._instance.startup_timings = {}
+            cls._instance.governor_level = None
             cls._instance.lock = threading.Lock()
         return cls._instance
         
-    def start(self):
+    def start(self, frame_source=None, headless=False):
         if not self.is_started:
-            self.profile_manager = ProfileManager()
+            self.start_time = time.monotonic()
+            self.startup_timings = {}
+            self.first_cursor_time = None
 
-            self.mouse_controller = MouseController()
+            self.profile_manager = self.timed("profile", ProfileManager)
+            settings = self.profile_manager.get_profile_settings()
+            face_settings = settings.get("face_processing", {})
 
-            self.blendshape_processor = BlendshapeProcessor(self.profile_manager)
+            # Reading and building the model, connecting the speech engine and
+            # opening the camera are independent and mostly wait on I/O or
+            # native code, so they run side by side; start() returns once all
+            # are done.
+            executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup")
+            if not face_settings.get("worker_process", False):
+                executor.submit(self.timed, "model_file", load_model_bytes, DEFAULT_MODEL_PATH)
 
-            self.voice_processor = VoiceProcessor(self.profile_manager, self.mouse_controller, self.blendshape_processor)
+            # Cursor, blendshape and voice output share one input backend.
+            self.input_backend = self.timed("input", create_input_backend,
+                                            settings.get("input", {}).get("backend", "auto"))
+            self.mouse_controller = self.timed("mouse", MouseController, self.input_backend)
+            self.blendshape_processor = self.timed("blendshape", BlendshapeProcessor,
+                                                   self.profile_manager, self.input_backend)
             # self.mouse_controller.set_get_cursor(lambda: self.face_processor.get_cursor())
 
-            self.face_processor = FaceProcessor(self.mouse_controller.update_loop, self.blendshape_processor.update_blendshape)
-            self.face_processor.initialize()
+            if frame_source is None:
+                frame_source = WebcamSource.from_settings(settings.get("camera", {}))
 
-            self.camera_thread = CameraThread()
+            if face_settings.get("worker_process", False):
+                # The shared frame ring is sized for the source resolution.
+                frame_shape = (getattr(frame_source, "height", 480), getattr(frame_source, "width", 640), 3)
+                self.face_processor = FaceWorker(self.on_cursor,
+                                                 self.blendshape_processor.update_blendshape,
+                                                 frame_shape=frame_shape)
+            else:
+                self.face_processor = FaceProcessor(self.on_cursor, self.blendshape_processor.update_blendshape)
+            self.face_processor.configure(face_settings)
+            # Set before the landmarker is built, so only that mode's is.
+            self.face_processor.is_live_stream_mode = face_settings.get("mode", "LIVE_STREAM") == "LIVE_STREAM"
+            self.face_processor.add_mode_change_listener(self.on_face_mode_change)
+            # Without a window nobody looks at the preview, so no overlay is drawn.
+            self.face_processor.preview_enabled = not headless
+            if headless:
+                self.mouse_controller.configure(settings.get("mouse_controller", {}))
+            else:
+                self.mouse_controller.configure_output(settings.get("mouse_controller", {}))
+
+            # A live camera opens while the model loads; its frames reach the
+            # landmarker only once it is warmed up, so warm-up never competes
+            # with camera frames. Recorded sources start afterwards instead,
+            # so a replay is inferred from its first frame.
+            self.camera_thread = CameraThread(frame_source=frame_source)
+            self.camera_thread.add_state_listener(self.on_camera_state)
+            self.setup_governor()
+            if frame_source.live:
+                self.camera_thread.start()
+
+            face = executor.submit(self.initialize_face_processor)
+            # The speech engine stays on this thread: its COM objects belong
+            # to the thread that created them.
+            self.voice_processor = self.timed("voice", VoiceProcessor,
+                                              self.profile_manager, self.mouse_controller, self.blendshape_processor)
+            face.result()
+            executor.shutdown()
             self.camera_thread.set_frame_callback(self.face_processor.process_frame)
-            self.camera_thread.start() 
+            if not frame_source.live:
+                self.camera_thread.start()
 
             # self.voice_processor.initialize()
 
+            self.startup_timings["total"] = time.monotonic() - self.start_time
             self.is_started = True
-            print(f"Pipeline started.")
+            print("Pipeline started. " + ", ".join(
+                f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in self.startup_timings.items()))
         else:
             print(f"Pipeline is already running.")
 
+    def timed(self, phase, function, *args):
+        begin = time.monotonic()
+        try:
+            return function(*args)
+        finally:
+            self.startup_timings[phase] = time.monotonic() - begin
+
+    def initialize_face_processor(self):
+        self.timed("model", self.face_processor.initialize)
+        self.timed("warm_up", self.face_processor.warm_up)
+
+    def on_cursor(self, cursor, timestamp=None):
+        if self.first_cursor_time is None:
+            self.first_cursor_time = time.monotonic()
+            self.startup_timings["first_cursor"] = self.first_cursor_time - self.start_time
+            print(f"First cursor sample {self.startup_timings['first_cursor'] * 1000:.0f} ms after start")
+        self.mouse_controller.update_loop(cursor, timestamp)
+
+    def load_profile(self, profile_name):
+        # Applies a profile to every component; the GUI does the same
+        # through its settings panels.
+        settings = self.profile_manager.load_profile(profile_name)
+        self.mouse_controller.configure(settings.get("mouse_controller", {}))
+        face_settings = settings.get("face_processing", {})
+        self.face_processor.configure(face_settings)
+        if face_settings.get("mode", "LIVE_STREAM") != self.face_processor.get_current_mode():
+            self.face_processor.toggle_mode()
+        self.blendshape_processor.on_profile_change()
+        if self.voice_processor:
+            self.voice_processor.on_profile_change()
+        return settings
+
+    def get_startup_timings(self):
+        return dict(self.startup_timings)
+
+    def on_camera_state(self, state):
+        if state == CAMERA_STREAMING and "camera" not in self.startup_timings:
+            self.startup_timings["camera"] = time.monotonic() - self.start_time
+        if state == CAMERA_STREAMING and self.camera_thread.governor:
+            get_format = getattr(self.camera_thread.frame_source, "get_format", None)
+            negotiated = get_format() if get_format else None
+            if negotiated:
+                self.camera_thread.governor.set_source_fps(negotiated.get("fps"))
+        if state == CAMERA_DEGRADED:
+            self.face_processor.on_camera_degraded()
+            self.mouse_controller.on_camera_degraded()
+            self.blendshape_processor.on_camera_degraded()
+
+    def on_face_mode_change(self, mode_name, success):
+        # Results of the two modes arrive at different rates and latencies,
+        # so the cursor filter starts over instead of mixing them.
+        if success:
+            self.mouse_controller.reset()
+
+    def setup_governor(self):
+        performance = self.profile_manager.get_profile_settings().get("performance", {})
+        governor_settings = performance.get("governor", {})
+        if not governor_settings.get("enabled", False):
+            return
+
+        governor = AdaptiveGovernor(
+            latency_budget_ms=governor_settings.get("latency_budget_ms", 60.0),
+            levels=governor_settings.get("levels"),
+            level=governor_settings.get("level", 0),
+            on_change=self.on_governor_change
+        )
+        self.camera_thread.set_governor(governor)
+        self.face_processor.set_latency_callback(self.camera_thread.report_latency)
+
+    def on_governor_change(self, level_index, level):
+        # Called on the result thread; the level is written to the profile
+        # on stop() so the next start begins from it.
+        self.governor_level = level_index
+
+    def save_governor_level(self):
+        if self.governor_level is None:
+            return
+        try:
+            self.profile_manager.update_profile_settings({
+                "performance": {"governor": {"level": self.governor_level}}
+            })
+            self.governor_level = None
+        except Exception as e:
+            print(f"Error saving governor level: {e}")
+
+    def get_stats(self):
+        stats = {}
+        if self.camera_thread:
+            stats["camera"] = self.camera_thread.get_stats()
+        if self.face_processor:
+            stats["face"] = self.face_processor.get_stats()
+        if self.mouse_controller:
+            stats["cursor_output"] = self.mouse_controller.get_stats()
+        stats["startup"] = self.get_startup_timings()
+        return stats
+
     def get_profile_manager(self):
         return self.profile_manager
     
@@ -69,10 +227,15 @@ class Pipeline():
     def stop(self):
         if self.is_started:
             if self.camera_thread:
-                self.camera_thread.stop_flag.set()
+                self.camera_thread.stop()
+                self.camera_thread.join(timeout=2.0)
+            self.save_governor_level()
 
             if self.face_processor:
                 self.face_processor.close()
+            if self.mouse_controller:
+                self.mouse_controller.close()
+                self.input_backend.close()
             self.is_started = False
             print(f"Pipeline stopped.")
         else:
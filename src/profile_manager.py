@@ -18,7 +18,15 @@ class ProfileManager:
             "mouse_controller": {
                 "velocity_scale": 15.0,
                 "mincutoff": 1.5,
-                "beta": 0.1
+                "beta": 0.1,
+                "output_rate_hz": 180,
+                "prediction": {
+                    "enabled": False,
+                    "method": "constant_velocity",
+                    "horizon_scale": 1.0,
+                    "max_horizon_ms": 80.0,
+                    "damping": 5.0
+                }
             },
             "voice_processor": {
                 "selected_microphone": "Default Microphone",
@@ -46,8 +54,32 @@ class ProfileManager:
                 ],
                 "threshold": 0.5
             },
+            "input": {
+                "backend": "auto"
+            },
             "face_processing": {
-                "mode": "LIVE_STREAM"
+                "mode": "LIVE_STREAM",
+                "roi_tracking": False,
+                "roi_padding": 0.35,
+                "roi_redetect_interval": 30,
+                "motion_gating": False,
+                "motion_threshold": 2.0,
+                "min_inference_hz": 5.0,
+                "worker_process": False,
+                "max_in_flight": 2,
+                "cursor_source": "landmarks",
+                "head_pose_gain": [80.0, 80.0]
+            },
+            "camera": {
+                "device_index": 0,
+                "devices": {}
+            },
+            "performance": {
+                "governor": {
+                    "enabled": False,
+                    "latency_budget_ms": 60.0,
+                    "level": 0
+                }
             }
         }
 
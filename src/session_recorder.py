@@ -0,0 +1,155 @@
+import json
+import os
+import queue
+import struct
+import threading
+import numpy as np
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+FRAMES_FILE = "frames.bin"
+INDEX_FILE = "index.bin"
+
+# One record per frame; frame i starts at byte i * frame_bytes of frames.bin.
+INDEX_DTYPE = np.dtype([("seq", "<i8"), ("timestamp", "<f8")])
+INDEX_RECORD = struct.Struct("<qd")
+
+
+class SessionRecorder:
+    """Appends raw RGB frames and their capture timestamps to a session
+    directory that SessionReader can memory-map.
+
+    Frames are written uncompressed so the reader can hand out zero-copy
+    views. submit() only queues a reference to a pooled frame; a writer
+    thread does the disk I/O so capture is never blocked. When the queue is
+    full the frame is not recorded and counted in `dropped`.
+    """
+
+    def __init__(self, path, shape, queue_size=4):
+        self.path = path
+        self.shape = tuple(shape)
+        self.frame_bytes = int(np.prod(self.shape))
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.queue_size = queue_size
+        self.thread = None
+        self.frames_file = None
+        self.index_file = None
+
+        self.recorded = 0
+        self.dropped = 0
+        self.mismatched = 0
+
+    def start(self):
+        os.makedirs(self.path, exist_ok=True)
+        self.frames_file = open(os.path.join(self.path, FRAMES_FILE), "wb")
+        self.index_file = open(os.path.join(self.path, INDEX_FILE), "wb")
+        self.write_meta()
+        self.thread = threading.Thread(target=self.write_loop, daemon=True)
+        self.thread.start()
+        print(f"Recording session to {self.path}")
+
+    def submit(self, pooled):
+        if pooled.array.shape != self.shape:
+            self.mismatched += 1
+            return False
+        pooled.retain()
+        try:
+            self.queue.put_nowait(pooled)
+            return True
+        except queue.Full:
+            pooled.release()
+            self.dropped += 1
+            return False
+
+    def write_loop(self):
+        while True:
+            pooled = self.queue.get()
+            if pooled is None:
+                break
+            try:
+                self.frames_file.write(pooled.array)
+                self.index_file.write(INDEX_RECORD.pack(pooled.seq, pooled.timestamp))
+                self.recorded += 1
+            except Exception as e:
+                print(f"Session recorder error: {e}")
+            finally:
+                pooled.release()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+        self.frames_file.close()
+        self.index_file.close()
+        self.write_meta()
+        print(f"Recorded {self.recorded} frames ({self.dropped} dropped) to {self.path}")
+
+    def write_meta(self):
+        height, width, channels = self.shape
+        meta = {
+            "version": FORMAT_VERSION,
+            "width": width,
+            "height": height,
+            "channels": channels,
+            "dtype": "uint8",
+            "color": "RGB",
+            "frames": self.recorded,
+        }
+        with open(os.path.join(self.path, META_FILE), "w") as f:
+            json.dump(meta, f, indent=4)
+
+    def get_stats(self):
+        return {
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "mismatched": self.mismatched,
+            "queued": self.queue.qsize(),
+        }
+
+
+class SessionReader:
+    """Memory-maps a recorded session. frame(i) is a read-only view into the
+    file, no frame data is copied until it is used.
+
+    The frame count comes from the size of the files rather than the
+    metadata, so sessions cut short by a crash can still be read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE), "r") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported session format version {self.meta.get('version')}")
+
+        self.shape = (self.meta["height"], self.meta["width"], self.meta["channels"])
+        frame_bytes = int(np.prod(self.shape))
+        frames_path = os.path.join(path, FRAMES_FILE)
+
+        index = np.fromfile(os.path.join(path, INDEX_FILE), dtype=INDEX_DTYPE)
+        count = min(len(index), os.path.getsize(frames_path) // frame_bytes)
+        self.index = index[:count]
+        self.seqs = self.index["seq"]
+        self.timestamps = self.index["timestamp"]
+
+        if count:
+            self.frames = np.memmap(frames_path, dtype=np.uint8, mode="r", shape=(count,) + self.shape)
+        else:
+            self.frames = np.empty((0,) + self.shape, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.index)
+
+    def frame(self, i):
+        return self.frames[i]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.frames[i], float(self.timestamps[i]), int(self.seqs[i])
+
+    def duration(self):
+        if len(self) < 2:
+            return 0.0
+        return float(self.timestamps[-1] - self.timestamps[0])
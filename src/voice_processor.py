@@ -2,10 +2,14 @@ import threading
 import time
 import json
 import os
-import pythoncom
-import pyautogui
-from dragonfly import Grammar, CompoundRule
-from dragonfly.engines.backend_sapi5.engine import Sapi5InProcEngine
+
+# dragonfly and pythoncom are imported where the speech engine is set up, so
+# loading this module stays cheap.
+def create_engine():
+    from dragonfly.engines.backend_sapi5.engine import Sapi5InProcEngine
+    engine = Sapi5InProcEngine()
+    engine.connect()
+    return engine
 
 class VoiceProcessor:
     def __init__(self, profile_manager, mouse_controller, blendshape_processor=None):
@@ -89,13 +93,13 @@ class VoiceProcessor:
     def initialize(self):
         try:
             print("Initializing voice processor...")
-            self.engine = Sapi5InProcEngine()
-            self.engine.connect()
+            self.engine = create_engine()
 
             self.available_microphones = self.get_available_microphones()
             
             self.load_commands_from_profile(self.profile_manager)
 
+            from dragonfly import Grammar
             self.grammar = Grammar("voice_commands")
             # self.create_rules()
             
@@ -137,15 +141,16 @@ class VoiceProcessor:
         for rule in list(self.grammar.rules):
             self.grammar.remove_rule(rule)
 
-        command_rule = VoiceCommandRule(self.commands, self.mouse_controller, self.actions, self.blendshape_processor)
+        from src.voice_rules import VoiceCommandRule
+        command_rule = VoiceCommandRule(self.commands, self.mouse_controller, self.actions, self.blendshape_processor,
+                                        self.mouse_controller.input_backend)
         self.grammar.add_rule(command_rule)
         
         self.grammar.load()
     
     def get_available_microphones(self):
         if not self.engine:
-            self.engine = Sapi5InProcEngine()
-            self.engine.connect()
+            self.engine = create_engine()
             
         audio_sources = self.engine.get_audio_sources()
         microphones = [source[1] for source in audio_sources]
@@ -153,6 +158,7 @@ class VoiceProcessor:
         return microphones
     
     def process_voice(self):
+        import pythoncom
         pythoncom.CoInitialize() 
         
         try:
@@ -319,87 +325,3 @@ class VoiceProcessor:
         
     def set_blendshape_processor(self, blendshape_processor):
         self.blendshape_processor = blendshape_processor
-
-
-class VoiceCommandRule(CompoundRule):
-    def __init__(self, commands, mouse_controller=None, actions=None, blendshape_processor=None):
-        self.commands = commands
-        self.mouse_controller = mouse_controller
-        self.blendshape_processor = blendshape_processor
-        self.actions = actions
-        
-        specs = []
-        for cmd in commands:
-            cmd_text = cmd.get("command", "")
-            if cmd_text:
-                specs.append(f'"{cmd_text}"')
-        
-        if specs:
-            self.spec = " | ".join(specs)
-        else:
-            self.spec = '"dummy command"'
-        
-        super(VoiceCommandRule, self).__init__()
-
-    def _process_recognition(self, node, extras):
-        words = node.words()
-        recognized_text = " ".join(words).lower()
-        recognized_text = recognized_text.replace('"', '')
-        
-        for command in self.commands:
-            if command.get("command", "").lower() == recognized_text:
-                action = command.get("action", "")
-                print(f"Command recognized: {command['command']} -> {command['action']}")
-                
-                if not self.blendshape_processor.is_mouth_recently_open():
-                    print("Voice command blocked: Mouth not open in recent 50 frames")
-                    return
-                self.execute_action(action)
-                return action
-                
-        print(f"Command not recognized: {recognized_text}")
-        return None
-        
-    def execute_action(self, action):
-        print(f"Executing action: {action}")
-        
-        try:
-            if action in self.actions["mouse"]:
-                if action == "mouse_click":
-                    pyautogui.click()
-                elif action == "mouse_right_click":
-                    pyautogui.click(button='right')
-                elif action == "mouse_middle_click":
-                    pyautogui.click(button="middle")
-                elif action == "mouse_double_click":
-                    pyautogui.doubleClick()
-                elif action in ["scroll_up", "scroll_down"]:
-                    pass 
-                
-            elif action == "increase_mouse_speed":
-                return self.mouse_controller.increase_speed()
-                    
-            elif action == "decrease_mouse_speed":
-                return self.mouse_controller.decrease_speed()
-                    
-            elif action.startswith("key_"):
-                key = action[4:] 
-                pyautogui.press(key)
-                print(f"Pressed key: {key}")
-                return True
-            
-            elif action.startswith("hotkey_"):
-                keys = action[7:].split('+')  
-                pyautogui.hotkey(*keys)
-                print(f"Pressed hotkey: {'+'.join(keys)}")
-                return True
-                
-            else:
-                print(f"Unknown action: {action}")
-                return False
-                
-        except Exception as e:
-            print(f"Error executing action {action}: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
@@ -0,0 +1,86 @@
+from dragonfly import CompoundRule
+from src.input_backend import PyAutoGuiBackend
+
+class VoiceCommandRule(CompoundRule):
+    def __init__(self, commands, mouse_controller=None, actions=None, blendshape_processor=None, input_backend=None):
+        self.commands = commands
+        self.mouse_controller = mouse_controller
+        self.input_backend = input_backend or PyAutoGuiBackend()
+        self.blendshape_processor = blendshape_processor
+        self.actions = actions
+        
+        specs = []
+        for cmd in commands:
+            cmd_text = cmd.get("command", "")
+            if cmd_text:
+                specs.append(f'"{cmd_text}"')
+        
+        if specs:
+            self.spec = " | ".join(specs)
+        else:
+            self.spec = '"dummy command"'
+        
+        super(VoiceCommandRule, self).__init__()
+
+    def _process_recognition(self, node, extras):
+        words = node.words()
+        recognized_text = " ".join(words).lower()
+        recognized_text = recognized_text.replace('"', '')
+        
+        for command in self.commands:
+            if command.get("command", "").lower() == recognized_text:
+                action = command.get("action", "")
+                print(f"Command recognized: {command['command']} -> {command['action']}")
+                
+                if not self.blendshape_processor.is_mouth_recently_open():
+                    print("Voice command blocked: Mouth not open in recent 50 frames")
+                    return
+                self.execute_action(action)
+                return action
+                
+        print(f"Command not recognized: {recognized_text}")
+        return None
+        
+    def execute_action(self, action):
+        print(f"Executing action: {action}")
+        
+        try:
+            if action in self.actions["mouse"]:
+                if action == "mouse_click":
+                    self.input_backend.click()
+                elif action == "mouse_right_click":
+                    self.input_backend.click(button="right")
+                elif action == "mouse_middle_click":
+                    self.input_backend.click(button="middle")
+                elif action == "mouse_double_click":
+                    self.input_backend.double_click()
+                elif action in ["scroll_up", "scroll_down"]:
+                    pass 
+                
+            elif action == "increase_mouse_speed":
+                return self.mouse_controller.increase_speed()
+                    
+            elif action == "decrease_mouse_speed":
+                return self.mouse_controller.decrease_speed()
+                    
+            elif action.startswith("key_"):
+                key = action[4:] 
+                self.input_backend.press(key)
+                print(f"Pressed key: {key}")
+                return True
+            
+            elif action.startswith("hotkey_"):
+                keys = action[7:].split('+')  
+                self.input_backend.hotkey(*keys)
+                print(f"Pressed hotkey: {'+'.join(keys)}")
+                return True
+                
+            else:
+                print(f"Unknown action: {action}")
+                return False
+                
+        except Exception as e:
+            print(f"Error executing action {action}: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
@@ -0,0 +1,45 @@
+import heapq
+from src.adaptive_governor import AdaptiveGovernor
+
+
+def run(governor, latency_at_level, frames, fps=30.0):
+    # Frames are captured at the level current at capture time and their
+    # results arrive `latency` later, in arrival order.
+    arrivals = []
+    for i in range(frames):
+        timestamp = i / fps
+        while arrivals and arrivals[0][0] <= timestamp:
+            arrival, captured, latency = heapq.heappop(arrivals)
+            governor.observe(latency, captured)
+        latency = latency_at_level[governor.level_index]
+        heapq.heappush(arrivals, (timestamp + latency, timestamp, latency))
+    for arrival, captured, latency in sorted(arrivals):
+        governor.observe(latency, captured)
+
+
+def test_one_overload_drops_one_level():
+    governor = AdaptiveGovernor(latency_budget_ms=60.0, down_after=15, up_after=90)
+    # Level 0 is over budget, level 1 sits between the up and down thresholds.
+    run(governor, {0: 0.150, 1: 0.045, 2: 0.030, 3: 0.030, 4: 0.030}, frames=300)
+    assert governor.level_index == 1
+    assert governor.changes == 1
+    assert governor.skipped > 0
+
+
+def test_average_restarts_after_a_change():
+    governor = AdaptiveGovernor(latency_budget_ms=60.0, down_after=3)
+    for i in range(3):
+        governor.observe(0.2, i / 30)
+    assert governor.level_index == 1
+    assert governor.get_stats()["average_latency_ms"] is None
+    governor.observe(0.04, 1.0)
+    assert governor.get_stats()["average_latency_ms"] == 40.0
+
+
+def test_top_level_runs_at_the_negotiated_rate():
+    governor = AdaptiveGovernor()
+    governor.set_source_fps(60.0)
+    assert governor.level == (640, 480, 60.0)
+    assert governor.levels[1][2] == 30
+    governor.set_source_fps(0.0)
+    assert governor.level == (640, 480, 60.0)
@@ -0,0 +1,88 @@
+import threading
+import time
+import numpy as np
+from src.camera_thread import CameraThread, CAPTURE_LATEST, CAPTURE_READ
+from src.frame_source import FrameSource, SyntheticSource, REPLAY_FIXED
+from src.session_recorder import SessionReader
+
+
+def results_per_second(capture_mode, duration=1.5, inference_time=0.04):
+    # 30 fps source, inference slower than one frame interval.
+    results = []
+    done = threading.Event()
+
+    def slow_inference(frame, timestamp, seq):
+        time.sleep(inference_time)
+        results.append(time.monotonic())
+
+    source = SyntheticSource(160, 120, replay_mode=REPLAY_FIXED, fps=30.0)
+    camera = CameraThread(slow_inference, source)
+    camera.capture_mode = capture_mode
+    camera.start()
+    done.wait(duration)
+    camera.stop()
+    camera.camera_thread.join(1.0)
+    camera.inference_thread.join(1.0)
+    # Skip the first results while the pipeline fills.
+    counted = [t for t in results if t - results[0] > 0.2]
+    return len(counted) / (counted[-1] - counted[0]) if len(counted) > 1 else 0.0
+
+
+def test_latest_mode_keeps_up_with_read_mode():
+    read_rate = results_per_second(CAPTURE_READ)
+    latest_rate = results_per_second(CAPTURE_LATEST)
+    assert read_rate > 20
+    assert latest_rate >= read_rate * 0.95
+
+
+class FlakySource(FrameSource):
+    """Live source whose grabs fail in bursts; reopening always works."""
+
+    live = True
+
+    def __init__(self, pattern):
+        super().__init__()
+        self.pattern = pattern
+        self.grabs = 0
+        self.frame = np.zeros((120, 160, 3), dtype=np.uint8)
+
+    def open(self):
+        return True
+
+    def _grab_frame(self):
+        time.sleep(0.005)
+        self.grabs += 1
+        ok = self.pattern[min(self.grabs, len(self.pattern)) - 1]
+        return ok, None
+
+    def _retrieve_frame(self):
+        return True, self.frame
+
+
+def test_one_reconnect_per_failure_burst():
+    bursts = 4
+    pattern = ([True] * 10 + [False] * 8) * bursts + [True]
+    source = FlakySource(pattern)
+    camera = CameraThread(lambda frame, timestamp, seq: None, source)
+    camera.capture_mode = CAPTURE_READ
+    camera.start()
+    deadline = time.monotonic() + 5.0
+    while source.grabs < len(pattern) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    camera.stop()
+    camera.camera_thread.join(1.0)
+    assert source.grabs >= len(pattern)
+    assert camera.reconnects == bursts
+
+
+def test_recording_uses_the_first_frame_shape(tmp_path):
+    path = str(tmp_path / "session")
+    source = SyntheticSource(320, 240, replay_mode=REPLAY_FIXED, fps=60.0, num_frames=20)
+    camera = CameraThread(lambda frame, timestamp, seq: None, source)
+    assert camera.start_recording(path)
+    camera.start()
+    camera.join(3.0)
+
+    reader = SessionReader(path)
+    assert reader.shape == (240, 320, 3)
+    assert len(reader) > 0
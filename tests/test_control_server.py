@@ -0,0 +1,57 @@
+import json
+import os
+import socket
+import stat
+from src.control_server import ControlServer, load_token
+
+
+def exchange(port, data):
+    # Sends data, then reads every reply line until the server closes.
+    with socket.create_connection(("127.0.0.1", port), timeout=2.0) as connection:
+        connection.sendall(data)
+        connection.shutdown(socket.SHUT_WR)
+        received = b""
+        while chunk := connection.recv(4096):
+            received += chunk
+    return [json.loads(line) for line in received.decode("utf-8").splitlines()]
+
+
+def running_server():
+    server = ControlServer(None, "secret", port=0)
+    server.start()
+    return server, server.server.server_address[1]
+
+
+def test_http_requests_are_closed_unread():
+    server, port = running_server()
+    try:
+        request = (b"POST / HTTP/1.1\r\nHost: 127.0.0.1:8765\r\nContent-Type: text/plain\r\n\r\n"
+                   b"auth secret\r\nstop\r\n")
+        assert exchange(port, request) == []
+        assert not server.stopped.is_set()
+    finally:
+        server.stop()
+
+
+def test_commands_need_the_token():
+    server, port = running_server()
+    try:
+        replies = exchange(port, b"stop\n")
+        assert replies[0]["ok"] is False
+        assert not server.stopped.is_set()
+
+        assert exchange(port, b"auth wrong\nstop\n")[0]["ok"] is False
+        assert not server.stopped.is_set()
+
+        replies = exchange(port, b"auth secret\nhelp\nstop\n")
+        assert [reply["ok"] for reply in replies] == [True, True, True]
+        assert server.stopped.is_set()
+    finally:
+        server.stop()
+
+
+def test_token_file_is_created_private(tmp_path):
+    path = str(tmp_path / "token")
+    token = load_token(path)
+    assert token and load_token(path) == token
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
@@ -0,0 +1,33 @@
+import pytest
+from src.cursor_output import CursorOutput
+from src.input_backend import NullBackend
+
+PERIOD = 1 / 180
+
+
+def tick(output, backend, now):
+    dx, dy, _ = output.step(now, PERIOD)
+    backend.move(dx, dy)
+    backend.flush()
+    return dx
+
+
+def moves(backend):
+    return [args for _, event, args in backend.log if event == "move"]
+
+
+def test_early_sample_flushes_the_previous_one():
+    backend = NullBackend()
+    output = CursorOutput(backend, rate_hz=180)
+
+    # 12 px spread over six ticks; the next sample arrives after two of them.
+    output.submit(12.0, 0.0, timestamp=0.0)
+    first = [tick(output, backend, output.deadline - (6 - i) * PERIOD) for i in range(2)]
+    output.submit(6.0, 0.0, timestamp=1 / 30)
+    second = [tick(output, backend, output.deadline - (6 - i) * PERIOD) for i in range(6)]
+
+    assert first == pytest.approx([2.0, 2.0])
+    # The 8 px left over go out at once, the new 6 px over the whole interval.
+    assert second == pytest.approx([9.0, 1.0, 1.0, 1.0, 1.0, 1.0])
+    assert sum(dx for dx, _ in moves(backend)) == 18
+    assert all(dy == 0 for _, dy in moves(backend))
@@ -0,0 +1,39 @@
+import numpy as np
+from src.cursor_simulation import smoothed_steps
+from src.input_backend import NullBackend
+from src.mouse_controller import MouseController
+
+
+def track(frames=120, gap=None):
+    rng = np.random.default_rng(0)
+    points = np.cumsum(rng.normal(0, 2, (frames, 2)), axis=0) + 300
+    if gap is not None:
+        points[gap] = np.nan
+    return points, np.arange(frames) / 30
+
+
+def test_steps_match_mouse_controller():
+    points, timestamps = track()
+    mouse_controller = MouseController(NullBackend())
+    try:
+        expected = {}
+        for i, (point, timestamp) in enumerate(zip(points, timestamps)):
+            mouse_controller.move(point, timestamp)
+            expected[i] = mouse_controller.smoother.velocity.copy()
+    finally:
+        mouse_controller.close()
+
+    steps = dict(smoothed_steps(points, timestamps, mouse_controller.mincutoff, mouse_controller.beta))
+    assert list(steps) == list(range(1, len(points)))
+    for i, step in steps.items():
+        np.testing.assert_allclose(step, expected[i])
+
+
+def test_grid_rows_match_single_settings():
+    points, timestamps = track(gap=slice(40, 45))
+    mincutoffs = np.array([0.3, 1.0, 2.0])
+    betas = np.array([0.01, 0.07, 0.2])
+    grid = dict(smoothed_steps(points, timestamps, mincutoffs[:, None], betas[:, None], (3, 2)))
+    for row, (mincutoff, beta) in enumerate(zip(mincutoffs, betas)):
+        for i, step in smoothed_steps(points, timestamps, mincutoff, beta):
+            np.testing.assert_allclose(grid[i][row], step)
@@ -0,0 +1,116 @@
+import threading
+import time
+from types import SimpleNamespace
+from src.face_processor import FaceProcessor, CURSOR_HEAD_POSE
+
+
+def face_result(x=0.5, y=0.5):
+    landmark = SimpleNamespace(x=x, y=y, z=0.0)
+    return SimpleNamespace(face_landmarks=[[landmark] * 478], face_blendshapes=[],
+                           facial_transformation_matrixes=[])
+
+
+def submit(face_processor, timestamp_ms, seq, submit_time=None):
+    # What process_frame records for a LIVE_STREAM submission.
+    timestamp = timestamp_ms / 1000.0
+    with face_processor.lock:
+        face_processor.pending[timestamp_ms] = (seq, timestamp, None, submit_time or time.monotonic())
+
+
+def test_only_inferred_results_report_latency():
+    latencies = []
+    face_processor = FaceProcessor()
+    face_processor.set_latency_callback(latencies.append)
+
+    submit(face_processor, 1000, 1)
+    face_processor.mp_callback(face_result(), None, 1000)
+    assert len(latencies) == 1
+
+    face_processor.republish(time.monotonic(), 2)
+    assert len(latencies) == 1
+    assert face_processor.republished == 1
+
+
+def test_late_result_of_timed_out_submission_is_ignored():
+    published = []
+    face_processor = FaceProcessor(landmark_call_back=lambda cursor, timestamp: published.append(timestamp))
+
+    submit(face_processor, 1000, 1, submit_time=time.monotonic() - 2 * face_processor.in_flight_timeout)
+    assert not face_processor.model_busy(time.monotonic())
+    assert face_processor.model_drops == 1
+
+    face_processor.mp_callback(face_result(), None, 1000)
+    assert published == []
+    assert face_processor.get_landmarks() == (None, None)
+    assert face_processor.late_results == 1
+
+
+def test_result_of_pending_submission_is_published():
+    published = []
+    face_processor = FaceProcessor(landmark_call_back=lambda cursor, timestamp: published.append(timestamp))
+
+    submit(face_processor, 1000, 1)
+    face_processor.mp_callback(face_result(), None, 1000)
+    assert published == [1.0]
+    assert face_processor.result_seq == 1
+
+
+class FakeModel:
+    def __init__(self):
+        self.closed = False
+        self.thread = threading.current_thread()
+
+    def close(self):
+        self.closed = True
+
+
+def test_cursor_source_switch_happens_on_the_inference_thread():
+    face_processor = FaceProcessor()
+    old_model = FakeModel()
+    face_processor.models = {True: old_model}
+    face_processor.model = old_model
+    face_processor.is_initialized = True
+    face_processor.create_model = lambda live_stream: FakeModel()
+
+    face_processor.configure({"cursor_source": CURSOR_HEAD_POSE})
+    # Nothing is built or closed on the calling thread.
+    assert face_processor.model is old_model
+    assert not old_model.closed
+
+    inference_thread = threading.Thread(target=face_processor.apply_pending_settings)
+    inference_thread.start()
+    inference_thread.join()
+    assert face_processor.cursor_source == CURSOR_HEAD_POSE
+    assert face_processor.model is not old_model
+    assert face_processor.model.thread is inference_thread
+    assert old_model.closed
+
+
+def test_mode_switch_and_rebuild_do_not_interleave():
+    face_processor = FaceProcessor()
+    built = threading.Event()
+
+    def create_model(live_stream):
+        model = FakeModel()
+        model.live_stream = live_stream
+        model.cursor_source = face_processor.cursor_source
+        if not live_stream:
+            # A slow build, long enough for the inference thread to step in.
+            built.set()
+            time.sleep(0.1)
+        return model
+
+    face_processor.create_model = create_model
+    face_processor.initialize()
+    face_processor.configure({"cursor_source": CURSOR_HEAD_POSE})
+
+    toggle = threading.Thread(target=face_processor.toggle_mode)
+    toggle.start()
+    built.wait(1.0)
+    face_processor.apply_pending_settings()
+    toggle.join()
+
+    model = face_processor.model
+    assert not model.closed
+    assert model.live_stream == face_processor.is_live_stream_mode
+    assert model.cursor_source == CURSOR_HEAD_POSE
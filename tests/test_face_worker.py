@@ -0,0 +1,40 @@
+import queue
+from types import SimpleNamespace
+import numpy as np
+from src.face_worker import FaceWorker, SharedRing
+
+
+def fake_worker(frame_shape):
+    # A FaceWorker whose process is never spawned; frames only reach the
+    # request queue.
+    worker = FaceWorker(frame_shape=frame_shape)
+    worker.preview_enabled = False
+    starts = []
+
+    def start_worker():
+        worker.frame_ring = SharedRing(int(np.prod(worker.frame_shape)), worker.frame_slots)
+        worker.requests = queue.Queue()
+        worker.process = SimpleNamespace(is_alive=lambda: False, pid=None)
+        worker.free_slots = list(range(worker.frame_slots))
+        starts.append(worker.frame_shape)
+
+    worker.start_worker = start_worker
+    worker.start_worker()
+    worker.is_initialized = True
+    return worker, starts
+
+
+def test_larger_frames_restart_the_worker_with_their_size():
+    worker, starts = fake_worker((480, 640, 3))
+    try:
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+        worker.process_frame(frame, 1.0, 1)
+        assert starts == [(480, 640, 3), (720, 1280, 3)]
+        assert worker.oversized == 1
+
+        worker.process_frame(frame, 2.0, 2)
+        kind, _, seq, _, height, width = worker.requests.get_nowait()
+        assert (kind, seq, height, width) == ("frame", 2, 720, 1280)
+    finally:
+        worker.closing = True
+        worker.stop_worker()
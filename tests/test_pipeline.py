@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+from src.pipeline import Pipeline
+from src.profile_manager import ProfileManager
+
+
+class FakeFaceProcessor:
+    def __init__(self):
+        self.is_live_stream_mode = True
+        self.settings = None
+
+    def configure(self, settings):
+        self.settings = settings
+
+    def get_current_mode(self):
+        return "LIVE_STREAM" if self.is_live_stream_mode else "IMAGE"
+
+    def toggle_mode(self):
+        self.is_live_stream_mode = not self.is_live_stream_mode
+        return True
+
+
+def headless_pipeline(profiles_dir):
+    Pipeline._instance = None
+    pipeline = Pipeline()
+    Pipeline._instance = None
+    pipeline.profile_manager = ProfileManager(str(profiles_dir))
+    pipeline.face_processor = FakeFaceProcessor()
+    pipeline.mouse_controller = SimpleNamespace(configure=lambda settings: None)
+    pipeline.blendshape_processor = SimpleNamespace(on_profile_change=lambda: None)
+    return pipeline
+
+
+def test_load_profile_applies_face_mode(tmp_path):
+    pipeline = headless_pipeline(tmp_path)
+    profile = pipeline.profile_manager.get_default_profile_template()
+    profile["face_processing"]["mode"] = "IMAGE"
+    pipeline.profile_manager.save_profile("image", profile)
+
+    pipeline.load_profile("image")
+    assert pipeline.face_processor.get_current_mode() == "IMAGE"
+    pipeline.load_profile("default")
+    assert pipeline.face_processor.get_current_mode() == "LIVE_STREAM"